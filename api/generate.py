@@ -1,13 +1,72 @@
-from openai import OpenAI
+import base64
 import json
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from resume_logic import tailor_resume  # move your functions here
+# resume_logic is headless: importing it does not pull in streamlit or the
+# DOCX/PDF/OpenAI stacks, so cold starts only pay for what a request uses.
+import metrics
+from resume_logic import build_header_from_json, tailor_resume
+from schema import SchemaError
+
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "zip": "application/zip",
+}
+
+
+def document_response(tailored, fmt, include_tech=True, styles=None, fit_pages=None):
+    # Rendered in memory and returned base64-encoded; nothing touches disk.
+    headers = {}
+    if fit_pages:
+        # one fit, measured on the PDF layout, shared by every format
+        from page_fit import fit_to_pages
+
+        tailored, styles, report = fit_to_pages(tailored, fit_pages, styles, include_tech)
+        headers["X-Page-Fit"] = json.dumps({
+            "pages": report["page_count"],
+            "fits": report["fits"],
+            "styles": report["styles"],
+            "dropped_bullets": len(report["dropped_bullets"]),
+        })
+    if fmt == "zip":
+        # DOCX + PDF + HTML + JSON in one archive, rendered in parallel
+        from export import export_bundle
+
+        data = export_bundle(tailored, include_tech=include_tech, styles_config=styles)
+    else:
+        from resume_logic import create_docx, create_pdf
+
+        render = create_docx if fmt == "docx" else create_pdf
+        data = render("", tailored, None, include_tech, styles)
+    name, _ = build_header_from_json(tailored)
+    filename = (name.replace(" ", "_") if name else "Software_Engineer") + "." + fmt
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": CONTENT_TYPES[fmt],
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            **headers,
+        },
+        "isBase64Encoded": True,
+        "body": base64.b64encode(data).decode("ascii"),
+    }
 
 
 def handler(request):
+    with metrics.run("api") as trace:
+        response = _handle(request)
+        if response["statusCode"] >= 400:
+            trace.status = "error"
+    if not response["headers"]["Content-Type"].startswith("text/event-stream"):
+        # per-stage durations, readable in the browser's network panel
+        response["headers"]["Server-Timing"] = metrics.server_timing(trace)
+    return response
+
+
+def _handle(request):
     try:
         data = request.json()
 
@@ -15,15 +74,76 @@ def handler(request):
         job_description = data.get("job_description", "")
         custom_prompt = data.get("custom_prompt", "")
 
-        tailored = tailor_resume(resume_text, job_description, custom_prompt)
+        # "no_cache": true forces a fresh generation for identical inputs
+        use_cache = not data.get("no_cache", False)
+        # "profile": true reuses the parsed base resume (default: RESUME_PROFILE)
+        profile = data.get("profile")
+        # "fit_pages": N shrinks the layout to N pages (checked before any tokens are spent)
+        fit_pages = data.get("fit_pages")
+        if fit_pages is not None and (not isinstance(fit_pages, int) or isinstance(fit_pages, bool) or fit_pages < 1):
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"error": "fit_pages must be a positive integer"})
+            }
+
+        if data.get("stream"):
+            # Server-sent events: one "section" event per finished section,
+            # then a "done" event carrying the full tailored JSON.
+            from streaming import sse_events
+
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"},
+                "body": sse_events(resume_text, job_description, custom_prompt, use_cache=use_cache, profile=profile),
+            }
+
+        options = {"use_cache": use_cache, "fanout": bool(data.get("fanout")), "profile": profile}
+        previous = data.get("previous")
+        if previous and previous.get("tailored"):
+            # {"previous": {"job_description", "custom_prompt", "tailored"}} from an earlier call:
+            # only the sections affected by the edit are regenerated
+            from incremental import retailor
+
+            tailored, info = retailor(
+                {"resume": previous.get("resume", resume_text), "job_description": previous.get("job_description"),
+                 "custom_prompt": previous.get("custom_prompt")},
+                previous["tailored"], resume_text, job_description, custom_prompt, **options,
+            )
+        else:
+            # "fanout": true generates each Experience entry in its own concurrent request
+            tailored, info = tailor_resume(resume_text, job_description, custom_prompt, with_info=True, **options)
+
+        # "format": "docx" | "pdf" | "zip" returns the rendered document instead of JSON
+        fmt = (data.get("format") or "").lower()
+        if fmt in CONTENT_TYPES:
+            return document_response(tailored, fmt, data.get("include_tech", True), data.get("styles"), fit_pages)
 
         return {
             "statusCode": 200,
+            # per-call token usage (incl. provider-cached prompt tokens) for monitoring
+            "headers": {
+                "Content-Type": "application/json",
+                "X-Token-Usage": json.dumps(info["usage"]),
+                "X-Cache": info.get("cache", "miss").upper(),
+                # "full", "incremental" or "unchanged" when "previous" was sent
+                **({"X-Tailor-Mode": info["mode"]} if "mode" in info else {}),
+                **({"X-Regenerated": ",".join(info["regenerated"])} if "regenerated" in info else {}),
+            },
             "body": json.dumps(tailored)
         }
 
+    except SchemaError as e:
+        # the model output could not be normalized or repaired
+        return {
+            "statusCode": 422,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": str(e), "problems": [f"{s}: {m}" for s, m in e.problems]})
+        }
+
     except Exception as e:
         return {
             "statusCode": 500,
+            "headers": {"Content-Type": "application/json"},
             "body": json.dumps({"error": str(e)})
         }
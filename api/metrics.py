@@ -0,0 +1,15 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import metrics
+
+
+def handler(request):
+    # Aggregates are per process: on serverless each warm instance reports
+    # its own counters, so scrape with the instance label in mind.
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "text/plain; version=0.0.4"},
+        "body": metrics.prometheus_text(),
+    }
@@ -0,0 +1,387 @@
+import streamlit as st
+import copy
+import hashlib
+import json
+import time
+
+import cancellation
+import metrics
+from resume_logic import (
+    DEFAULT_PROMPT,
+    DEFAULT_STYLES,
+    build_header_from_json,
+    create_docx,
+    create_pdf,
+    render_preview_html,
+    tailor_resume,
+)
+from export import FORMATS, export_bundle
+from incremental import plan_update, retailor
+from output_store import get_output_store
+from page_fit import fit_to_pages
+from profile_store import profile_enabled
+from response_cache import get_cache
+from streaming import stream_tailor_resume
+
+OUTPUT_EXTENSIONS = {"DOCX": "docx", "PDF": "pdf", "All formats (ZIP)": "zip"}
+FIT_PAGES = {"Off": None, "1 page": 1, "2 pages": 2}
+
+# ----------------------- Generate function -----------------------
+
+def request_generation():
+    # Button callback: flag the run; the script body snapshots the inputs and
+    # starts the generation in a background thread (see start_generation).
+    if st.session_state["loading"]:
+        return
+    st.session_state["loading"] = True
+    st.session_state["generate_requested"] = True
+    st.session_state.pop("last_result", None)
+    st.session_state.pop("last_error", None)
+    st.session_state.pop("last_update", None)
+
+def stop_generation():
+    # Closes the upstream model stream right away; the thread finishes with
+    # whatever sections were complete and the next poll collects it.
+    task = st.session_state.get("generation")
+    if task is not None:
+        task.stop()
+        st.toast("Generation stopped.", icon="🛑")
+
+def run_generation(task, params):
+    # Runs in a background thread: works only on the params snapshot, never on
+    # st.session_state. Sections streamed so far are published on task.partial.
+    with metrics.run("app") as trace:
+        # per-stage timings of this run, shown in the sidebar debug panel
+        task.trace = trace
+        cancel = task.cancel_token
+        inputs = {k: params[k] for k in ("resume", "job_description", "custom_prompt")}
+        previous, update = params["previous"], None
+        plan = plan_update(previous["inputs"], inputs, previous["tailored"]) if previous is not None else None
+        if plan is not None and plan[0] is not None:
+            # small edit since the last run: regenerate only the affected sections
+            tailored, update = retailor(
+                previous["inputs"], previous["tailored"], params["resume"], params["job_description"],
+                params["custom_prompt"], cancel=cancel, plan=plan, use_cache=params["use_cache"],
+                fanout=params["fanout"], profile=params["profile"],
+            )
+            usage = update["usage"]
+        elif params["stream"] and not params["fanout"]:
+            tailored = None
+            usage = {}
+            for section, _, value, partial in stream_tailor_resume(
+                params["resume"], params["job_description"], params["custom_prompt"],
+                use_cache=params["use_cache"], cancel=cancel, profile=params["profile"],
+            ):
+                if section == "done":
+                    tailored = value
+                elif section == "usage":
+                    usage = value
+                else:
+                    task.partial = copy.deepcopy(partial)
+        else:
+            tailored, info = tailor_resume(
+                params["resume"], params["job_description"], params["custom_prompt"],
+                use_cache=params["use_cache"], with_info=True, fanout=params["fanout"], cancel=cancel,
+                profile=params["profile"],
+            )
+            usage = info["usage"]
+        task.partial = tailored
+        # stopped after the model finished: keep the text, skip rendering
+        cancel.check(tailored)
+        source = tailored  # before fitting drops bullets; the next incremental run starts from it
+
+        styles, fit_report = params["styles"], None
+        if params["fit_pages"]:
+            # measured against the PDF layout; DOCX reuses the same sizes and bullets
+            tailored, styles, fit_report = fit_to_pages(tailored, params["fit_pages"], styles, params["include_tech"])
+
+        user_name, _ = build_header_from_json(tailored)
+        user_name = user_name.replace(" ", "_") if user_name else "Software_Engineer"
+
+        output_format = params["format"]
+        if output_format == "DOCX":
+            data = create_docx(params["resume"], tailored, None, params["include_tech"], styles)
+        elif output_format == "PDF":
+            data = create_pdf(params["resume"], tailored, None, params["include_tech"], styles)
+        else:
+            # every format at once, rendered in parallel worker processes
+            data = export_bundle(tailored, FORMATS, params["include_tech"], styles, params["resume"])
+
+        extension = OUTPUT_EXTENSIONS[output_format]
+        if params["save_copy"]:
+            ts = int(time.time())
+            get_output_store().save(f"{user_name}_{ts}.{extension}", data)
+
+    return {
+        "tailored": tailored,
+        "usage": usage,
+        "previous": {"inputs": inputs, "tailored": source},
+        "update": update,
+        "result": {"data": data, "format": output_format, "user_name": user_name, "extension": extension,
+                   "fit": fit_report},
+    }
+
+def start_generation():
+    params = {
+        "resume": resume_template_text,
+        "job_description": job_description,
+        "custom_prompt": custom_prompt,
+        "use_cache": not bypass_cache,
+        "stream": stream_output,
+        "fanout": fanout_mode,
+        "profile": profile_mode,
+        "format": output_format,
+        "include_tech": include_tech,
+        "styles": styles_config,
+        "save_copy": save_copy,
+        "fit_pages": FIT_PAGES[fit_pages],
+        "previous": st.session_state.get("previous_run") if incremental_mode and not bypass_cache else None,
+    }
+    st.session_state["generation"] = cancellation.BackgroundTask(lambda task: run_generation(task, params))
+    st.session_state["generate_requested"] = False
+
+def collect_generation(task):
+    # Move a finished background run into session state (script thread only).
+    st.session_state["last_trace"] = getattr(task, "trace", None)
+    if task.result is not None:
+        st.session_state["last_usage"] = task.result["usage"]
+        st.session_state["tailored_json"] = task.result["tailored"]
+        st.session_state["last_result"] = task.result["result"]
+        st.session_state["previous_run"] = task.result["previous"]
+        st.session_state["last_update"] = task.result["update"]
+    elif task.cancelled:
+        if task.partial:
+            # keep what was generated before Stop so it can still be previewed
+            st.session_state["tailored_json"] = task.partial
+    elif task.error is not None:
+        st.session_state["last_error"] = str(task.error)
+    st.session_state["tailored_hash"] = None
+    # ✅ turning this off hides the stop button + any loading UI in the main layout
+    st.session_state["loading"] = False
+    st.session_state.pop("generation", None)
+
+# ----------------------- app -----------------------
+
+st.set_page_config(layout="wide")
+
+st.markdown("""
+<style>
+:root {
+    --background-color: #ffffff;
+    --secondary-background-color: #f7f7f9;
+    --text-color: #000000;
+}
+
+[data-testid="stAppViewContainer"] {
+    background-color: var(--background-color);
+    color: var(--text-color);
+}
+[data-testid="stSidebar"] {
+    background-color: var(--secondary-background-color);
+}
+</style>
+""", unsafe_allow_html=True)
+
+st.title("📄 Resume Tailor Tool")
+st.sidebar.header("Settings")
+
+if "loading" not in st.session_state:
+    st.session_state["loading"] = False
+
+disabled_state = st.session_state["loading"]
+
+# Style settings live in the preview fragment (see preview_panel). Their
+# values are seeded from DEFAULT_STYLES and re-assigned every run so widget
+# state survives runs where the fragment is not drawn (while generating).
+for name, default in DEFAULT_STYLES.items():
+    st.session_state[f"style_{name}"] = st.session_state.get(f"style_{name}", default)
+
+styles_config = st.session_state.get("styles_config", DEFAULT_STYLES)
+
+st.sidebar.checkbox("Live Preview", value=True, key="live_preview")
+stream_output = st.sidebar.checkbox("Stream sections while generating", value=True, disabled=disabled_state)
+fanout_mode = st.sidebar.checkbox(
+    "Generate positions in parallel",
+    value=False,
+    disabled=disabled_state,
+    help="One request per Experience entry, run concurrently. Faster for long resumes; disables streaming.",
+)
+incremental_mode = st.sidebar.checkbox(
+    "Only regenerate what changed",
+    value=True,
+    disabled=disabled_state,
+    help="After a small edit to the job description or rules, regenerate only the affected sections "
+         "(e.g. Skills and the latest position for new required skills) and keep the rest of the last result.",
+)
+profile_mode = st.sidebar.checkbox(
+    "Reuse parsed base resume",
+    value=profile_enabled(),
+    disabled=disabled_state,
+    help="Parse the base resume once and keep it; generations then only write the Summary, Skills and bullets. "
+         "Header, dates and education are copied from the parsed resume.",
+)
+
+# Response cache
+st.sidebar.subheader("⚡ Cache")
+bypass_cache = st.sidebar.checkbox("Bypass cache (force new generation)", value=False, disabled=disabled_state)
+cache_stats = get_cache().stats()
+st.sidebar.caption(f"Hits: {cache_stats['hits']} · Misses: {cache_stats['misses']}")
+last_usage = st.session_state.get("last_usage")
+if last_usage:
+    st.sidebar.caption(
+        f"Last call tokens — prompt {last_usage['prompt_tokens']} "
+        f"(cached {last_usage['cached_tokens']}) · completion {last_usage['completion_tokens']}"
+    )
+
+# Debug: where the last run spent its time (model vs. rendering vs. I/O)
+if st.sidebar.checkbox("Show timing breakdown", value=False, key="debug_timings"):
+    trace = st.session_state.get("last_trace")
+    if trace is None or trace.total_ms is None:
+        st.sidebar.caption("No finished run yet.")
+    else:
+        run = trace.as_dict()
+        st.sidebar.caption(f"Last run: {run['total_ms']:.0f} ms ({run['status']})")
+        st.sidebar.dataframe(
+            [{"stage": name, "ms": ms} for name, ms in run["breakdown"].items()],
+            hide_index=True,
+        )
+        openai_calls = [s for s in run["stages"] if s["stage"] == "openai"]
+        ttft = [s["ttft_ms"] for s in openai_calls if s.get("ttft_ms") is not None]
+        if ttft:
+            st.sidebar.caption(f"Time to first token: {ttft[0]:.0f} ms")
+        if run["connections"]:
+            st.sidebar.caption(
+                "Model connections — " + " · ".join(f"{k} {v}" for k, v in run["connections"].items())
+            )
+        if run["tokens"]:
+            st.sidebar.caption(
+                "Tokens — " + " · ".join(f"{k.replace('_tokens', '')} {v}" for k, v in run["tokens"].items())
+            )
+
+# Main layout: left = existing inputs/buttons, right = preview
+left, right = st.columns([1, 1])
+
+with left:
+    # Inputs
+    resume_template_text = st.text_area("Paste Your Resume Template", height=250, disabled=disabled_state)
+    custom_prompt = st.text_area("Custom Prompt", height=200, value=DEFAULT_PROMPT, disabled=disabled_state)
+    job_description = st.text_area("Paste the Job Description", height=300, disabled=disabled_state)
+    include_tech = st.checkbox("Include Technologies per Position", value=True, disabled=disabled_state)
+    output_format = st.selectbox("Output Format", list(OUTPUT_EXTENSIONS), disabled=disabled_state)
+    fit_pages = st.selectbox(
+        "Fit to pages",
+        list(FIT_PAGES),
+        disabled=disabled_state,
+        help="Shrinks fonts, line spacing and gaps (and drops the least important bullets if needed) to fit the page count.",
+    )
+    save_copy = st.checkbox("Also save a copy to outputs/", value=False, disabled=disabled_state)
+
+    # Buttons on main page
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.button("✅ Generate Tailored Resume", on_click=request_generation, disabled=disabled_state)
+
+    with col2:
+        if st.button("🔄 Reset App", key="reset_normal", disabled=st.session_state["loading"]):
+            st.session_state.clear()
+            st.rerun()
+
+    with col3:
+        # ✅ Only visible while loading; disappears automatically after completion
+        if st.session_state.get("loading", False):
+            task = st.session_state.get("generation")
+            st.button("🛑 Stop Generating", on_click=stop_generation, disabled=task is not None and task.cancel_token.cancelled)
+
+    # Success + download button (this stays after completion; spinner/stop won’t)
+    if st.session_state.get("last_error"):
+        st.error(f"❌ Something went wrong: {st.session_state['last_error']}")
+    result = st.session_state.get("last_result")
+    if result:
+        st.success(f"✅ Resume tailored successfully! ({result['format']})")
+        st.download_button(
+            f"Download Tailored Resume ({result['format']})",
+            result["data"],
+            file_name=f"{result['user_name']}.{result['extension']}",
+        )
+        update = st.session_state.get("last_update")
+        if update:
+            if update["mode"] == "unchanged":
+                st.caption("Inputs unchanged: reused the previous result.")
+            else:
+                st.caption(f"Regenerated only {', '.join(update['regenerated'])} ({'; '.join(update['reasons'])}).")
+        fit = result.get("fit")
+        if fit:
+            if fit["fits"]:
+                st.caption(
+                    f"Fitted to {fit['page_count']} page(s): body {fit['styles'].get('body_size', styles_config.get('body_size'))} pt"
+                    + (f", {len(fit['dropped_bullets'])} bullet(s) dropped" if fit["dropped_bullets"] else "")
+                )
+            else:
+                st.warning(f"Could not fit into {fit['pages']} page(s); the smallest layout needs {fit['page_count']}.")
+
+# ----------------------- preview -----------------------
+
+ALIGN_OPTIONS = ["Left", "Center", "Right", "Justify"]
+
+def style_section(label, container):
+    key = label.lower()
+    container.markdown(f"**{label}**")
+    return {
+        f"{key}_bold": container.checkbox(f"{label} Bold", key=f"style_{key}_bold"),
+        f"{key}_italic": container.checkbox(f"{label} Italic", key=f"style_{key}_italic"),
+        f"{key}_align": container.selectbox(f"{label} Align", ALIGN_OPTIONS, key=f"style_{key}_align"),
+    }
+
+def style_settings():
+    with st.expander("🎨 Style Settings"):
+        sizes, flags = st.columns(2)
+        config = {
+            "title_size": sizes.slider("Title Font Size", 14, 28, key="style_title_size"),
+            "heading_size": sizes.slider("Heading Font Size", 12, 20, key="style_heading_size"),
+            "subheading_size": sizes.slider("Subheading Font Size", 10, 16, key="style_subheading_size"),
+            "body_size": sizes.slider("Body Font Size", 8, 14, key="style_body_size"),
+        }
+        config.update(style_section("Title", flags))
+        config.update(style_section("Contact", flags))
+        config.update(style_section("Heading", sizes))
+        config.update(style_section("Subheading", flags))
+        config.update(style_section("Body", sizes))
+    return config
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_preview_html(tailored_hash, styles_json, _tailored):
+    # keyed on (tailored hash, styles); _tailored is not hashed by Streamlit
+    return render_preview_html(_tailored, json.loads(styles_json))
+
+@st.fragment
+def preview_panel():
+    # Style tweaks only rerun this fragment, not the whole script.
+    config = style_settings()
+    st.session_state["styles_config"] = config
+    tailored = st.session_state.get("tailored_json")
+    if st.session_state.get("live_preview") and tailored:
+        if st.session_state.get("tailored_hash") is None:
+            st.session_state["tailored_hash"] = hashlib.sha1(json.dumps(tailored, sort_keys=True).encode("utf-8")).hexdigest()
+        html = cached_preview_html(st.session_state["tailored_hash"], json.dumps(config, sort_keys=True), tailored)
+        st.markdown(html, unsafe_allow_html=True)
+    else:
+        st.info("Generate once to enable live preview of your current styles.")
+
+with right:
+    st.subheader("🔎 Preview")
+    if st.session_state.get("generate_requested"):
+        start_generation()
+    task = st.session_state.get("generation")
+    if task is not None and not task.done:
+        # poll the background run; the Stop button stays live in between
+        with st.spinner("Generating your tailored resume..."):
+            if task.partial and st.session_state.get("live_preview"):
+                st.markdown(render_preview_html(task.partial, styles_config, partial=True), unsafe_allow_html=True)
+            time.sleep(0.3)
+        st.rerun()
+    elif task is not None:
+        collect_generation(task)
+        st.rerun()
+    else:
+        preview_panel()
@@ -0,0 +1,143 @@
+"""
+Streaming zip archive for large batch exports, with a JSONL manifest.
+
+    with ArchiveWriter("outputs/batch.zip") as archive:
+        for job_id, tailored, files in results:          # files: {fmt: bytes}
+            archive.add_result(tailored, files, key=job_id, input_hash=h, render_ms=ms)
+
+Each document is compressed into the zip as soon as it is added and then
+dropped, so memory holds only the documents being added, whatever the batch
+size (zipfile keeps under 1 KB of central directory per entry). The manifest
+(manifest.jsonl: id, input_hash, name, format, path, bytes and timings per
+document) is spooled to a temporary file and becomes the last entry.
+
+The writer does not need to seek, so the target can be a path (written as .part and
+renamed on close), any writable binary stream (a pipe, a socket,
+sys.stdout.buffer) or None. With None the zip bytes collect in a buffer that
+take() empties, which is how the job service streams an archive as an HTTP
+body while it is still being produced.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from resume_logic import build_header_from_json
+
+MANIFEST = "manifest.jsonl"
+STORED = ("docx",)  # already a deflated container: compressing again only costs time
+SPOOL_BYTES = 1 << 20  # manifest lines kept in memory before spilling to disk
+
+
+def input_hash(*texts):
+    """Short stable hash of the texts a result was generated from."""
+    return hashlib.sha256("\0".join(t or "" for t in texts).encode("utf-8")).hexdigest()[:16]
+
+
+class _Buffer:
+    """Write-only, non-seekable byte buffer drained by take()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class ArchiveWriter:
+    def __init__(self, target=None):
+        self.path = None
+        self._buffer = None
+        if target is None:
+            self._fp = self._buffer = _Buffer()
+        elif hasattr(target, "write"):
+            self._fp = target
+        else:
+            self.path = target
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            self._fp = open(target + ".part", "wb")
+        self._zip = zipfile.ZipFile(self._fp, "w", zipfile.ZIP_DEFLATED)
+        self._manifest = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self._paths = set()
+        self._lock = threading.Lock()  # batch renders add from worker threads
+        self.documents = 0
+        self.bytes = 0  # uncompressed document bytes
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _unique(self, path):
+        stem, dot, ext = path.rpartition(".")
+        n = 1
+        while path in self._paths:
+            n += 1
+            path = f"{stem}-{n}{dot}{ext}"
+        self._paths.add(path)
+        return path
+
+    def add_record(self, entry):
+        """Append a manifest line without a document (e.g. a failed job)."""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._manifest.write(line)
+
+    def add_document(self, tailored, fmt, data, key=None, input_hash=None, **info):
+        """Write one rendered document plus its manifest line; returns the manifest entry."""
+        from export import bundle_basename
+
+        name, _ = build_header_from_json(tailored)
+        folder = key or input_hash
+        filename = f"{bundle_basename(tailored)}.{fmt}"
+        with self._lock:
+            path = self._unique(f"{folder}/{filename}" if folder else filename)
+            compress = zipfile.ZIP_STORED if fmt in STORED else zipfile.ZIP_DEFLATED
+            self._zip.writestr(path, data, compress)
+            self.documents += 1
+            self.bytes += len(data)
+        entry = {"id": key, "input_hash": input_hash, "name": name, "format": fmt, "path": path,
+                 "bytes": len(data), **info}
+        self.add_record(entry)
+        return entry
+
+    def add_result(self, tailored, files, key=None, input_hash=None, render_ms=None, **info):
+        """add_document for every format of one result ({fmt: bytes}); returns the manifest entries."""
+        return [
+            self.add_document(tailored, fmt, data, key, input_hash,
+                              **({"render_ms": render_ms[fmt]} if render_ms and fmt in render_ms else {}), **info)
+            for fmt, data in files.items()
+        ]
+
+    def take(self):
+        """Zip bytes produced since the last take() (only for target=None)."""
+        with self._lock:
+            return self._buffer.take() if self._buffer is not None else b""
+
+    def close(self):
+        """Write the manifest and the central directory; a path target is renamed into place."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._manifest.seek(0)
+            with self._zip.open(MANIFEST, "w") as out:
+                shutil.copyfileobj(self._manifest, out)
+            self._manifest.close()
+            self._zip.close()
+            if self.path is not None:
+                self._fp.close()
+                os.replace(self.path + ".part", self.path)  # readers never see a half-written archive
@@ -0,0 +1,392 @@
+"""
+Concurrent batch tailoring driven by a JSONL job file.
+
+Each input line is one job:
+    {"id": "acme-sre", "job_description": "...", "custom_prompt": "...", "resume": "..."}
+Only job_description is required; id defaults to a hash of the line, resume
+defaults to --resume and custom_prompt to --custom-prompt (or DEFAULT_PROMPT).
+
+Results are appended to --out as JSONL in completion order. Re-running with
+the same --out skips jobs that already finished successfully (and jobs
+already filtered at the same --min-score, or already scored by --score-only),
+so a crashed run can simply be restarted.
+
+With --export-dir every successful result is also rendered to DOCX, PDF and
+HTML (in parallel worker processes) and written as <id>.zip. For large
+batches, --archive instead streams every rendered document into one zip as
+soon as it is ready (see archive.py), with a manifest.jsonl of input hashes,
+names, sizes and timings; memory stays at a few documents whatever the batch
+size. The archive is rebuilt on every run: results finished by an earlier run
+are re-rendered from --out, without model calls.
+
+With --profile each distinct base resume is parsed once into a stored
+profile and jobs only generate the tailored sections (see profile_store.py).
+
+With --min-score every job is first scored locally against its resume
+(skill coverage + TF-IDF similarity, see job_scoring.py). Jobs below the
+threshold are written as "filtered" without any model call, and the rest run
+best match first. Each record carries its "match" scores. --score-only writes
+the ranked scores and makes no model calls at all.
+
+Usage:
+    python batch_runner.py jobs.jsonl --resume assets/resume_template.txt \
+        --out outputs/batch.jsonl --concurrency 8 --rpm 500 --tpm 200000 --min-score 0.3 \
+        --archive outputs/batch.zip
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+
+from resume_logic import DEFAULT_PROMPT, build_messages, estimate_tokens, tailor_resume_async
+
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 units per second, up to per_minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount):
+        # Settle the difference once real usage is known; may go negative,
+        # which simply delays the next acquire.
+        self._refill()
+        self.tokens -= amount
+
+
+def _is_retryable(exc):
+    import openai
+
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def load_jobs(path):
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            job.setdefault("id", hashlib.sha1(line.encode("utf-8")).hexdigest()[:12])
+            jobs.append(job)
+    return jobs
+
+
+def finished_records(out_path, statuses=("ok",)):
+    """Records of earlier runs with one of statuses, read one line at a time."""
+    if not os.path.exists(out_path):
+        return
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from a crash
+            if record.get("status") in statuses:
+                yield record
+
+
+def finished_ids(out_path, statuses=("ok",)):
+    return {record["id"] for record in finished_records(out_path, statuses)}
+
+
+RENDER_SLOTS = 2  # results rendered for --archive at once: bounds documents held in memory
+
+
+class BatchRunner:
+    def __init__(self, base_resume, custom_prompt=None, concurrency=8, rpm=500, tpm=200_000,
+                 max_retries=5, expected_output_tokens=4000, use_cache=True, client=None,
+                 export_dir=None, formats=None, include_tech=True, styles_config=None,
+                 min_score=None, score_only=False, archive=None, profile=None):
+        self.base_resume = base_resume
+        self.custom_prompt = DEFAULT_PROMPT if custom_prompt is None else custom_prompt
+        self.concurrency = concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.expected_output_tokens = expected_output_tokens
+        self.use_cache = use_cache
+        self.client = client
+        self.export_dir = export_dir
+        self.formats = formats
+        self.include_tech = include_tech
+        self.styles_config = styles_config
+        self.min_score = min_score
+        self.score_only = score_only
+        self.archive = archive
+        self.profile = profile
+
+    def _job_inputs(self, job):
+        resume = job.get("resume") or self.base_resume
+        prompt = job.get("custom_prompt", self.custom_prompt)
+        return resume, job["job_description"], prompt
+
+    def _settled(self, record):
+        """Whether an earlier record already answers its job under this run's options."""
+        if record["status"] == "scored":
+            return self.score_only
+        if record["status"] == "filtered":
+            # scoring again at the same threshold gives the same answer
+            return (not self.score_only and self.min_score is not None
+                    and record.get("min_score", self.min_score) == self.min_score)
+        return True
+
+    def _score(self, jobs):
+        """Match scores per job id, scored in one batch per distinct resume."""
+        from job_scoring import score_jobs
+
+        groups = {}
+        for job in jobs:
+            groups.setdefault(self._job_inputs(job)[0], []).append(job)
+        scores = {}
+        for resume, group in groups.items():
+            for job, score in zip(group, score_jobs(resume, [job["job_description"] for job in group])):
+                scores[job["id"]] = score
+        return scores
+
+    async def _run_job(self, job):
+        resume, jd, prompt = self._job_inputs(job)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in build_messages(resume, jd, prompt))
+        reserved = prompt_tokens + self.expected_output_tokens
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            attempt += 1
+            await self.requests.acquire(1)
+            await self.tokens.acquire(reserved)
+            try:
+                tailored, info = await tailor_resume_async(
+                    resume, jd, prompt, use_cache=self.use_cache, client=self.client, with_info=True,
+                    profile=self.profile,
+                )
+                used = info["usage"].get("total_tokens", 0 if info["cache"] == "hit" else reserved)
+                self.tokens.debit(used - reserved)
+                return {
+                    "id": job["id"],
+                    "status": "ok",
+                    "attempts": attempt,
+                    "elapsed": round(time.perf_counter() - started, 3),
+                    "cache": info["cache"],
+                    "usage": info["usage"],
+                    "tailored": tailored,
+                }
+            except Exception as e:
+                if attempt > self.max_retries or not _is_retryable(e):
+                    return {
+                        "id": job["id"],
+                        "status": "error",
+                        "attempts": attempt,
+                        "elapsed": round(time.perf_counter() - started, 3),
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                # exponential backoff with full jitter, honouring Retry-After
+                delay = random.uniform(0, min(60.0, 2 ** attempt))
+                delay = max(delay, _retry_after(e) or 0)
+                await asyncio.sleep(delay)
+
+    async def _export(self, record):
+        # Rendering is CPU-bound; export_bundle fans the formats out to worker
+        # processes and to_thread keeps the event loop free meanwhile.
+        from export import FORMATS, export_bundle
+
+        data = await asyncio.to_thread(
+            export_bundle, record["tailored"], self.formats or FORMATS, self.include_tech, self.styles_config
+        )
+        path = os.path.join(self.export_dir, f"{record['id']}.zip")
+        with open(path, "wb") as f:
+            f.write(data)
+        record["export"] = path
+
+    async def _archive(self, archive, record, job, slots):
+        # render, then compress into the archive; both off the event loop
+        from archive import input_hash
+        from export import FORMATS, export_formats
+
+        async with slots:
+            files, info = await asyncio.to_thread(
+                export_formats, record["tailored"], self.formats or FORMATS, self.include_tech, self.styles_config,
+                with_info=True,
+            )
+            await asyncio.to_thread(
+                archive.add_result, record["tailored"], files, key=record["id"],
+                input_hash=input_hash(*self._job_inputs(job)), render_ms=info["render_ms"],
+                elapsed_s=record.get("elapsed"), cache=record.get("cache"),
+            )
+        record["archive"] = archive.path
+
+    async def run(self, jobs, out_path):
+        done = {record["id"] for record in finished_records(out_path, ("ok", "filtered", "scored"))
+                if self._settled(record)}
+        pending = [job for job in jobs if job["id"] not in done]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "ok": 0, "error": 0}
+
+        scores, filtered = {}, []
+        if self.min_score is not None or self.score_only:
+            # local triage before any model call: best matches first
+            scores = self._score(pending)
+            pending.sort(key=lambda job: -scores[job["id"]]["score"])
+            if self.score_only:
+                filtered, pending = pending, []
+            elif self.min_score is not None:
+                filtered = [job for job in pending if scores[job["id"]]["score"] < self.min_score]
+                pending = [job for job in pending if scores[job["id"]]["score"] >= self.min_score]
+            summary["scored" if self.score_only else "filtered"] = len(filtered)
+
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        if self.export_dir:
+            os.makedirs(self.export_dir, exist_ok=True)
+        archive = None
+        if self.archive:
+            from archive import ArchiveWriter
+
+            archive = ArchiveWriter(self.archive)
+            summary["archive_errors"] = 0
+        slots = asyncio.Semaphore(RENDER_SLOTS)
+        by_id = {job["id"]: job for job in jobs}
+
+        async def rearchive():
+            # results of earlier runs, streamed from --out one record at a time
+            for record in finished_records(out_path):
+                if record["id"] in by_id and record["id"] in done:
+                    done.discard(record["id"])  # once, even if --out has it twice
+                    try:
+                        await self._archive(archive, record, by_id[record["id"]], slots)
+                    except Exception as e:
+                        # stdout carries only the summary: the failure goes into the manifest
+                        archive.add_record({"id": record["id"], "status": "error",
+                                            "error": f"{type(e).__name__}: {e}"})
+                        summary["archive_errors"] += 1
+
+        with open(out_path, "a", encoding="utf-8") as out:
+            for job in filtered:
+                record = {"id": job["id"], "status": "scored" if self.score_only else "filtered",
+                          "match": scores[job["id"]]}
+                if not self.score_only:
+                    record["min_score"] = self.min_score
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+            async def worker(job):
+                async with semaphore:
+                    record = await self._run_job(job)
+                if job["id"] in scores:
+                    record["match"] = scores[job["id"]]
+                if self.export_dir and record["status"] == "ok":
+                    try:
+                        await self._export(record)
+                    except Exception as e:
+                        record["export_error"] = f"{type(e).__name__}: {e}"
+                if archive is not None and record["status"] == "ok":
+                    try:
+                        await self._archive(archive, record, job, slots)
+                    except Exception as e:
+                        record["archive_error"] = f"{type(e).__name__}: {e}"
+                        archive.add_record({"id": record["id"], "status": "error", "error": record["archive_error"]})
+                        summary["archive_errors"] += 1
+                # single event loop thread: writes never interleave
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                summary[record["status"]] += 1
+
+            try:
+                await asyncio.gather(*(worker(job) for job in pending), *([rearchive()] if archive else []))
+            finally:
+                if archive is not None:
+                    # also on failure: whatever was rendered stays a valid zip
+                    await asyncio.to_thread(archive.close)
+                    summary["archived"] = archive.documents
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jobs", help="JSONL file with one job per line")
+    parser.add_argument("--resume", required=True, help="base resume text file")
+    parser.add_argument("--custom-prompt", help="file with custom prompt rules (default: DEFAULT_PROMPT)")
+    parser.add_argument("--out", default="outputs/batch_results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=500, help="requests per minute")
+    parser.add_argument("--tpm", type=int, default=200_000, help="tokens per minute")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--expected-output-tokens", type=int, default=4000)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--export-dir", help="also render each result into <id>.zip here")
+    parser.add_argument("--formats", default="docx,pdf,html", help="comma-separated formats for --export-dir/--archive")
+    parser.add_argument("--archive", help="stream every rendered result into this one zip (+ manifest.jsonl)")
+    parser.add_argument("--no-tech", action="store_true", help="omit per-position Technologies in exports")
+    parser.add_argument("--profile", action="store_true",
+                        help="parse each base resume once and generate only the tailored sections")
+    parser.add_argument("--min-score", type=float, help="skip jobs whose local match score (0-1) is below this")
+    parser.add_argument("--score-only", action="store_true", help="only write ranked match scores, no model calls")
+    args = parser.parse_args()
+
+    with open(args.resume, encoding="utf-8") as f:
+        base_resume = f.read()
+    custom_prompt = None
+    if args.custom_prompt:
+        with open(args.custom_prompt, encoding="utf-8") as f:
+            custom_prompt = f.read()
+
+    from resume_logic import get_async_client
+
+    runner = BatchRunner(
+        base_resume,
+        custom_prompt=custom_prompt,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_retries=args.max_retries,
+        expected_output_tokens=args.expected_output_tokens,
+        use_cache=not args.no_cache,
+        # retries are handled here, with the rate limiter in the loop
+        client=get_async_client().with_options(max_retries=0),
+        export_dir=args.export_dir,
+        formats=[f.strip() for f in args.formats.split(",") if f.strip()],
+        include_tech=not args.no_tech,
+        min_score=args.min_score,
+        score_only=args.score_only,
+        archive=args.archive,
+        profile=args.profile or None,
+    )
+    summary = asyncio.run(runner.run(load_jobs(args.jobs), args.out))
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Cold vs. warm model request latency through llm_backend.
+
+Starts benchmarks/stub_server.py on a local port (or uses --base-url) and
+sends sequential chat completions:
+
+  - pooled:  one shared backend, as the app and batch runner use it; the first
+             request opens the connection (cold), the rest reuse it (warm)
+  - fresh:   a new backend per request, i.e. a handshake every time
+
+It prints latency percentiles for each and the new/reused connection counts
+reported by metrics.
+
+Usage:
+    python benchmarks/backend_latency.py [--requests 50] [--ttft-ms 20] [--base-url URL]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+import metrics  # noqa: E402
+from fake_backend import FakeBackend  # noqa: E402
+from llm_backend import LLMBackend  # noqa: E402
+from stub_server import serve  # noqa: E402
+
+MESSAGES = [{"role": "system", "content": "bench"}, {"role": "user", "content": "ping"}]
+
+
+def one_request(backend):
+    t0 = time.perf_counter()
+    backend.client.chat.completions.create(
+        model=backend.model, messages=MESSAGES, response_format={"type": "json_object"}
+    )
+    return (time.perf_counter() - t0) * 1000
+
+
+def describe(label, samples):
+    ordered = sorted(samples)
+    p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    print(f"{label:16} n={len(ordered):3}  p50 {p(0.5):8.2f} ms  p90 {p(0.9):8.2f} ms  "
+          f"mean {statistics.fmean(ordered):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--ttft-ms", type=float, default=20.0, help="stand-in server latency")
+    parser.add_argument("--base-url", help="use an already running OpenAI-compatible server")
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if not base_url:
+        _, base_url = serve(0, FakeBackend(positions=1, bullets=5, technologies=10, ttft_ms=args.ttft_ms))
+
+    pooled = LLMBackend(base_url=base_url, max_retries=0)
+    samples = [one_request(pooled) for _ in range(args.requests)]
+    pooled.close()
+    describe("pooled cold", samples[:1])
+    describe("pooled warm", samples[1:])
+
+    fresh = []
+    for _ in range(args.requests):
+        backend = LLMBackend(base_url=base_url, max_retries=0)
+        fresh.append(one_request(backend))
+        backend.close()
+    describe("fresh client", fresh)
+
+    print()
+    for line in metrics.prometheus_text().splitlines():
+        if line.startswith(("resume_llm_requests_total", "resume_llm_headers_seconds_sum",
+                            "resume_llm_headers_seconds_count")):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Peak memory of batch exports: one streamed archive vs. collecting bundles.
+
+Renders a medium fixture once (DOCX, PDF, HTML), then exports it N times per
+batch size:
+
+  - bundles: export_bundle-style zips collected in memory, one per result
+    (what holding every result until the end costs)
+  - archive: archive.ArchiveWriter to a file, each result written and dropped
+  - stream:  ArchiveWriter(None) drained with take() after every result, as
+             the job service's GET /archive does
+
+Peak memory is measured with tracemalloc. Expect bundles to grow linearly
+with N and both archive modes to stay flat.
+
+Usage:
+    python benchmarks/bench_archive.py [--sizes 100,500,2000]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+from fixtures import synthetic_size  # noqa: E402
+
+
+def bundles(tailored, files, n, _):
+    kept = []
+    for _ in range(n):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for fmt, data in files.items():
+                zf.writestr(f"resume.{fmt}", data)
+        kept.append(buf.getvalue())
+    return sum(map(len, kept))
+
+
+def archive(tailored, files, n, path):
+    from archive import ArchiveWriter
+
+    with ArchiveWriter(path) as writer:
+        for i in range(n):
+            writer.add_result(tailored, files, key=f"job{i}", input_hash="bench")
+    return os.path.getsize(path)
+
+
+def stream(tailored, files, n, _):
+    from archive import ArchiveWriter
+
+    writer, size = ArchiveWriter(), 0
+    for i in range(n):
+        writer.add_result(tailored, files, key=f"job{i}", input_hash="bench")
+        size += len(writer.take())  # a real server sends this chunk and forgets it
+    writer.close()
+    return size + len(writer.take())
+
+
+def measure(mode, tailored, files, n, path):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = mode(tailored, files, n, path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,500,2000", help="comma-separated batch sizes")
+    args = parser.parse_args()
+
+    from export import export_formats
+
+    tailored = synthetic_size("medium")
+    files = export_formats(tailored, parallel=False)
+    print(f"per result: {sum(map(len, files.values())) / 1024:.0f} KiB ({', '.join(files)})")
+    print(f"{'mode':<8} {'results':>8} {'peak MiB':>9} {'output MiB':>11} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            for name, mode in (("bundles", bundles), ("archive", archive), ("stream", stream)):
+                peak, size, elapsed = measure(mode, tailored, files, n, os.path.join(tmp, f"{name}-{n}.zip"))
+                print(f"{name:<8} {n:>8} {peak / 2**20:>9.1f} {size / 2**20:>11.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
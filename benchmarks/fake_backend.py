@@ -0,0 +1,213 @@
+"""
+Stand-in for the OpenAI client so benchmarks run offline.
+
+    backend = FakeBackend(ttft_ms=300, tokens_per_sec=80)
+    install(backend)                   # tailor_resume & co now talk to it
+    ...
+    uninstall()
+
+It implements the subset of chat.completions.create the app uses (JSON
+mode, stream=True with a final usage chunk) for both the sync and the async
+client. Responses are replayed from recorded JSON (`responses=`, or
+load_recorded(path)) or generated with benchmarks.fixtures, and latency is
+modelled as time-to-first-token plus completion tokens / tokens_per_sec.
+ttft_dist= injects a latency distribution instead of a fixed TTFT, e.g.
+long_tail(300, 8000, 0.05) for a 5% share of very slow first tokens.
+Streams can be closed mid-generation like the SDK's, which stops them.
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from fixtures import profile_from, synthetic_tailored
+
+
+def load_recorded(path):
+    """Tailored JSON responses from a .jsonl file or a directory of .json files."""
+    if os.path.isdir(path):
+        out = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    out.append(json.load(f))
+        return out
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def long_tail(base_ms, slow_ms, slow_fraction, spread=0.2):
+    """TTFT distribution: mostly around base_ms, slow_fraction of draws around slow_ms."""
+
+    def draw(rng):
+        center = slow_ms if rng.random() < slow_fraction else base_ms
+        return center * (1 + rng.uniform(-spread, spread))
+
+    return draw
+
+
+def _position_index(messages):
+    """Which position a fan-out request asks for (see fanout._position_suffix)."""
+    matches = re.findall(r"Write (?:the most recent position|position (\d+) of \d+):", messages[-1]["content"])
+    return int(matches[-1]) - 1 if matches and matches[-1] else 0
+
+
+def _usage(prompt_tokens, completion_tokens):
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+    )
+
+
+class FakeBackend:
+    """Sync fake: client.chat.completions.create(...) like openai.OpenAI."""
+
+    def __init__(self, responses=None, ttft_ms=0.0, tokens_per_sec=None, jitter=0.0, seed=0,
+                 chunk_chars=24, ttft_dist=None, **fixture_size):
+        self.responses = itertools.cycle(responses or [synthetic_tailored(seed=seed, **fixture_size)])
+        self.ttft = ttft_ms / 1000
+        self.tokens_per_sec = tokens_per_sec
+        self.jitter = jitter
+        self.chunk_chars = chunk_chars
+        self.ttft_dist = ttft_dist
+        self.calls = 0
+        self.closed = 0  # streams closed before they finished
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, **_):
+        return self
+
+    # ----------------------- response content -----------------------
+
+    def _content(self, messages):
+        from fanout import PLAN_PROMPT, POSITION_PROMPT
+        from incremental import UPDATE_PROMPT
+        from profile_store import PARSE_PROMPT, PROFILE_PROMPT
+        from schema import SECTION_SCHEMAS
+
+        with self._lock:
+            self.calls += 1
+            tailored = next(self.responses)
+            scale = 1 + self._rng.uniform(-self.jitter, self.jitter)
+            ttft = self.ttft_dist(self._rng) / 1000 if self.ttft_dist else self.ttft
+        system = messages[0]["content"] if messages else ""
+        if system == PLAN_PROMPT:
+            plan = {k: v for k, v in tailored.items() if k != "Experience"}
+            plan["Plan"] = [{k: job.get(k) for k in ("Company", "Title", "Dates")} for job in tailored["Experience"]]
+            body = plan
+        elif system == POSITION_PROMPT:
+            job = tailored["Experience"][_position_index(messages) % len(tailored["Experience"])]
+            body = {"Responsibilities": job["Responsibilities"], "Technologies": job.get("Technologies", [])}
+        elif system == PARSE_PROMPT:
+            body = profile_from(tailored)
+        elif system == PROFILE_PROMPT:
+            body = {"Summary": tailored["Summary"], "Skills": tailored["Skills"], "Experience": [
+                {"Responsibilities": job["Responsibilities"], "Technologies": job.get("Technologies", [])}
+                for job in tailored["Experience"]
+            ]}
+        else:
+            # a single-section update returns just that section
+            updates = {UPDATE_PROMPT.format(schema=schema): section for section, schema in SECTION_SCHEMAS.items()}
+            body = {updates[system]: tailored[updates[system]]} if system in updates else tailored
+        content = json.dumps(body, ensure_ascii=False)
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        return content, prompt_tokens, max(len(content) // 4, 1), (ttft, scale)
+
+    def _delays(self, completion_tokens, timing):
+        ttft, scale = timing
+        generation = completion_tokens / self.tokens_per_sec if self.tokens_per_sec else 0.0
+        return ttft * scale, generation * scale
+
+    def _chunks(self, content):
+        for i in range(0, len(content), self.chunk_chars):
+            delta = SimpleNamespace(content=content[i: i + self.chunk_chars])
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    # ----------------------- API -----------------------
+
+    def create(self, model=None, messages=(), stream=False, **_):
+        content, prompt_tokens, completion_tokens, timing = self._content(messages)
+        ttft, generation = self._delays(completion_tokens, timing)
+        if stream:
+            return self._stream(content, prompt_tokens, completion_tokens, ttft, generation)
+        time.sleep(ttft + generation)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=_usage(prompt_tokens, completion_tokens))
+
+    def _stream(self, content, prompt_tokens, completion_tokens, ttft, generation):
+        return FakeStream(self, list(self._chunks(content)), _usage(prompt_tokens, completion_tokens), ttft, generation)
+
+
+class FakeStream:
+    """Iterable of chunks with close(), like openai.Stream; closing stops it (from any thread)."""
+
+    def __init__(self, backend, chunks, usage, ttft, generation):
+        self._backend = backend
+        self._chunks = chunks
+        self._usage = usage
+        self._ttft = ttft
+        self._step = generation / max(len(chunks), 1)
+        self._closed = threading.Event()
+        self._finished = False
+
+    def _wait(self, seconds):
+        if self._closed.wait(seconds) if seconds > 0 else self._closed.is_set():
+            raise ConnectionError("stream closed")
+
+    def __iter__(self):
+        self._wait(self._ttft)
+        for chunk in self._chunks:
+            yield chunk
+            self._wait(self._step)
+        self._finished = True
+        yield SimpleNamespace(usage=self._usage, choices=[])
+
+    def close(self):
+        if not self._finished and not self._closed.is_set():
+            with self._backend._lock:
+                self._backend.closed += 1
+        self._closed.set()
+
+
+class AsyncFakeBackend(FakeBackend):
+    """Async fake: await client.chat.completions.create(...) like openai.AsyncOpenAI."""
+
+    async def create(self, model=None, messages=(), stream=False, **_):
+        content, prompt_tokens, completion_tokens, timing = self._content(messages)
+        ttft, generation = self._delays(completion_tokens, timing)
+        await asyncio.sleep(ttft + generation)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=_usage(prompt_tokens, completion_tokens))
+
+
+_saved = None
+
+
+def install(backend=None, async_backend=None):
+    """Route resume_logic's shared clients to the fakes (defaults: FakeBackend())."""
+    global _saved
+    import resume_logic
+
+    if _saved is None:
+        _saved = (resume_logic._client, resume_logic._async_client)
+    resume_logic._client = backend or FakeBackend()
+    resume_logic._async_client = async_backend or AsyncFakeBackend()
+    return resume_logic._client
+
+
+def uninstall():
+    global _saved
+    import resume_logic
+
+    if _saved is not None:
+        resume_logic._client, resume_logic._async_client = _saved
+        _saved = None
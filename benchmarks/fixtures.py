@@ -0,0 +1,112 @@
+"""
+Synthetic tailored-resume fixtures for benchmarks.
+
+    tailored = synthetic_tailored(positions=5, bullets=20, technologies=30, seed=1)
+    resume_text = resume_text_from(tailored)
+    jd = synthetic_job_description(seed=1)
+
+Output is deterministic for a given seed and follows the schema that
+tailor_resume returns, so it can be fed straight to the renderers or replayed
+by the fake backend.
+"""
+import random
+
+WORDS = (
+    "designed built scaled deployed optimized migrated automated refactored led mentored "
+    "microservices pipelines dashboards APIs services platform infrastructure monitoring "
+    "latency throughput reliability observability availability security compliance cost "
+    "distributed event-driven real-time batch streaming cloud-native containerized serverless "
+    "customers teams stakeholders engineers product analytics payments search checkout"
+).split()
+
+TECHNOLOGIES = (
+    "Python Java Go TypeScript JavaScript React Node.js Django Flask FastAPI Spring Kafka "
+    "RabbitMQ PostgreSQL MySQL Redis MongoDB Elasticsearch Docker Kubernetes Terraform AWS "
+    "GCP Azure Lambda S3 DynamoDB BigQuery Airflow Spark Pandas NumPy GraphQL gRPC REST "
+    "Jenkins GitHub-Actions ArgoCD Prometheus Grafana Datadog Sentry Nginx Linux Bash Git "
+    "Jira Figma Snowflake dbt Celery pytest Jest Cypress Playwright OpenTelemetry Vault Helm"
+).split()
+
+SIZES = {
+    "small": {"positions": 1, "bullets": 5, "technologies": 10},
+    "medium": {"positions": 5, "bullets": 20, "technologies": 30},
+    "large": {"positions": 10, "bullets": 30, "technologies": 60},
+}
+
+
+def _sentence(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def synthetic_tailored(positions=5, bullets=20, technologies=30, seed=0):
+    """A tailored resume dict with the given number of positions, bullets each and technologies each."""
+    rng = random.Random(seed)
+    techs = [TECHNOLOGIES[i % len(TECHNOLOGIES)] + ("" if i < len(TECHNOLOGIES) else f" {i}")
+             for i in range(max(technologies, 1))]
+    experience = []
+    for p in range(positions):
+        start = 2023 - 2 * (p + 1)
+        experience.append({
+            "Company": f"Company {p + 1}",
+            "Title": rng.choice(["Software Engineer", "Senior Software Engineer", "Staff Engineer", "Tech Lead"]),
+            "Dates": f"{start} - {start + 2}",
+            "Responsibilities": [_sentence(rng, rng.randint(20, 40)) for _ in range(bullets)],
+            "Technologies": rng.sample(techs, technologies) if technologies <= len(techs) else techs,
+        })
+    return {
+        "Header": {
+            "Name": "Jordan Example",
+            "Email": "jordan@example.com",
+            "Phone": "+1 555 0100",
+            "Address": "Austin, TX",
+            "Links": ["linkedin.com/in/jordan-example", "github.com/jordan-example"],
+        },
+        "Summary": " ".join(_sentence(rng, rng.randint(15, 25)) for _ in range(3)),
+        "Skills": {
+            category: rng.sample(techs, min(8, len(techs)))
+            for category in ("Languages", "Frameworks", "Cloud", "Data", "Tooling")
+        },
+        "Experience": experience,
+        "Education": {
+            "Dates": "2009 - 2013",
+            "Degree": "B.S. Computer Science",
+            "Institution": "State University",
+            "GPA": "3.7",
+        },
+    }
+
+
+def synthetic_size(name, seed=0):
+    """synthetic_tailored() for one of the named SIZES."""
+    return synthetic_tailored(seed=seed, **SIZES[name])
+
+
+def resume_text_from(tailored):
+    """Plain-text base resume in the shape users paste into the app."""
+    header = tailored["Header"]
+    lines = [header["Name"], " | ".join(v for k, v in header.items() if k in ("Email", "Phone", "Address"))]
+    lines += ["", "Summary", tailored["Summary"], "", "Experience"]
+    for job in tailored["Experience"]:
+        lines.append(f"{job['Title']} - {job['Company']} ({job['Dates']})")
+        lines += [f"- {b}" for b in job["Responsibilities"][:5]]
+        lines.append("")
+    edu = tailored["Education"]
+    lines += ["Education", f"{edu['Degree']}, {edu['Institution']} ({edu['Dates']})"]
+    return "\n".join(lines)
+
+
+def profile_from(tailored):
+    """What parsing resume_text_from(tailored) yields (see profile_store.py)."""
+    header = {k: v for k, v in tailored["Header"].items() if k in ("Name", "Email", "Phone", "Address")}
+    experience = [{k: job[k] for k in ("Company", "Title", "Dates")} | {"Responsibilities": job["Responsibilities"][:5]}
+                  for job in tailored["Experience"]]
+    edu = {k: tailored["Education"][k] for k in ("Degree", "Institution", "Dates")}
+    return {"Header": header, "Summary": tailored["Summary"], "Skills": {}, "Experience": experience, "Education": edu}
+
+
+def synthetic_job_description(seed=0, paragraphs=6):
+    rng = random.Random(seed)
+    body = [_sentence(rng, rng.randint(30, 60)) for _ in range(paragraphs)]
+    requirements = [f"- {rng.randint(2, 8)}+ years with {t}" for t in rng.sample(TECHNOLOGIES, 10)]
+    return "\n\n".join(["Senior Software Engineer", *body, "Requirements:\n" + "\n".join(requirements)])
@@ -0,0 +1,78 @@
+"""
+Tail latency with and without hedged requests, against the fake backend.
+
+Time to first token is drawn from a long-tailed distribution (most requests
+fast, --slow-fraction of them very slow), and the same request sequence is
+run with hedging off and on. Reports latency percentiles, hedges sent and
+won, and how many losing streams were closed early.
+
+    python benchmarks/hedging.py [--requests 200] [--concurrency 8]
+        [--base-ms 200] [--slow-ms 4000] [--slow-fraction 0.05] [--budget 0.1]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+os.environ.setdefault("RESUME_CACHE", "0")
+
+import fake_backend  # noqa: E402
+from fixtures import resume_text_from, synthetic_job_description, synthetic_size  # noqa: E402
+from suite import summarize  # noqa: E402
+
+
+def run(args, hedge):
+    import routing
+    from resume_logic import tailor_resume
+
+    backend = fake_backend.FakeBackend(
+        ttft_dist=fake_backend.long_tail(args.base_ms, args.slow_ms, args.slow_fraction),
+        tokens_per_sec=args.tokens_per_sec or None, seed=args.seed,
+    )
+    fake_backend.install(backend)
+    router = routing.Router(hedge=hedge, budget=args.budget, percentile=args.percentile)
+    routing.set_router(router)
+    resume = resume_text_from(synthetic_size("small", seed=1))
+    jobs = [synthetic_job_description(seed) for seed in range(args.requests)]
+
+    def one(jd):
+        t0 = time.perf_counter()
+        tailor_resume(resume, jd, use_cache=False)
+        return (time.perf_counter() - t0) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        samples = list(pool.map(one, jobs))
+    stats = summarize(samples, time.perf_counter() - started)
+    stats.update(router.stats() if hedge else {})
+    stats["closed_early"] = backend.closed
+    fake_backend.uninstall()
+    routing.set_router(None)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=200.0, help="typical time to first token")
+    parser.add_argument("--slow-ms", type=float, default=4000.0, help="time to first token of slow requests")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="generation speed (0 = instant)")
+    parser.add_argument("--budget", type=float, default=0.1, help="max hedges / requests")
+    parser.add_argument("--percentile", type=float, default=90.0, help="TTFT percentile used as the deadline")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'hedging':10} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'hedges':>7} {'won':>5} {'closed':>7}")
+    for hedge in (False, True):
+        s = run(args, hedge)
+        print(f"{'on' if hedge else 'off':10} {s['p50_ms']:9.1f} {s['p90_ms']:9.1f} {s['p99_ms']:9.1f} "
+              f"{s['max_ms']:9.1f} {s.get('hedges', 0):7} {s.get('hedges_won', 0):5} {s['closed_early']:7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark for the API handler.
+
+Each sample runs in a fresh interpreter and measures:
+  - import_ms: time to import api/generate.py (what a Vercel cold start pays)
+  - first_response_ms: time for the first handler() call to return a DOCX:
+    the lazy imports, prompt assembly, the model call, parsing, validation
+    and rendering that the first request of a cold instance pays for
+
+The model is benchmarks/fake_backend.py with no latency, so the numbers
+cover our own overhead, not OpenAI's. The run fails if importing the API
+pulls in any heavy module, or if the first DOCX request loads more than
+python-docx.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--budget-ms 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("streamlit", "docx", "reportlab", "openai")
+FIRST_RESPONSE_MODULES = ("docx",)  # what rendering the first DOCX legitimately needs
+
+CHILD = r"""
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("api_generate", %(path)r)
+mod = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+t1 = time.perf_counter()
+loaded_by_import = [m for m in %(heavy)r if m in sys.modules]
+
+sys.path.insert(0, %(benchmarks)r)
+import fake_backend
+fake_backend.install()  # outside the timings: stands in for the OpenAI client
+
+class FakeRequest:
+    def json(self):
+        return {"resume": "Bench", "job_description": "Bench", "custom_prompt": "", "format": "docx"}
+
+t2 = time.perf_counter()
+resp = mod.handler(FakeRequest())
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_response_ms": (t3 - t2) * 1000,
+    "status": resp["statusCode"],
+    "heavy_loaded": loaded_by_import,
+    "first_response_loaded": [m for m in %(heavy)r if m in sys.modules],
+}))
+"""
+
+
+def run_once():
+    code = CHILD % {"path": os.path.join(ROOT, "api", "generate.py"), "heavy": HEAVY_MODULES,
+                    "benchmarks": os.path.join(ROOT, "benchmarks")}
+    with tempfile.TemporaryDirectory() as tmp:
+        # a cold instance has an empty cache: every run must reach the model
+        env = dict(os.environ, RESUME_CACHE="0", RESUME_CACHE_DIR=tmp)
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True, env=env
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if median import + first response exceeds this")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    first_ms = statistics.median(s["first_response_ms"] for s in samples)
+    heavy = sorted({m for s in samples for m in s["heavy_loaded"]})
+    first_heavy = sorted({m for s in samples for m in s["first_response_loaded"]})
+    extra = [m for m in first_heavy if m not in FIRST_RESPONSE_MODULES]
+
+    print(f"import api/generate.py : {import_ms:8.2f} ms (median of {args.runs})")
+    print(f"first DOCX response    : {first_ms:8.2f} ms (tailor_resume + create_docx, fake model)")
+    print(f"heavy modules loaded   : {', '.join(heavy) or 'none'} (import), "
+          f"{', '.join(first_heavy) or 'none'} (after first response)")
+
+    failed = False
+    if heavy:
+        print("FAIL: importing the API pulled in heavy modules")
+        failed = True
+    if extra or any(s["status"] != 200 for s in samples):
+        print(f"FAIL: first response loaded {', '.join(extra) or 'nothing extra'}, "
+              f"status {sorted({s['status'] for s in samples})}")
+        failed = True
+    if args.budget_ms is not None and import_ms + first_ms > args.budget_ms:
+        print(f"FAIL: {import_ms + first_ms:.2f} ms exceeds budget of {args.budget_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
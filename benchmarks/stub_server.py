@@ -0,0 +1,127 @@
+"""
+Local OpenAI-compatible stand-in server for tests and load tests.
+
+Serves POST /v1/chat/completions (JSON and stream=true server-sent events)
+with the responses and latency model of benchmarks/fake_backend.py, over
+HTTP/1.1 keep-alive so connection pooling behaves like the real API.
+
+    python benchmarks/stub_server.py --port 8089 --ttft-ms 300 --tokens-per-sec 80
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 streamlit run app.py
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+from fake_backend import FakeBackend  # noqa: E402
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # headers and body are separate writes
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, json.dumps({"error": {"message": "not found"}}))
+                return
+            messages = request.get("messages") or []
+            model = request.get("model", "stub")
+            created = int(time.time())
+            if not request.get("stream"):
+                response = backend.create(messages=messages)
+                self._send(200, json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": response.choices[0].message.content}}],
+                    "usage": _usage_dict(response.usage),
+                }))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            stream = backend.create(messages=messages, stream=True)
+            try:
+                for chunk in stream:
+                    payload = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                               "model": model}
+                    if chunk.choices:
+                        payload["choices"] = [{"index": 0, "delta": {"content": chunk.choices[0].delta.content}}]
+                    else:
+                        payload["choices"] = []
+                        payload["usage"] = _usage_dict(chunk.usage)
+                    self._chunk(f"data: {json.dumps(payload)}\n\n")
+            finally:
+                stream.close()  # client went away (e.g. a cancelled hedge): stop generating
+            self._chunk("data: [DONE]\n\n")
+            self._chunk("")
+
+        def _chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def _usage_dict(usage):
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "prompt_tokens_details": {"cached_tokens": usage.prompt_tokens_details.cached_tokens},
+    }
+
+
+def serve(port=0, backend=None):
+    """Start the server in a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(backend or FakeBackend()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--ttft-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    backend = FakeBackend(ttft_ms=args.ttft_ms, tokens_per_sec=args.tokens_per_sec or None, jitter=args.jitter)
+    server, url = serve(args.port, backend)
+    print(f"OpenAI-compatible stand-in listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
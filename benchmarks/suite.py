@@ -0,0 +1,246 @@
+"""
+Offline benchmark suite: renderers and the end-to-end API handler.
+
+No OpenAI key is needed. The model is replaced by benchmarks/fake_backend.py
+with a configurable latency, and fixtures come from benchmarks/fixtures.py
+(small / medium / large resumes). For each case it reports latency
+percentiles and throughput:
+
+  - create_docx, create_pdf, render_preview_html   per fixture size
+  - handler json / docx / pdf                      sequential, fake model latency
+  - handler json throughput                        --concurrency parallel requests
+  - score_jobs/1000                                local match scoring of 1000 JDs
+
+Results are written as JSON (default benchmarks/results/latest.json). Pass
+--baseline to compare p50s against an earlier run; --fail-on-regression makes
+a slowdown beyond --threshold exit non-zero.
+
+Usage:
+    python benchmarks/suite.py [--iterations 20] [--sizes small,medium,large]
+        [--ttft-ms 50] [--tokens-per-sec 0] [--responses recorded.jsonl]
+        [--out results.json] [--baseline old.json] [--threshold 0.15]
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [ROOT, HERE]
+os.environ.setdefault("RESUME_CACHE", "0")  # every handler call must reach the (fake) model
+
+import fake_backend  # noqa: E402
+from fixtures import SIZES, resume_text_from, synthetic_job_description, synthetic_size  # noqa: E402
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples_ms, wall_s=None):
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p90_ms": round(percentile(ordered, 90), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+        "ops_per_sec": round(len(ordered) / (wall_s if wall_s else sum(ordered) / 1000), 3),
+    }
+
+
+def measure(func, iterations, warmup=2):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples)
+
+
+def load_handler():
+    spec = importlib.util.spec_from_file_location("api_generate", os.path.join(ROOT, "api", "generate.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.handler
+
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+# ----------------------- cases -----------------------
+
+def bench_renderers(sizes, iterations):
+    from resume_logic import DEFAULT_STYLES, create_docx, create_pdf, render_preview_html
+
+    results = {}
+    for size in sizes:
+        tailored = synthetic_size(size, seed=1)
+        results[f"create_docx/{size}"] = measure(lambda: create_docx("", tailored), iterations)
+        results[f"create_pdf/{size}"] = measure(lambda: create_pdf("", tailored), iterations)
+        results[f"render_preview_html/{size}"] = measure(
+            lambda: render_preview_html(tailored, DEFAULT_STYLES), iterations
+        )
+    return results
+
+
+def bench_scoring(iterations, jobs=1000):
+    from job_scoring import score_jobs
+
+    resume = resume_text_from(synthetic_size("medium", seed=1))
+    descriptions = [synthetic_job_description(seed) for seed in range(jobs)]
+    return {f"score_jobs/{jobs}": measure(lambda: score_jobs(resume, descriptions), max(1, iterations // 4))}
+
+
+def bench_handler(sizes, iterations, concurrency, backend_options):
+    handler = load_handler()
+    results = {}
+    for size in sizes:
+        tailored = synthetic_size(size, seed=1)
+        # recorded responses replace the synthetic ones, whatever the size
+        options = backend_options if backend_options.get("responses") else dict(backend_options, **SIZES[size])
+        fake_backend.install(fake_backend.FakeBackend(**options))
+        body = {
+            "resume": resume_text_from(tailored),
+            "job_description": synthetic_job_description(seed=1),
+            "custom_prompt": "",
+        }
+        for fmt in ("json", "docx", "pdf"):
+            request = FakeRequest(dict(body, format=fmt) if fmt != "json" else body)
+
+            def call():
+                response = handler(request)
+                assert response["statusCode"] == 200, response["body"][:200]
+
+            results[f"handler_{fmt}/{size}"] = measure(call, iterations)
+
+        if concurrency > 1:
+            request = FakeRequest(body)
+
+            def timed_call(_):
+                t0 = time.perf_counter()
+                handler(request)
+                return (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = list(pool.map(timed_call, range(iterations * concurrency)))
+            results[f"handler_json_x{concurrency}/{size}"] = summarize(samples, time.perf_counter() - t0)
+    fake_backend.uninstall()
+    return results
+
+
+# ----------------------- results -----------------------
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print p50 deltas against a baseline run; return the names that regressed."""
+    regressed = []
+    print(f"\n{'case':40} {'base p50':>10} {'p50':>10} {'delta':>8}")
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        delta = stats["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+        flag = ""
+        if delta > threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:40} {old['p50_ms']:10.2f} {stats['p50_ms']:10.2f} {delta:+8.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--sizes", default="small,medium,large")
+    parser.add_argument("--skip", default="", help="comma-separated: renderers,handler,scoring")
+    parser.add_argument("--ttft-ms", type=float, default=50.0, help="fake model time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="fake model generation speed (0 = instant)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="relative latency jitter, e.g. 0.2")
+    parser.add_argument("--responses", help="replay recorded tailored JSON (.jsonl file or directory of .json)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--out", default=os.path.join(HERE, "results", "latest.json"))
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p50 slowdown (0.15 = 15%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"unknown size {size!r} (choose from {', '.join(SIZES)})")
+    skip = set(filter(None, args.skip.split(",")))
+    backend_options = {
+        "ttft_ms": args.ttft_ms,
+        "tokens_per_sec": args.tokens_per_sec or None,
+        "jitter": args.jitter,
+    }
+    if args.responses:
+        backend_options["responses"] = fake_backend.load_recorded(args.responses)
+
+    results = {}
+    if "renderers" not in skip:
+        results.update(bench_renderers(sizes, args.iterations))
+    if "scoring" not in skip:
+        results.update(bench_scoring(args.iterations))
+    if "handler" not in skip:
+        results.update(bench_handler(sizes, args.iterations, args.concurrency, backend_options))
+
+    print(f"{'case':40} {'p50':>9} {'p90':>9} {'p99':>9} {'ops/s':>9}")
+    for name, stats in results.items():
+        print(f"{name:40} {stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} {stats['p99_ms']:9.2f} {stats['ops_per_sec']:9.1f}")
+
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "baseline")}
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "config": config, "results": results}, f, indent=2)
+    print(f"\nsaved {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressed = compare(results, baseline, args.threshold)
+        if regressed and args.fail_on_regression:
+            print(f"FAIL: {len(regressed)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
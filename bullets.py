@@ -0,0 +1,171 @@
+"""
+Near-duplicate bullet removal and bullet quality checks.
+
+Bullets are turned into hashed word 3-gram shingles and summarised with
+MinHash signatures computed for all bullets at once in NumPy. Locality
+sensitive hashing (banded signatures) yields candidate pairs without
+comparing every bullet to every other one; candidates are confirmed with the
+exact Jaccard similarity of their shingle sets.
+
+    tailored, report = dedupe_bullets(tailored)
+
+The first occurrence wins (Experience is ordered most recent first), later
+near-duplicates within or across positions are dropped, and bullets outside
+the 20-40 word bound are flagged (not dropped). The report lists both.
+"""
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16           # 16 bands x 4 rows: pairs above ~0.5 Jaccard collide with high probability
+ROWS = NUM_PERM // BANDS
+PRIME = np.uint64(4294967291)  # largest prime < 2**32, keeps a*h + b inside uint64
+
+_rng = np.random.default_rng(20240607)
+_A = _rng.integers(1, int(PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(PRIME), size=NUM_PERM, dtype=np.uint64)
+
+_MIX = np.uint64(_rng.integers(1, int(PRIME)))
+_BAND_MULT = _rng.integers(1, 2**63, size=ROWS, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9+#.]+")
+
+
+def shingle_sets(texts, k=3):
+    """
+    Sorted unique uint64 hashes of the word 3-shingles of each text.
+
+    All texts are hashed in one pass: words are hashed once per distinct word
+    and consecutive word hashes are combined with array arithmetic.
+    """
+    tokens = [_WORD.findall(t.lower()) for t in texts]
+    vocab = {w: zlib.crc32(w.encode("utf-8")) for w in {w for ws in tokens for w in ws}}
+    lengths = np.fromiter((len(ws) for ws in tokens), dtype=np.int64, count=len(tokens))
+    words = np.fromiter((vocab[w] for ws in tokens for w in ws), dtype=np.uint64, count=int(lengths.sum()))
+    owner = np.repeat(np.arange(len(tokens)), lengths)
+
+    # combine k consecutive word hashes that belong to the same text
+    # (wrapping uint64 arithmetic is fine for hashing)
+    span = len(words) - (k - 1)
+    mixed = np.zeros(max(span, 0), dtype=np.uint64)
+    for offset in range(k):
+        mixed = mixed * _MIX + words[offset: offset + max(span, 0)]
+    valid = owner[: max(span, 0)] == owner[k - 1:]
+    hashes, ids = mixed[valid] % PRIME, owner[: max(span, 0)][valid]
+
+    # texts shorter than k words get a single shingle from their first word
+    short = np.flatnonzero(lengths < k)
+    if len(short):
+        starts = (np.cumsum(lengths) - lengths)[short]
+        padded = np.append(words, np.uint64(0))
+        first = np.where(lengths[short] > 0, padded[starts], np.uint64(0)).astype(np.uint64)
+        hashes = np.concatenate((hashes, first))
+        ids = np.concatenate((ids, short))
+
+    order = np.lexsort((hashes, ids))
+    hashes, ids = hashes[order], ids[order]
+    keep = np.ones(len(hashes), dtype=bool)
+    keep[1:] = (hashes[1:] != hashes[:-1]) | (ids[1:] != ids[:-1])
+    hashes, ids = hashes[keep], ids[keep]
+    return np.split(hashes, np.searchsorted(ids, np.arange(1, len(tokens))))
+
+
+def minhash_signatures(shingle_sets):
+    """(n, NUM_PERM) uint64 signatures for n shingle arrays, in one vectorized pass."""
+    if not shingle_sets:
+        return np.empty((0, NUM_PERM), np.uint64)
+    lengths = np.array([len(s) for s in shingle_sets])
+    hashes = np.concatenate(shingle_sets)
+    # (NUM_PERM, total_shingles) permuted hashes, then min per bullet segment
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % PRIME
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(permuted, starts, axis=1).T
+
+
+def candidate_pairs(signatures):
+    """LSH banding: pairs (i, j), i < j, sharing at least one band bucket."""
+    n = len(signatures)
+    # one uint64 key per (bullet, band)
+    keys = (signatures.reshape(n, BANDS, ROWS) * _BAND_MULT).sum(axis=2)
+    pairs = set()
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        column = keys[order, band]
+        # only buckets holding more than one bullet are visited
+        buckets = {}
+        for pos in np.flatnonzero(column[1:] == column[:-1]).tolist():
+            members = buckets.setdefault(int(column[pos]), {int(order[pos])})
+            members.add(int(order[pos + 1]))
+        for members in buckets.values():
+            members = sorted(members)
+            pairs.update((a, b) for x, a in enumerate(members) for b in members[x + 1:])
+    return pairs
+
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sorted unique hash arrays."""
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    union = len(a) + len(b) - inter
+    return inter / union if union else 1.0
+
+
+def dedupe_bullets(tailored, threshold=0.6, min_words=20, max_words=40):
+    """
+    Return (tailored copy without near-duplicate bullets, report).
+
+    Every "job"/"index" in the report (dropped bullets, what they duplicate,
+    length flags) points into the input: tailored["Experience"][job]
+    ["Responsibilities"][index], before anything was dropped.
+    """
+    from resume_logic import clean_bullet
+
+    experience = tailored.get("Experience") or []
+    refs = []  # (job index, bullet index, text)
+    for j, job in enumerate(experience):
+        for b, bullet in enumerate(job.get("Responsibilities") or []):
+            refs.append((j, b, clean_bullet(str(bullet))))
+
+    report = {"total": len(refs), "dropped": [], "length_flags": []}
+    if not refs:
+        report["kept"] = 0
+        return tailored, report
+
+    sets = shingle_sets([text for _, _, text in refs])
+    duplicate_of = {}
+    for i, j in sorted(candidate_pairs(minhash_signatures(sets))):
+        if j in duplicate_of or i in duplicate_of:
+            continue  # compare against surviving bullets only
+        similarity = jaccard(sets[i], sets[j])
+        if similarity >= threshold:
+            duplicate_of[j] = (i, similarity)
+
+    out = dict(tailored)
+    out["Experience"] = []
+    kept = 0
+    cursor = 0
+    for j, job in enumerate(experience):
+        bullets = job.get("Responsibilities") or []
+        kept_bullets = []
+        for b, bullet in enumerate(bullets):
+            idx = cursor + b
+            dup = duplicate_of.get(idx)
+            # never empty a position entirely
+            if dup and (kept_bullets or b < len(bullets) - 1):
+                orig = refs[dup[0]]
+                report["dropped"].append({
+                    "job": j, "index": b, "bullet": refs[idx][2],
+                    "duplicate_of": {"job": orig[0], "index": orig[1]},
+                    "similarity": round(dup[1], 3),
+                })
+                continue
+            words = len(refs[idx][2].split())
+            if words < min_words or words > max_words:
+                report["length_flags"].append({"job": j, "index": b, "words": words})
+            kept_bullets.append(bullet)
+        cursor += len(bullets)
+        kept += len(kept_bullets)
+        out["Experience"].append(dict(job, Responsibilities=kept_bullets))
+    report["kept"] = kept
+    return out, report
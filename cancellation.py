@@ -0,0 +1,137 @@
+"""
+Cancellation of in-flight generations.
+
+    token = CancelToken()
+    tailor_resume(resume, jd, cancel=token)   # from another thread: token.cancel()
+
+Cancelling closes the upstream model stream right away (so no more tokens
+are generated or billed) and makes the generation raise GenerationCancelled,
+whose .partial holds the sections that were already complete.
+
+With a token, model requests are made in streaming mode internally so there
+is always an open response to close. The token is also kept in a context
+variable, so nested requests (fan-out positions, schema repairs) see it
+without passing it through every call.
+
+Async callers need nothing special: cancelling the asyncio task aborts the
+request.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+
+class GenerationCancelled(Exception):
+    """The generation was stopped; .partial holds the finished sections (may be empty)."""
+
+    def __init__(self, partial=None):
+        super().__init__("generation cancelled")
+        self.partial = partial or {}
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def is_cancelled(self):
+        """Same as .cancelled; bind it once (check = token.is_cancelled) for per-token loops."""
+        return self._event.is_set()
+
+    def cancel(self):
+        """Mark as cancelled and run the registered callbacks (e.g. stream.close)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # closing an already finished stream may fail; nothing to do
+
+    def on_cancel(self, callback):
+        """Run callback on cancel (now, if already cancelled); returns a function that unregisters it."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self, partial=None):
+        """Raise GenerationCancelled if cancelled."""
+        if self._event.is_set():
+            raise GenerationCancelled(partial)
+
+
+_current = contextvars.ContextVar("resume_cancel_token", default=None)
+
+
+def current():
+    """The CancelToken of the generation running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def scope(token):
+    """Make token current for nested model requests (no-op for None)."""
+    if token is None:
+        yield
+        return
+    reset = _current.set(token)
+    try:
+        yield
+    finally:
+        _current.reset(reset)
+
+
+class BackgroundTask:
+    """
+    Runs func(task) in a daemon thread with its own CancelToken.
+
+    The UI polls .done and reads .partial (set by func as sections arrive),
+    .result, .error and .cancelled; .stop() cancels.
+    """
+
+    def __init__(self, func):
+        self.cancel_token = CancelToken()
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self._thread = threading.Thread(target=self._run, args=(func,), daemon=True)
+        self._thread.start()
+
+    def _run(self, func):
+        try:
+            self.result = func(self)
+        except GenerationCancelled as e:
+            self.cancelled = True
+            if e.partial:
+                self.partial = e.partial
+        except Exception as e:
+            if self.cancel_token.cancelled:
+                self.cancelled = True
+            else:
+                self.error = e
+        finally:
+            self.done = True
+
+    def stop(self):
+        self.cancel_token.cancel()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
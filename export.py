@@ -0,0 +1,122 @@
+"""
+Multi-format export from a single tailored result.
+
+reportlab and python-docx are CPU-bound and hold the GIL, so each format is
+rendered in its own worker process. Total time is roughly that of the slowest
+renderer instead of the sum of all of them.
+
+    files = export_formats(tailored, ["docx", "pdf", "html"])   # {fmt: bytes}
+    files, info = export_formats(tailored, with_info=True)       # + {"render_ms": {fmt: ms}}
+    zip_bytes = export_bundle(tailored)                          # all formats + JSON
+"""
+import html
+import io
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+from resume_logic import build_header_from_json
+
+FORMATS = ("docx", "pdf", "html")
+
+HTML_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="max-width:820px;margin:24px auto;">{body}</body></html>
+"""
+
+
+def render_format(fmt, tailored, include_tech=True, styles_config=None, template_text=""):
+    """Render one format to bytes. Module-level so worker processes can pickle it."""
+    from resume_logic import DEFAULT_STYLES, create_docx, create_pdf, render_preview_html
+
+    if fmt == "docx":
+        return create_docx(template_text, tailored, None, include_tech, styles_config)
+    if fmt == "pdf":
+        return create_pdf(template_text, tailored, None, include_tech, styles_config)
+    if fmt == "html":
+        styles_config = {**DEFAULT_STYLES, **(styles_config or {})}
+        name, _ = build_header_from_json(tailored)
+        body = render_preview_html(tailored, styles_config)
+        return HTML_PAGE.format(title=html.escape(name or "Resume"), body=body).encode("utf-8")
+    raise ValueError(f"Unknown export format: {fmt!r}")
+
+
+def render_timed(fmt, *args):
+    """render_format plus its render time in ms, measured in the process that rendered."""
+    started = time.perf_counter()
+    data = render_format(fmt, *args)
+    return data, round((time.perf_counter() - started) * 1000, 1)
+
+
+_executor = None
+
+
+def get_executor():
+    """Long-lived process pool, one worker per format, created on first use."""
+    global _executor
+    if _executor is None:
+        # spawn: forking a threaded host (Streamlit, uvicorn) is not safe
+        ctx = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(max_workers=min(len(FORMATS), os.cpu_count() or 1), mp_context=ctx)
+    return _executor
+
+
+def _discard_executor(executor):
+    """Drop a broken pool (a worker died) so the next export starts a fresh one."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def export_formats(tailored, formats=FORMATS, include_tech=True, styles_config=None, template_text="", parallel=True,
+                   with_info=False):
+    """Render every requested format and return {fmt: bytes} (with_info: plus {"render_ms": {fmt: ms}})."""
+    formats = [f.lower() for f in formats]
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt!r}")
+    args = (tailored, include_tech, styles_config, template_text)
+
+    with metrics.stage("export", formats=formats):
+        if not parallel or len(formats) < 2:
+            rendered = {fmt: render_timed(fmt, *args) for fmt in formats}
+        else:
+            try:
+                executor = get_executor()
+                futures = {fmt: executor.submit(render_timed, fmt, *args) for fmt in formats}
+                rendered = {fmt: future.result() for fmt, future in futures.items()}
+            except BrokenProcessPool:
+                # a worker was killed (OOM, crash): the pool stays broken, so replace it
+                _discard_executor(executor)
+                rendered = {fmt: render_timed(fmt, *args) for fmt in formats}
+            except (OSError, NotImplementedError):
+                # no process support (some sandboxes/serverless runtimes): render inline
+                rendered = {fmt: render_timed(fmt, *args) for fmt in formats}
+
+    files = {fmt: data for fmt, (data, _) in rendered.items()}
+    if with_info:
+        return files, {"render_ms": {fmt: ms for fmt, (_, ms) in rendered.items()}}
+    return files
+
+
+def bundle_basename(tailored):
+    name, _ = build_header_from_json(tailored)
+    return name.replace(" ", "_") if name else "Software_Engineer"
+
+
+def export_bundle(tailored, formats=FORMATS, include_tech=True, styles_config=None, template_text="", parallel=True):
+    """Zip with every requested format plus the tailored JSON; returns the zip bytes."""
+    files = export_formats(tailored, formats, include_tech, styles_config, template_text, parallel)
+    base = bundle_basename(tailored)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for fmt, data in files.items():
+            zf.writestr(f"{base}.{fmt}", data)
+        zf.writestr(f"{base}.json", json.dumps(tailored, indent=2, ensure_ascii=False))
+    return buf.getvalue()
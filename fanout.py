@@ -0,0 +1,124 @@
+"""
+Per-section fan-out generation for long resumes.
+
+Output tokens dominate latency, and a 5-position resume with 15-20 long
+bullets each is one very long completion. Fan-out splits it:
+
+  1. one plan call returns Header, Summary, Skills, Education and, for each
+     position, its Company/Title/Dates plus what to emphasise there
+  2. every position is then generated by its own request, all concurrently
+
+The pieces are merged back into the usual schema, so wall-clock time is
+roughly plan + slowest position instead of the sum of all positions.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from cancellation import GenerationCancelled
+from prompts import assemble_messages, merge_usage
+
+PLAN_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+Plan a resume tailored to the job description. Do NOT write responsibility bullets yet.
+
+Return a STRICT JSON object with these keys ONLY:
+- Header (object): Name (string, required); Email, Phone, Address (strings, if known); Links, Other (arrays of strings, optional)
+- Summary (string)
+- Skills (object where each key is a category and value is an array of strings)
+- Education (object with Dates, Degree, Institution (university/school name), GPA; Location is optional)
+- Plan (array, one object per position in the resume, most recent first):
+  - Company, Title, Dates (strings, from the resume)
+  - Focus (array of strings: the skills, technologies and behaviours this position should demonstrate)
+
+Constraints:
+- Be truthful to resume and job description.
+- If any contact field is missing, omit that field rather than inventing."""
+
+POSITION_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+Write the experience entry for ONE position of a resume tailored to the job description.
+
+Return a STRICT JSON object with these keys ONLY:
+- Responsibilities (array of strings, one bullet each, no leading bullet symbols)
+- Technologies (array of strings)
+
+Constraints:
+- Be truthful to resume and job description.
+- Follow the additional instructions for bullet count, bullet length and technologies."""
+
+MAX_WORKERS = int(os.getenv("RESUME_FANOUT_WORKERS", "8"))
+
+
+def _position_suffix(position, index, total):
+    brief = {k: position.get(k) for k in ("Company", "Title", "Dates", "Focus") if position.get(k)}
+    where = "the most recent position" if index == 0 else f"position {index + 1} of {total}"
+    suffix = f"Write {where}:\n{json.dumps(brief, ensure_ascii=False)}"
+    current = {k: position.get(k) for k in ("Responsibilities", "Technologies") if position.get(k)}
+    if current:  # re-tailoring an existing entry (incremental.py): revise rather than start over
+        suffix += f"\n\nCurrent entry (keep what still fits):\n{json.dumps(current, ensure_ascii=False)}"
+    return suffix
+
+
+def generate_position(resume_text, job_description, custom_prompt, input_budget, position, index, total):
+    """
+    (job, usage) for one Experience entry: position carries Company/Title/Dates
+    and optionally Focus; with Responsibilities/Technologies it is revised
+    rather than written from scratch. index/total say which position it is.
+    """
+    from resume_logic import chat_json
+
+    messages, _ = assemble_messages(
+        resume_text, job_description, custom_prompt, input_budget,
+        system_prompt=POSITION_PROMPT, suffix=_position_suffix(position, index, total),
+    )
+    entry, usage = chat_json(messages)
+    job = {
+        "Company": position.get("Company", ""),
+        "Title": position.get("Title", ""),
+        "Dates": position.get("Dates", ""),
+        "Responsibilities": entry.get("Responsibilities") or [],
+    }
+    if entry.get("Technologies"):
+        job["Technologies"] = entry["Technologies"]
+    return job, usage
+
+
+def _merge(plan, jobs):
+    return {
+        "Header": plan.get("Header") or {},
+        "Summary": plan.get("Summary") or "",
+        "Skills": plan.get("Skills") or {},
+        "Experience": jobs,
+        "Education": plan.get("Education") or {},
+    }
+
+
+def generate_fanout(resume_text, job_description, custom_prompt=None, input_budget=None, max_workers=None):
+    """Returns (tailored, usage, prompt_info) in the same schema as tailor_resume."""
+    from resume_logic import chat_json
+
+    messages, prompt_info = assemble_messages(
+        resume_text, job_description, custom_prompt, input_budget, system_prompt=PLAN_PROMPT
+    )
+    plan, plan_usage = chat_json(messages)
+    positions = plan.pop("Plan", None) or []
+
+    # Position requests share the system + resume + JD prefix, so after the
+    # first one they mostly hit the provider's prompt cache.
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers or MAX_WORKERS, len(positions) or 1))) as pool:
+        futures = [
+            pool.submit(metrics.bind(generate_position), resume_text, job_description, custom_prompt, input_budget,
+                        position, i, len(positions))
+            for i, position in enumerate(positions)
+        ]
+        try:
+            results = [f.result() for f in futures]
+        except GenerationCancelled:
+            # keep the plan sections and the positions that did finish
+            finished = [f.result()[0] for f in futures if f.done() and not f.cancelled() and f.exception() is None]
+            raise GenerationCancelled(_merge(plan, finished)) from None
+
+    tailored = _merge(plan, [job for job, _ in results])
+    usage = merge_usage(plan_usage, *(u for _, u in results))
+    prompt_info = dict(prompt_info, requests=1 + len(results))
+    return tailored, usage, prompt_info
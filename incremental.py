@@ -0,0 +1,207 @@
+"""
+Incremental re-tailoring after a small edit to the job description or rules.
+
+    tailored, info = retailor(previous_inputs, previous_tailored, resume, jd, custom_prompt)
+    info["regenerated"] -> ["Skills", "Experience[0]"]     info["reasons"] -> [...]
+
+plan_update() diffs the new inputs against the previous run's and maps the
+change onto sections:
+
+  - resume text changed, or the JD changed a lot (more than MAX_JD_CHANGE of
+    its terms or MAX_SKILL_CHANGES skills added or removed)
+                                                 -> everything (a full run)
+  - required skills added to / removed from the JD
+                                                 -> Skills + the latest position
+  - other JD wording                             -> Summary
+  - custom-prompt rule lines added or removed    -> the sections they mention
+    (summary, skills, bullets/technologies -> every position, ...); a rule
+    that names no section                        -> everything
+
+Each position is its own request carrying the whole prompt, so a plan that
+touches more than half of the positions is run in full instead.
+
+Only those sections are regenerated, concurrently and with the previous
+resume as context; a position is sent its current bullets to revise.
+Everything else is carried forward unchanged. The merged result goes through
+the usual validation and bullet dedup.
+"""
+import copy
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import cancellation
+import metrics
+from cancellation import GenerationCancelled
+from prompts import assemble_messages, compact, merge_usage
+
+MAX_JD_CHANGE = 0.35  # share of JD terms added or removed beyond which a full run is cheaper to trust
+MAX_SKILL_CHANGES = 6  # more required skills added/removed than this reads as a different job
+MAX_WORKERS = 4
+
+UPDATE_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+The job description or instructions changed slightly since one section of a tailored resume was written.
+Rewrite ONLY that section for the new inputs, keeping what still fits.
+
+Return a STRICT JSON object with exactly one key:
+- {schema}
+
+Constraints:
+- Be truthful to resume and job description.
+- If any contact field is missing, omit that field rather than inventing."""
+
+# custom-prompt rule keywords -> the sections a changed rule affects
+RULE_SECTIONS = (
+    (re.compile(r"summary|objective|profile", re.IGNORECASE), "Summary"),
+    (re.compile(r"skill", re.IGNORECASE), "Skills"),
+    (re.compile(r"bullet|responsibilit|experience|position|achievement|metric|technolog|\btech\b",
+                re.IGNORECASE), "Experience"),
+    (re.compile(r"header|contact|name|email|phone|address|link", re.IGNORECASE), "Header"),
+    (re.compile(r"education|degree|gpa|university|school", re.IGNORECASE), "Education"),
+)
+
+
+def _rule_lines(custom_prompt):
+    return {line.strip().lower() for line in compact(custom_prompt).split("\n") if line.strip()}
+
+
+def _jd_skills(text, skill_phrases):
+    from job_scoring import MAX_NGRAM, tokenize
+
+    tokens = tokenize(text)
+    grams = {" ".join(tokens[i:i + n]) for n in range(1, MAX_NGRAM + 1) for i in range(len(tokens) - n + 1)}
+    return grams & skill_phrases
+
+
+def plan_update(previous_inputs, inputs, previous_tailored):
+    """
+    (sections, reasons, changes) for moving from the previous run to inputs
+    (both dicts with resume, job_description, custom_prompt). sections is
+    None when everything has to be regenerated, [] when nothing changed.
+    """
+    from job_scoring import TECH_TERMS, resume_skills, tokenize
+    from response_cache import normalize_text
+
+    if normalize_text(previous_inputs.get("resume")) != normalize_text(inputs.get("resume")):
+        return None, ["resume changed"], {}
+
+    sections, reasons, changes = [], [], {}
+    positions = len(previous_tailored.get("Experience") or [])
+
+    old_jd, new_jd = previous_inputs.get("job_description") or "", inputs.get("job_description") or ""
+    if normalize_text(old_jd) != normalize_text(new_jd):
+        old_terms, new_terms = set(tokenize(old_jd)), set(tokenize(new_jd))
+        changed = len(old_terms ^ new_terms) / max(len(old_terms | new_terms), 1)
+        if changed > MAX_JD_CHANGE:
+            return None, [f"job description changed {changed:.0%} (> {MAX_JD_CHANGE:.0%})"], {}
+        skill_phrases = {" ".join(tokenize(p)) for p in (*TECH_TERMS, *resume_skills(inputs.get("resume"),
+                                                                                       previous_tailored))}
+        skill_phrases.discard("")
+        old_skills, new_skills = _jd_skills(old_jd, skill_phrases), _jd_skills(new_jd, skill_phrases)
+        added, removed = sorted(new_skills - old_skills), sorted(old_skills - new_skills)
+        if len(added) + len(removed) > MAX_SKILL_CHANGES:
+            return None, [f"{len(added) + len(removed)} required skills changed (> {MAX_SKILL_CHANGES})"], {}
+        if added or removed:
+            changes.update(added_skills=added, removed_skills=removed)
+            sections.append("Skills")
+            reasons.append("skills " + ", ".join([*(f"+{s}" for s in added), *(f"-{s}" for s in removed)]))
+            if added and positions:
+                sections.append("Experience[0]")  # the latest position is where new skills show first
+        else:
+            sections.append("Summary")
+            reasons.append(f"job description wording changed ({changed:.0%} of terms)")
+
+    old_rules, new_rules = _rule_lines(previous_inputs.get("custom_prompt")), _rule_lines(inputs.get("custom_prompt"))
+    for line in sorted(old_rules ^ new_rules):
+        hit = [section for pattern, section in RULE_SECTIONS if pattern.search(line)]
+        if not hit:
+            return None, [f"rule changed: {line[:80]}"], {}
+        for section in hit:
+            sections += [f"Experience[{i}]" for i in range(positions)] if section == "Experience" else [section]
+        reasons.append(f"rule {'added' if line in new_rules else 'removed'}: {line[:80]}")
+
+    sections = list(dict.fromkeys(sections))
+    rewritten = sum(s.startswith("Experience[") for s in sections)
+    if positions and rewritten > positions // 2 and rewritten > 1:
+        # one request per position re-sends the whole prompt each time
+        return None, reasons + [f"{rewritten} of {positions} positions affected"], {}
+    return sections, reasons, changes
+
+
+def _update_one(section, previous, inputs, changes):
+    from fanout import generate_position
+    from resume_logic import chat_json
+    from schema import SECTION_SCHEMAS
+
+    resume, jd, prompt = inputs["resume"], inputs["job_description"], inputs.get("custom_prompt")
+    match = re.fullmatch(r"Experience\[(\d+)\]", section)
+    if match:
+        index = int(match.group(1))
+        jobs = previous["Experience"]
+        position = dict(jobs[index])
+        if index == 0 and changes.get("added_skills"):
+            position["Focus"] = changes["added_skills"]  # where the new requirements should show up
+        job, usage = generate_position(resume, jd, prompt, None, position, index, len(jobs))
+        return section, job, usage
+
+    context = {k: v for k, v in previous.items() if k != section and v}
+    suffix = f"Current {section} (to update):\n{json.dumps(previous.get(section), ensure_ascii=False)}"
+    if changes:
+        suffix += f"\n\nWhat changed in the job description:\n{json.dumps(changes, ensure_ascii=False)}"
+    suffix += "\n\nOther sections (unchanged, for consistency):\n" + json.dumps(context, ensure_ascii=False)[:4000]
+    messages, _ = assemble_messages(resume, jd, prompt, system_prompt=UPDATE_PROMPT.format(
+        schema=SECTION_SCHEMAS[section]), suffix=suffix)
+    fixed, usage = chat_json(messages)
+    return section, fixed.get(section), usage
+
+
+def retailor(previous_inputs, previous_tailored, resume_text, job_description, custom_prompt=None, cancel=None,
+             plan=None, **tailor_options):
+    """
+    Returns (tailored, info) for the new inputs, reusing previous_tailored where
+    the change does not reach. Falls back to tailor_resume (with
+    tailor_options) when plan_update asks for everything; info["mode"] is
+    "full", "incremental" or "unchanged". plan is a plan_update result the
+    caller already has for these inputs; it is computed here when omitted.
+    cancel works as in tailor_resume; a cancelled update keeps the previous
+    result as its partial.
+    """
+    from resume_logic import finalize_tailored, tailor_resume
+
+    inputs = {"resume": resume_text, "job_description": job_description, "custom_prompt": custom_prompt}
+    sections, reasons, changes = plan or plan_update(previous_inputs, inputs, previous_tailored)
+    if sections is None:
+        tailored, info = tailor_resume(resume_text, job_description, custom_prompt, with_info=True, cancel=cancel,
+                                       **tailor_options)
+        return tailored, dict(info, mode="full", reasons=reasons, regenerated=list(tailored), carried=[])
+    if not sections:
+        return previous_tailored, {"mode": "unchanged", "reasons": reasons, "regenerated": [],
+                                   "carried": list(previous_tailored), "usage": {}}
+
+    merged = copy.deepcopy(previous_tailored)
+    try:
+        with cancellation.scope(cancel), metrics.stage("incremental", sections=sections):
+            if cancel is not None:
+                cancel.check()
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(sections))) as pool:
+                # bound here, in the caller's context, so workers see the cancel token
+                futures = [pool.submit(metrics.bind(_update_one), s, previous_tailored, inputs, changes)
+                           for s in sections]
+                results = [f.result() for f in futures]
+    except GenerationCancelled:
+        raise GenerationCancelled(previous_tailored) from None  # the previous result is still whole
+    for section, value, _ in results:
+        match = re.fullmatch(r"Experience\[(\d+)\]", section)
+        if match:
+            merged["Experience"][int(match.group(1))] = value
+        elif value is not None:
+            merged[section] = value
+
+    with cancellation.scope(cancel):
+        tailored, schema_report, dedup_report = finalize_tailored(merged, resume_text, job_description, custom_prompt)
+    usage = merge_usage(*(usage for _, _, usage in results), schema_report["usage"])
+    carried = [s for s in previous_tailored if s not in sections and s != "Experience"]
+    carried += [f"Experience[{i}]" for i in range(len(previous_tailored.get("Experience") or []))
+                if f"Experience[{i}]" not in sections]
+    return tailored, {"mode": "incremental", "reasons": reasons, "regenerated": sections, "carried": carried,
+                      "usage": usage, "schema": schema_report, "dedup": dedup_report}
@@ -0,0 +1,213 @@
+"""
+Local JD-resume match scoring, to triage jobs before spending model calls.
+
+    scores = score_jobs(resume_text, [jd1, jd2, ...])
+    scores[0] -> {"score": 0.71, "coverage": 0.8, "similarity": 0.57,
+                  "matched": ["python", "kubernetes", ...], "missing": ["go", ...]}
+
+Skills are terms (1-3 word phrases) from a built-in list of common
+technologies plus everything listed in the resume's own skill lines
+("Skills: Python, AWS, ...") and, when given, the Skills/Technologies of a
+tailored JSON. coverage is the share of a JD's skills the resume has;
+similarity is the TF-IDF cosine between JD and resume over all terms, with
+document frequencies taken from the whole batch. score blends the two.
+
+Texts are tokenized once in Python; everything else (n-grams, term counts,
+IDF, norms, dot products, skill coverage) is array arithmetic over the whole
+batch at once, so thousands of JDs score in well under a second.
+"""
+import re
+from itertools import chain
+
+import numpy as np
+
+COVERAGE_WEIGHT = 0.6
+SIMILARITY_WEIGHT = 0.4
+MAX_NGRAM = 3
+_BASE = 1 << 20  # n-gram key radix: up to ~1M distinct words keeps 3-gram keys inside int64
+REPORT_TERMS = 10  # matched / missing skills listed per job
+
+TECH_TERMS = (
+    # ambiguous words ("go", "r", "rest", "excel") only count when listed in the resume
+    "python", "java", "javascript", "typescript", "golang", "rust", "c++", "c#", "ruby", "php",
+    "scala", "kotlin", "swift", "objective-c", "matlab", "perl", "bash", "shell", "sql", "nosql",
+    "html", "css", "sass", "graphql", "rest api", "restful", "grpc", "soap", "json", "xml", "yaml",
+    "react", "angular", "vue", "svelte", "next.js", "node.js", "express", "django", "flask", "fastapi",
+    "spring", "spring boot", "rails", "laravel", ".net", "asp.net", "jquery", "redux", "webpack",
+    "postgresql", "postgres", "mysql", "sqlite", "oracle", "sql server", "mongodb", "redis", "cassandra",
+    "dynamodb", "elasticsearch", "opensearch", "snowflake", "bigquery", "redshift", "clickhouse",
+    "kafka", "rabbitmq", "spark", "hadoop", "airflow", "dbt", "flink", "beam", "databricks",
+    "aws", "azure", "gcp", "google cloud", "lambda", "s3", "ec2", "ecs", "eks", "cloudformation",
+    "docker", "kubernetes", "k8s", "helm", "terraform", "ansible", "puppet", "chef", "jenkins",
+    "github actions", "gitlab ci", "circleci", "ci/cd", "git", "linux", "unix", "nginx", "istio",
+    "prometheus", "grafana", "datadog", "splunk", "new relic", "opentelemetry", "sentry",
+    "pandas", "numpy", "scipy", "scikit-learn", "pytorch", "tensorflow", "keras", "xgboost",
+    "machine learning", "deep learning", "nlp", "computer vision", "llm", "mlops", "data science",
+    "microservices", "distributed systems", "event-driven", "serverless", "oauth", "sso",
+    "agile", "scrum", "tdd", "unit testing", "selenium", "cypress", "jest", "pytest", "junit",
+    "ios", "android", "react native", "flutter", "figma", "tableau", "power bi", "etl",
+)
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could do does for from
+has have having he her his how i if in into is it its just may me more most must my no not of on
+or our out over own per she should so some such than that the their them then there these they
+this those through to under up us very was we were what when where which while who will with
+within without would you your able across etc using use used work working team teams strong
+experience years year plus preferred required requirements responsibilities including ability
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9+#][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*|\.[a-z]+")
+_SKILL_LINE = re.compile(r"^\s*[-*•]?\s*([^:\n]{0,40}(?:skill|technolog|tool|language|stack|framework)[^:\n]*):(.+)$",
+                         re.IGNORECASE | re.MULTILINE)
+_SKILL_SPLIT = re.compile(r"[,;|/•]|\band\b")
+
+
+def tokenize(text):
+    """Lowercased word tokens with stop words removed (keeps c++, node.js, ci/cd)."""
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def resume_skills(resume_text, tailored=None):
+    """Skill phrases listed in the resume ("Skills: a, b") and in tailored Skills/Technologies."""
+    phrases = []
+    for _, items in _SKILL_LINE.findall(resume_text or ""):
+        phrases.extend(_SKILL_SPLIT.split(items))
+    if tailored:
+        for items in (tailored.get("Skills") or {}).values():
+            phrases.extend(items if isinstance(items, list) else _SKILL_SPLIT.split(str(items)))
+        for job in tailored.get("Experience") or []:
+            techs = job.get("Technologies") or []
+            phrases.extend(techs if isinstance(techs, list) else _SKILL_SPLIT.split(str(techs)))
+    return [p.strip() for p in phrases if p and p.strip()]
+
+
+class _Terms:
+    """Word ids and n-gram keys shared by every text of one scoring call."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = {}
+
+    def word_ids(self, words):
+        ids = self.ids
+        for w in dict.fromkeys(words):  # first-seen order keeps ids deterministic
+            if w not in ids:
+                ids[w] = len(ids)
+        return list(map(ids.__getitem__, words))
+
+    def batch(self, texts):
+        """(doc index, n-gram key) arrays for all 1..MAX_NGRAM-grams of all texts."""
+        tokens = [_TOKEN.findall((t or "").lower()) for t in texts]
+        flat = list(chain.from_iterable(tokens))
+        words = np.array(self.word_ids(flat), dtype=np.int64)
+        owner = np.repeat(np.arange(len(tokens)), [len(t) for t in tokens])
+        # drop stop words by id, not per token in Python
+        stop = np.zeros(len(self.ids), dtype=bool)
+        stop[[i for w, i in self.ids.items() if w in STOPWORDS]] = True
+        keep = ~stop[words]
+        words, owner = words[keep], owner[keep]
+        docs, keys = [], []
+        for n in range(1, MAX_NGRAM + 1):
+            span = len(words) - (n - 1)
+            if span <= 0:
+                break
+            key = np.zeros(span, dtype=np.int64)
+            for offset in range(MAX_NGRAM):
+                key *= _BASE
+                if offset < n:
+                    key += words[offset: offset + span] + 1
+            valid = owner[:span] == owner[n - 1: n - 1 + span]  # n-grams stay inside one text
+            docs.append(owner[:span][valid])
+            keys.append(key[valid])
+        if not docs:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        return np.concatenate(docs), np.concatenate(keys)
+
+    def phrase_key(self, phrase):
+        """The n-gram key of a skill phrase (None if empty or too long)."""
+        words = self.word_ids(tokenize(phrase))
+        if not words or len(words) > MAX_NGRAM:
+            return None
+        key = 0
+        for offset in range(MAX_NGRAM):
+            key = key * _BASE + (words[offset] + 1 if offset < len(words) else 0)
+        self.names.setdefault(key, " ".join(tokenize(phrase)))
+        return key
+
+
+def score_jobs(resume_text, job_descriptions, tailored=None, skills=None):
+    """
+    One score dict per job description (see module docstring), in input order.
+
+    skills adds extra skill phrases to the built-in list and the resume's own.
+    """
+    terms = _Terms()
+    texts = [resume_text or "", *job_descriptions]
+    docs, keys = terms.batch(texts)
+    n_docs = len(texts)
+
+    if not len(keys):
+        empty = {"score": 0.0, "coverage": 0.0, "similarity": 0.0, "skills": 0, "matched": [], "missing": []}
+        return [dict(empty) for _ in job_descriptions]
+
+    # term frequency per (doc, term): unique pairs with counts
+    vocab, term = np.unique(keys, return_inverse=True)
+    pair = docs * len(vocab) + term
+    pairs, tf = np.unique(pair, return_counts=True)
+    pair_doc, pair_term = pairs // len(vocab), pairs % len(vocab)
+
+    # smoothed idf over the batch, sublinear tf
+    df = np.bincount(pair_term, minlength=len(vocab))
+    idf = np.log((n_docs + 1) / (df + 1)) + 1
+    weight = (1 + np.log(tf)) * idf[pair_term]
+    norms = np.sqrt(np.bincount(pair_doc, weight * weight, minlength=n_docs))
+
+    resume_weight = np.zeros(len(vocab))
+    in_resume = pair_doc == 0
+    resume_weight[pair_term[in_resume]] = weight[in_resume]
+    dots = np.bincount(pair_doc, weight * resume_weight[pair_term], minlength=n_docs)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.nan_to_num(dots / (norms * norms[0]))
+
+    # skill coverage: JD skill terms that also occur in the resume
+    skill_keys = {k for k in map(terms.phrase_key, [*TECH_TERMS, *resume_skills(resume_text, tailored), *(skills or ())])
+                  if k is not None}
+    is_skill = np.isin(vocab, np.fromiter(skill_keys, dtype=np.int64, count=len(skill_keys)))
+    has = np.zeros(len(vocab), dtype=bool)
+    has[pair_term[in_resume]] = True
+    jd_skill = is_skill[pair_term] & ~in_resume
+    wanted = np.bincount(pair_doc[jd_skill], minlength=n_docs)
+    matched = np.bincount(pair_doc[jd_skill & has[pair_term]], minlength=n_docs)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(wanted > 0, matched / np.maximum(wanted, 1), 0.0)
+    score = COVERAGE_WEIGHT * coverage + SIMILARITY_WEIGHT * similarity
+
+    # matched / missing skill names, weightiest (rarest in the batch) first
+    order = np.lexsort((-weight[jd_skill], pair_doc[jd_skill]))
+    skill_doc, skill_term = pair_doc[jd_skill][order], pair_term[jd_skill][order]
+    bounds = np.searchsorted(skill_doc, np.arange(n_docs + 1))
+    results = []
+    for i in range(1, n_docs):
+        found = skill_term[bounds[i]: bounds[i + 1]]
+        results.append({
+            "score": round(float(score[i]), 4),
+            "coverage": round(float(coverage[i]), 4),
+            "similarity": round(float(similarity[i]), 4),
+            "skills": int(wanted[i]),
+            "matched": [terms.names[int(vocab[t])] for t in found[has[found]][:REPORT_TERMS]],
+            "missing": [terms.names[int(vocab[t])] for t in found[~has[found]][:REPORT_TERMS]],
+        })
+    return results
+
+
+def rank_jobs(resume_text, jobs, tailored=None, min_score=None):
+    """
+    (job, score dict) pairs for job dicts with a "job_description", best match
+    first; with min_score, jobs below it are left out.
+    """
+    scores = score_jobs(resume_text, [job["job_description"] for job in jobs], tailored)
+    ranked = sorted(zip(jobs, scores), key=lambda pair: -pair[1]["score"])
+    if min_score is not None:
+        ranked = [(job, s) for job, s in ranked if s["score"] >= min_score]
+    return ranked
@@ -0,0 +1,172 @@
+"""
+LLM backend: model settings and one long-lived, pooled HTTP client per process.
+
+    backend = get_backend()
+    backend.client.chat.completions.create(model=backend.model, ...)
+
+Settings come from the environment when the backend is first built:
+
+    RESUME_MODEL                  model name (default gpt-4.1-mini)
+    OPENAI_BASE_URL               OpenAI-compatible endpoint, e.g. a local stand-in
+    OPENAI_API_KEY                API key
+    RESUME_LLM_CONNECT_TIMEOUT    seconds to open a connection (default 5)
+    RESUME_LLM_READ_TIMEOUT       seconds to wait for the next bytes (default 120)
+    RESUME_LLM_MAX_RETRIES        retries on connection errors, 408/409/429/5xx (default 2)
+    RESUME_LLM_MAX_CONNECTIONS    connection pool size (default 20)
+    RESUME_LLM_KEEPALIVE_EXPIRY   seconds an idle connection stays pooled (default 90)
+
+The clients are module-level, so warm serverless invocations and batch
+workers reuse open TLS connections instead of paying a handshake per call.
+Each HTTP request is reported as "new" or "reused" connection, together with
+its time to response headers (see metrics.record_connection): cold vs. warm.
+"""
+import os
+import threading
+import time
+
+import metrics
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+
+def _env_number(name, default, cast=float):
+    value = os.getenv(name)
+    return cast(value) if value not in (None, "") else default
+
+
+# ----------------------- connection tracing -----------------------
+
+class _ConnectionTrace:
+    """httpcore trace extension: notes whether the request opened a TCP connection."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.new = False
+
+    def __call__(self, name, info):
+        if name.startswith("connection.connect_tcp"):
+            self.new = True
+
+    def done(self):
+        metrics.record_connection("new" if self.new else "reused", time.perf_counter() - self.started)
+
+
+class _AsyncConnectionTrace(_ConnectionTrace):
+    async def __call__(self, name, info):
+        super().__call__(name, info)
+
+
+def _on_request(request):
+    request.extensions["trace"] = _ConnectionTrace()
+
+
+def _on_response(response):
+    trace = response.request.extensions.get("trace")
+    if isinstance(trace, _ConnectionTrace):
+        trace.done()
+
+
+async def _on_request_async(request):
+    request.extensions["trace"] = _AsyncConnectionTrace()
+
+
+async def _on_response_async(response):
+    _on_response(response)
+
+
+# ----------------------- backend -----------------------
+
+class LLMBackend:
+    """Model name, endpoint, timeouts and retries plus the lazily built clients."""
+
+    def __init__(self, model=None, base_url=None, api_key=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, max_connections=None, keepalive_expiry=None):
+        self.model = model or os.getenv("RESUME_MODEL") or DEFAULT_MODEL
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout or _env_number("RESUME_LLM_CONNECT_TIMEOUT", 5.0)
+        self.read_timeout = read_timeout or _env_number("RESUME_LLM_READ_TIMEOUT", 120.0)
+        self.max_retries = max_retries if max_retries is not None else _env_number("RESUME_LLM_MAX_RETRIES", 2, int)
+        self.max_connections = max_connections or _env_number("RESUME_LLM_MAX_CONNECTIONS", 20, int)
+        self.keepalive_expiry = keepalive_expiry or _env_number("RESUME_LLM_KEEPALIVE_EXPIRY", 90.0)
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    def _client_options(self):
+        import httpx
+
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=self.connect_timeout)
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        # a local stand-in server does not check the key, but the SDK requires one
+        api_key = self.api_key or os.getenv("OPENAI_API_KEY") or ("local" if self.base_url else None)
+        return timeout, limits, {"api_key": api_key, "base_url": self.base_url,
+                                 "max_retries": self.max_retries, "timeout": timeout}
+
+    @property
+    def client(self):
+        """Shared openai.OpenAI over a pooled keep-alive HTTP client."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import DefaultHttpxClient, OpenAI
+
+                    timeout, limits, options = self._client_options()
+                    http_client = DefaultHttpxClient(
+                        timeout=timeout, limits=limits,
+                        event_hooks={"request": [_on_request], "response": [_on_response]},
+                    )
+                    self._client = OpenAI(http_client=http_client, **options)
+        return self._client
+
+    @property
+    def async_client(self):
+        """Shared openai.AsyncOpenAI, same settings (bound to the event loop that first uses it)."""
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+                    timeout, limits, options = self._client_options()
+                    http_client = DefaultAsyncHttpxClient(
+                        timeout=timeout, limits=limits,
+                        event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+                    )
+                    self._async_client = AsyncOpenAI(http_client=http_client, **options)
+        return self._async_client
+
+    def close(self):
+        """Close the sync client's pooled connections (the async one closes with its loop)."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        self._async_client = None
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide backend, built from the environment on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                _backend = LLMBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the process-wide backend (e.g. to point at a stand-in server); returns the old one."""
+    global _backend
+    with _backend_lock:
+        old, _backend = _backend, backend
+    return old
@@ -0,0 +1,297 @@
+"""
+Per-stage timing and token instrumentation.
+
+    with metrics.run("api") as trace:
+        with metrics.stage("prompt"):
+            ...
+        metrics.record_tokens(usage)
+    trace.as_dict()            # stages, per-stage breakdown, tokens, total
+    metrics.prometheus_text()  # process-wide histograms and counters
+
+Every stage feeds the process-wide aggregates. Inside run() it is also added
+to that run's trace, which is written as one JSON line to the
+"resume.metrics" logger (and appended to RESUME_METRICS_LOG if set) when the
+run ends. Nested stages report their own time minus their children's, so the
+breakdown of a run does not count the same time twice.
+
+Only the standard library is used: this module is imported on the cold path.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Buckets in seconds, shared by every histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_KINDS = ("prompt_tokens", "completion_tokens", "cached_tokens")
+
+# metric -> (exported name, label name, help); one label per metric keeps it simple
+HISTOGRAMS = {
+    "stage": ("resume_stage_seconds", "stage", "Time spent per pipeline stage."),
+    "ttft": ("resume_ttft_seconds", "stage", "Time to first token of model requests."),
+    "model_ttft": ("resume_model_ttft_seconds", "model", "Time to first token per model (routed requests)."),
+    "llm_headers": ("resume_llm_headers_seconds", "connection",
+                    "Model HTTP request time until response headers, on a new (cold) or reused (warm) connection."),
+}
+COUNTERS = {
+    "llm_requests": ("resume_llm_requests_total", "connection",
+                     "Model HTTP requests by connection: new (TCP/TLS handshake) or reused from the pool."),
+    "llm_hedges": ("resume_llm_hedges_total", "outcome",
+                   "Hedged duplicate requests: sent, won (finished first), lost, or skipped (over budget)."),
+}
+
+logger = logging.getLogger("resume.metrics")
+
+_trace = contextvars.ContextVar("resume_metrics_trace", default=None)
+_frame = contextvars.ContextVar("resume_metrics_frame", default=None)
+
+_lock = threading.Lock()
+_histograms = {}  # (metric, label value) -> [bucket counts..., count, sum]
+_counters = {}  # (counter, label value) -> count
+_tokens = {kind: 0 for kind in TOKEN_KINDS}
+_runs = {}  # (run, status) -> count
+
+
+class Trace:
+    """Stages and tokens of one run (one generation, one API request)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.status = "ok"
+        self.total_ms = None
+        self.stages = []
+        self.tokens = {}
+        self.connections = {}
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()  # fan-out threads add stages concurrently
+
+    def add_stage(self, entry):
+        with self._lock:
+            self.stages.append(entry)
+
+    def add_tokens(self, usage):
+        with self._lock:
+            for kind in TOKEN_KINDS:
+                self.tokens[kind] = self.tokens.get(kind, 0) + (usage.get(kind) or 0)
+
+    def add_connection(self, state):
+        with self._lock:
+            self.connections[state] = self.connections.get(state, 0) + 1
+
+    def breakdown(self):
+        """{stage: milliseconds of self time}, summed over repeated stages."""
+        out = {}
+        for entry in self.stages:
+            out[entry["stage"]] = round(out.get(entry["stage"], 0) + entry["self_ms"], 2)
+        return out
+
+    def as_dict(self):
+        return {
+            "run": self.name,
+            "started": self.started,
+            "status": self.status,
+            "total_ms": self.total_ms,
+            "breakdown": self.breakdown(),
+            "tokens": dict(self.tokens),
+            "connections": dict(self.connections),
+            "stages": list(self.stages),
+        }
+
+
+def _observe(metric, label, seconds):
+    with _lock:
+        hist = _histograms.get((metric, label))
+        if hist is None:
+            hist = _histograms[(metric, label)] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+
+def observe_histogram(metric, label, seconds):
+    """Add one sample to a histogram from HISTOGRAMS (no trace entry)."""
+    _observe(metric, label, seconds)
+
+
+def increment(counter, label, amount=1):
+    """Bump a counter from COUNTERS."""
+    with _lock:
+        _counters[(counter, label)] = _counters.get((counter, label), 0) + amount
+
+
+def observe(stage, seconds, **fields):
+    """Record a stage measured by the caller (e.g. a stream with its own clock)."""
+    _observe("stage", stage, seconds)
+    ttft_ms = fields.get("ttft_ms")
+    if ttft_ms is not None:
+        _observe("ttft", stage, ttft_ms / 1000)
+    parent = _frame.get()
+    if parent is not None:
+        parent["children"] += seconds
+    trace = _trace.get()
+    if trace is not None:
+        ms = round(seconds * 1000, 2)
+        trace.add_stage({"stage": stage, "ms": ms, "self_ms": fields.pop("self_ms", ms), **fields})
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Time the block as stage `name`. Yields a dict; keys set on it (e.g.
+    ttft_ms) are stored with the stage in the trace.
+    """
+    frame = {"children": 0.0}
+    token = _frame.set(frame)
+    t0 = time.perf_counter()
+    try:
+        yield fields
+    except BaseException:
+        fields["error"] = True
+        raise
+    finally:
+        _frame.reset(token)
+        seconds = time.perf_counter() - t0
+        self_ms = round(max(seconds - frame["children"], 0.0) * 1000, 2)
+        observe(name, seconds, self_ms=self_ms, **fields)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_tokens(usage):
+    """Add a usage dict (see prompts.usage_from_response) to the counters and the current run."""
+    if not usage:
+        return
+    with _lock:
+        for kind in TOKEN_KINDS:
+            _tokens[kind] += usage.get(kind) or 0
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_tokens(usage)
+
+
+def record_connection(state, seconds):
+    """One model HTTP request on a "new" or "reused" connection, timed to response headers."""
+    increment("llm_requests", state)
+    _observe("llm_headers", state, seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_connection(state)
+
+
+def current_trace():
+    return _trace.get()
+
+
+def emit(trace):
+    """Write a finished trace as one JSON log line."""
+    line = json.dumps(trace.as_dict(), ensure_ascii=False)
+    logger.info(line)
+    path = os.getenv("RESUME_METRICS_LOG")
+    if path:
+        with _lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@contextmanager
+def run(name):
+    """Collect every stage inside the block into a new Trace; emitted on exit."""
+    trace = Trace(name)
+    token = _trace.set(trace)
+    frame_token = _frame.set(None)
+    try:
+        yield trace
+    except BaseException:
+        trace.status = "error"
+        raise
+    finally:
+        try:
+            _frame.reset(frame_token)
+            _trace.reset(token)
+        except ValueError:
+            # a generator finished in a different context than it started in
+            _trace.set(None)
+        trace.total_ms = round((time.perf_counter() - trace._t0) * 1000, 2)
+        with _lock:
+            _runs[(name, trace.status)] = _runs.get((name, trace.status), 0) + 1
+        emit(trace)
+
+
+def bind(func):
+    """Wrap func so it runs in a copy of the caller's context (for thread pools)."""
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, func)
+
+
+# ----------------------- export -----------------------
+
+def server_timing(trace):
+    """Server-Timing header value with the self time of each stage of a trace."""
+    parts = [f"{name};dur={ms}" for name, ms in trace.breakdown().items()]
+    parts.append(f"total;dur={trace.total_ms}")
+    return ", ".join(parts)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text():
+    """All aggregates in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {key: list(value) for key, value in _histograms.items()}
+        counters = dict(_counters)
+        tokens = dict(_tokens)
+        runs = dict(_runs)
+
+    lines = []
+    for metric, (name, label, help_text) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (m, value), hist in sorted(histograms.items()):
+            if m != metric:
+                continue
+            for bound, count in zip(BUCKETS, hist):
+                lines.append(f"{name}_bucket{_labels(**{label: value, 'le': bound})} {count}")
+            lines.append(f"{name}_bucket{_labels(**{label: value, 'le': '+Inf'})} {hist[-2]}")
+            lines.append(f"{name}_sum{_labels(**{label: value})} {hist[-1]:.6f}")
+            lines.append(f"{name}_count{_labels(**{label: value})} {hist[-2]}")
+
+    for counter, (name, label, help_text) in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (c, value), count in sorted(counters.items()):
+            if c == counter:
+                lines.append(f"{name}{_labels(**{label: value})} {count}")
+
+    lines += ["# HELP resume_tokens_total Model tokens used.", "# TYPE resume_tokens_total counter"]
+    for kind, count in tokens.items():
+        lines.append(f"resume_tokens_total{_labels(kind=kind.replace('_tokens', ''))} {count}")
+
+    lines += ["# HELP resume_runs_total Finished runs by outcome.", "# TYPE resume_runs_total counter"]
+    for (name, status), count in sorted(runs.items()):
+        lines.append(f"resume_runs_total{_labels(run=name, status=status)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Clear all aggregates (tests and benchmarks)."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _runs.clear()
+        for kind in TOKEN_KINDS:
+            _tokens[kind] = 0
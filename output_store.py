@@ -0,0 +1,69 @@
+"""
+Opt-in on-disk sink for rendered resumes.
+
+Rendering happens in memory (create_docx/create_pdf return bytes); this store
+is only used when a copy should also be kept on disk. Every save prunes the
+directory so it cannot grow without bound.
+"""
+import os
+import re
+import time
+
+import metrics
+
+
+class OutputStore:
+    def __init__(self, directory=None, max_files=50, max_age=7 * 24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.directory = directory or os.getenv("RESUME_OUTPUT_DIR") or "outputs"
+        self.max_files = max_files
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    @metrics.timed("file_io")
+    def save(self, filename, data: bytes) -> str:
+        """Write data under a sanitized filename and return its path."""
+        os.makedirs(self.directory, exist_ok=True)
+        safe = re.sub(r"[^A-Za-z0-9._-]+", "_", filename).strip("._") or "resume"
+        path = os.path.join(self.directory, safe)
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # readers never see a half-written file
+        self.prune(keep=path)
+        return path
+
+    def prune(self, keep=None):
+        """Drop expired files, then the oldest ones until count and size limits hold."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            if path != keep and now - st.st_mtime > self.max_age:
+                os.remove(path)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()  # oldest first
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if count <= self.max_files and total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            count -= 1
+            total -= size
+
+
+_store = None
+
+
+def get_output_store():
+    global _store
+    if _store is None:
+        _store = OutputStore()
+    return _store
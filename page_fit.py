@@ -0,0 +1,198 @@
+"""
+Fit the PDF into a page budget by measuring, not by rebuilding.
+
+    tailored, styles, report = fit_to_pages(tailored, 1, styles_config)
+    create_pdf("", tailored, styles_config=styles)
+    create_docx("", tailored, styles_config=styles)   # same sizes and spacing
+
+Each candidate layout is measured by wrapping and splitting the PDF flowables
+in a simulated frame, the same way Frame.add / doc.handle_flowable place
+them, without drawing or writing a PDF. A single knob t in [0, 1] moves all
+font sizes, the leading gap and the section spacing from the chosen styles
+(t=1) to the MIN_* limits (t=0). The largest t that fits is found by binary
+search. If even t=0 does not fit, the lowest-priority bullets are dropped:
+the last bullet of the longest, oldest position first. Another binary search
+finds the fewest drops that fit, then t is searched again with them.
+
+The chosen styles are never larger than the ones passed in; fitting only
+shrinks.
+"""
+import copy
+from functools import lru_cache
+
+import metrics
+
+MIN_SIZES = {"title_size": 14, "heading_size": 11, "subheading_size": 9, "body_size": 8}
+MIN_LEADING_GAP = 0.5
+MIN_SPACING = 0.3
+SEARCH_STEPS = 6  # binary search steps on t (resolution 1/64)
+MIN_BULLETS = 2   # never trim a position below this many bullets
+
+
+@lru_cache(maxsize=1)
+def frame_size():
+    """(width, height) available to flowables on a SimpleDocTemplate page."""
+    import io
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(io.BytesIO())
+    padding = 6  # Frame default on every side
+    return doc.width - 2 * padding, doc.height - 2 * padding
+
+
+def count_pages(flowables, limit=None):
+    """
+    Pages needed to lay out flowables, following reportlab's frame logic
+    (attached space collapsing, splitting at the frame bottom, moving to the
+    next page). Stops early once more than limit pages are needed.
+    """
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus.frames import _FUZZ
+
+    # some flowables (lists) measure text through .canv, as set by Frame.add
+    canv = Canvas(None)
+    width, height = frame_size()
+    pending = list(reversed(flowables))
+    pages, y, at_top, prev_after = 1, height, True, 0
+    while pending:
+        if limit is not None and pages > limit:
+            break
+        f = pending.pop()
+        f.canv = canv
+        s = 0 if at_top else max(f.getSpaceBefore() - prev_after, 0)
+        avail = y - s
+        if avail > 0:
+            _, h = f.wrap(width, avail)
+            if y - h - s >= -_FUZZ:
+                prev_after = f.getSpaceAfter()
+                if h + s + prev_after:
+                    at_top = False
+                y -= h + s + prev_after
+                continue
+            parts = f.split(width, avail)
+            if parts and parts != [f]:
+                # lists split into their items without checking the first
+                # fits, so every part goes back through the loop
+                pending.extend(reversed(parts))
+                continue
+        if at_top:
+            # too tall for an empty page; reportlab would fail, count it whole
+            f.wrap(width, height)
+            y, at_top = 0, False
+            continue
+        pending.append(f)
+        pages, y, at_top, prev_after = pages + 1, height, True, 0
+    return pages
+
+
+def scaled_styles(styles_config, t):
+    """styles_config moved a fraction (1 - t) of the way to the MIN_* limits."""
+    from render_styles import LEADING_GAP
+
+    def lerp(high, low):
+        return low + (high - low) * t if high > low else high
+
+    out = dict(styles_config)
+    for key, low in MIN_SIZES.items():
+        # half points: the smallest step Word stores
+        out[key] = round(lerp(styles_config[key], low) * 2) / 2
+    out["leading_gap"] = round(lerp(styles_config.get("leading_gap", LEADING_GAP), MIN_LEADING_GAP), 2)
+    out["spacing_scale"] = round(lerp(styles_config.get("spacing_scale", 1.0), MIN_SPACING), 3)
+    return out
+
+
+def trim_order(tailored, min_bullets=MIN_BULLETS):
+    """
+    (position index, bullet index) pairs in the order they would be dropped:
+    always from the position with the most remaining bullets, the older
+    (later listed) position on ties, its last bullet first.
+    """
+    remaining = [len(job.get("Responsibilities") or []) for job in tailored.get("Experience") or []]
+    order = []
+    while True:
+        candidates = [(n, i) for i, n in enumerate(remaining) if n > min_bullets]
+        if not candidates:
+            return order
+        _, i = max(candidates)
+        remaining[i] -= 1
+        order.append((i, remaining[i]))
+
+
+def drop_bullets(tailored, drops):
+    """Copy of tailored without the given (position, bullet) pairs."""
+    if not drops:
+        return tailored
+    out = copy.deepcopy(tailored)
+    drop = set(drops)
+    for i, job in enumerate(out["Experience"]):
+        job["Responsibilities"] = [b for j, b in enumerate(job["Responsibilities"]) if (i, j) not in drop]
+    return out
+
+
+def fit_to_pages(tailored, pages, styles_config=None, include_tech=True, trim=True):
+    """
+    Returns (tailored, styles_config, report) that render in at most pages
+    pages. tailored is only changed (copied) if bullets had to be dropped.
+    report: pages, page_count, fits, scale (t), styles (the changed keys),
+    dropped_bullets, measurements.
+    """
+    from resume_logic import DEFAULT_STYLES, pdf_flowables
+
+    base = {**DEFAULT_STYLES, **(styles_config or {})}
+    measured = []
+
+    def measure(content, t):
+        styles = scaled_styles(base, t) if t < 1 else base
+        measured.append(t)
+        return count_pages(pdf_flowables(content, include_tech, styles), limit=pages)
+
+    def best_scale(content):
+        # largest t in [0, 1] that fits, or None if not even t=0 does
+        if measure(content, 1.0) <= pages:
+            return 1.0
+        if measure(content, 0.0) > pages:
+            return None
+        low, high = 0.0, 1.0
+        for _ in range(SEARCH_STEPS):
+            mid = (low + high) / 2
+            if measure(content, mid) <= pages:
+                low = mid
+            else:
+                high = mid
+        return low
+
+    with metrics.stage("page_fit", pages=pages):
+        drops = []
+        t = best_scale(tailored)
+        if t is None and trim:
+            order = trim_order(tailored)
+            # fewest drops that fit at the smallest styles
+            low, high = 0, len(order)
+            if measure(drop_bullets(tailored, order), 0.0) <= pages:
+                while low < high:
+                    mid = (low + high) // 2
+                    if measure(drop_bullets(tailored, order[:mid]), 0.0) <= pages:
+                        high = mid
+                    else:
+                        low = mid + 1
+                drops = order[:low]
+                t = best_scale(drop_bullets(tailored, drops))
+            else:
+                drops = order
+        fitted = drop_bullets(tailored, drops)
+        fits = t is not None
+        styles = base if t == 1.0 else scaled_styles(base, t or 0.0)
+        page_count = count_pages(pdf_flowables(fitted, include_tech, styles))
+
+    report = {
+        "pages": pages,
+        "page_count": page_count,
+        "fits": fits,
+        "scale": t if fits else 0.0,
+        "styles": {k: v for k, v in styles.items() if base.get(k) != v},
+        "dropped_bullets": [
+            {"position": i, "bullet": tailored["Experience"][i]["Responsibilities"][j]} for i, j in drops
+        ],
+        "measurements": len(measured) + 1,
+    }
+    return fitted, styles, report
@@ -0,0 +1,296 @@
+"""
+Parse-once store of structured base-resume profiles.
+
+The same base resume is tailored against every job description, yet each
+tailoring call used to send the raw text and have the model re-derive the
+header, companies, titles, dates and education. With profiles:
+
+  1. the resume is parsed once (one model call) into Header, Summary, Skills,
+     Experience (Company, Title, Dates, original bullets, Technologies) and
+     Education, and stored locally under a hash of its normalized text
+  2. tailoring sends a compact text rendering of that profile without the
+     header or education, and asks only for Summary, Skills and, per
+     position, Responsibilities and Technologies
+  3. Header, Education and each position's Company/Title/Dates are filled
+     in locally from the stored profile
+
+    tailored = tailor_resume(resume, jd, profile=True)    # or RESUME_PROFILE=1
+
+Profiles are JSON files in RESUME_PROFILE_DIR (default: a "profiles" folder
+next to the response cache), kept in memory once read. Concurrent calls for
+the same new resume parse it only once.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import weakref
+
+import metrics
+from response_cache import default_cache_path, normalize_text
+
+PROFILE_VERSION = "1"  # bump when PARSE_PROMPT changes what a stored profile holds
+
+PARSE_PROMPT = """You are a resume parser and a helpful assistant that ONLY returns JSON.
+Extract the resume's content exactly as written. Do NOT rewrite, tailor, reorder or invent anything.
+
+Return a STRICT JSON object with these keys ONLY:
+- Header (object): Name (string, required); Email, Phone, Address (strings, if present); Links, Other (arrays of strings, optional)
+- Summary (string, empty if the resume has none)
+- Skills (object where each key is a category and value is an array of strings)
+- Experience (array, in resume order, each with: Company, Title, Dates, Responsibilities[] (the original bullets); Technologies is optional array)
+- Education (object with Dates, Degree, Institution (university/school name), GPA; Location is optional)"""
+
+PROFILE_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+Tailor the candidate profile to the job description. The header, company names, titles, dates and
+education are filled in from the profile, so do NOT return them.
+
+Return a STRICT JSON object with these keys ONLY:
+- Summary (string)
+- Skills (object where each key is a category and value is an array of strings)
+- Experience (array with exactly one object per profile position, in the same order, each with: Responsibilities[]; Technologies is optional array)
+
+Constraints:
+- Be truthful to the profile and job description."""
+
+
+def profile_key(resume_text):
+    raw = json.dumps({"resume": normalize_text(resume_text), "version": PROFILE_VERSION}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def default_profile_dir():
+    return os.getenv("RESUME_PROFILE_DIR") or os.path.join(os.path.dirname(default_cache_path()), "profiles")
+
+
+def profile_enabled():
+    return os.getenv("RESUME_PROFILE", "0").lower() in ("1", "true", "yes")
+
+
+class ProfileStore:
+    def __init__(self, directory=None):
+        self.directory = directory or default_profile_dir()
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "parsed": 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            profile = self._memory.get(key)
+        if profile is None:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    profile = json.load(f)
+            except (OSError, ValueError):
+                return None  # missing, or torn by a crash: parse again
+            with self._lock:
+                self._memory[key] = profile
+        return profile
+
+    def set(self, key, profile):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))  # readers never see a half-written profile
+        with self._lock:
+            self._memory[key] = profile
+
+    def count(self, outcome):
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, memory_entries=len(self._memory))
+
+
+_store = None
+# per-resume parse locks, gone once no parse holds or waits on them
+_parse_locks = weakref.WeakValueDictionary()
+_parse_locks_guard = threading.Lock()
+_async_parse_locks = weakref.WeakKeyDictionary()  # event loop -> WeakValueDictionary of locks
+
+
+def get_profile_store():
+    global _store
+    if _store is None:
+        _store = ProfileStore()
+    return _store
+
+
+def _parse_lock(key):
+    with _parse_locks_guard:
+        return _parse_locks.setdefault(key, threading.Lock())
+
+
+def _async_parse_lock(key):
+    # asyncio locks belong to one event loop (batch runs each start their own)
+    loop = asyncio.get_running_loop()
+    with _parse_locks_guard:
+        locks = _async_parse_locks.setdefault(loop, weakref.WeakValueDictionary())
+        return locks.setdefault(key, asyncio.Lock())
+
+# ----------------------- parse -----------------------
+
+def parse_messages(resume_text):
+    from prompts import compact
+
+    return [
+        {"role": "system", "content": PARSE_PROMPT},
+        {"role": "user", "content": f"Resume:\n{compact(resume_text)}"},
+    ]
+
+
+def normalize_profile(parsed):
+    """Parsed JSON -> profile in the tailored schema's shapes (nothing is repaired)."""
+    from schema import normalize_education, normalize_header, normalize_job, normalize_skills
+
+    problems = []  # a profile may legitimately lack a summary, skills or bullets
+    parsed = parsed if isinstance(parsed, dict) else {}
+    experience = parsed.get("Experience")
+    if isinstance(experience, dict):
+        experience = [experience]
+    return {
+        "Header": normalize_header(parsed.get("Header"), problems),
+        "Summary": str(parsed.get("Summary") or "").strip(),
+        "Skills": normalize_skills(parsed.get("Skills"), problems),
+        "Experience": [normalize_job(job, i, problems) for i, job in enumerate(experience or [])],
+        "Education": normalize_education(parsed.get("Education"), problems),
+    }
+
+
+def get_profile(resume_text, client=None, store=None):
+    """(profile, info) for resume_text, parsing it only if it is not stored yet."""
+    from resume_logic import chat_json
+
+    store = store or get_profile_store()
+    key = profile_key(resume_text)
+    profile = store.get(key)
+    if profile is None:
+        with _parse_lock(key):
+            profile = store.get(key)  # parsed meanwhile by a concurrent call
+            if profile is None:
+                with metrics.stage("profile_parse"):
+                    parsed, usage = chat_json(parse_messages(resume_text), client)
+                    profile = normalize_profile(parsed)
+                store.set(key, profile)
+                store.count("parsed")
+                return profile, {"profile": "parsed", "usage": usage}
+    store.count("hits")
+    return profile, {"profile": "stored", "usage": {}}
+
+
+async def get_profile_async(resume_text, client, store=None):
+    """Async get_profile for batch runs; client is an async OpenAI-style client."""
+    from prompts import usage_from_response
+    from resume_logic import get_model
+
+    store = store or get_profile_store()
+    key = profile_key(resume_text)
+    profile = store.get(key)
+    if profile is None:
+        # the thread lock would block the event loop: serialize on the loop instead
+        async with _async_parse_lock(key):
+            profile = store.get(key)
+            if profile is None:
+                with metrics.stage("profile_parse"):
+                    response = await client.chat.completions.create(
+                        model=get_model(), messages=parse_messages(resume_text),
+                        response_format={"type": "json_object"},
+                    )
+                    profile = normalize_profile(json.loads(response.choices[0].message.content))
+                usage = usage_from_response(response)
+                metrics.record_tokens(usage)
+                await asyncio.to_thread(store.set, key, profile)
+                store.count("parsed")
+                return profile, {"profile": "parsed", "usage": usage}
+    store.count("hits")
+    return profile, {"profile": "stored", "usage": {}}
+
+# ----------------------- tailor -----------------------
+
+def profile_text(profile):
+    """Compact plain-text rendering of the parts of a profile the model tailors from."""
+    lines = []
+    if profile.get("Summary"):
+        lines += ["Summary:", profile["Summary"], ""]
+    for i, job in enumerate(profile.get("Experience") or [], 1):
+        lines.append(f"Position {i}: {' | '.join(filter(None, (job.get('Title'), job.get('Company'), job.get('Dates'))))}")
+        lines += [f"- {bullet}" for bullet in job.get("Responsibilities") or []]
+        if job.get("Technologies"):
+            lines.append(f"Technologies: {', '.join(job['Technologies'])}")
+        lines.append("")
+    if profile.get("Skills"):
+        lines.append("Skills:")
+        lines += [f"{category}: {', '.join(items)}" for category, items in profile["Skills"].items()]
+    return "\n".join(lines).strip()
+
+
+def profile_messages(profile, job_description, custom_prompt=None, input_budget=None):
+    """assemble_messages with the profile text in place of the raw resume."""
+    from prompts import assemble_messages
+
+    messages, info = assemble_messages(profile_text(profile), job_description, custom_prompt, input_budget,
+                                       system_prompt=PROFILE_PROMPT)
+    messages[1]["content"] = messages[1]["content"].replace("Resume:", "Candidate profile:", 1)
+    return messages, info
+
+
+def apply_profile(profile, generated, partial=False):
+    """
+    Tailored resume from the stored profile plus the generated sections.
+    Generated positions are matched to profile positions by order; with
+    partial (a cancelled generation) only the positions generated so far
+    are kept.
+    """
+    generated = generated if isinstance(generated, dict) else {}
+    entries = generated.get("Experience")
+    entries = entries if isinstance(entries, list) else []
+    experience = []
+    for i, position in enumerate(profile.get("Experience") or []):
+        if partial and i >= len(entries):
+            break
+        entry = entries[i] if i < len(entries) and isinstance(entries[i], dict) else {}
+        job = {
+            "Company": position.get("Company", ""),
+            "Title": position.get("Title", ""),
+            "Dates": position.get("Dates", ""),
+            "Responsibilities": entry.get("Responsibilities") or [],
+        }
+        if entry.get("Technologies"):
+            job["Technologies"] = entry["Technologies"]
+        experience.append(job)
+    tailored = {
+        "Header": profile.get("Header") or {},
+        "Summary": generated.get("Summary") or "",
+        "Skills": generated.get("Skills") or {},
+        "Experience": experience,
+        "Education": profile.get("Education") or {},
+    }
+    if partial:
+        tailored = {k: v for k, v in tailored.items() if v}
+    return tailored
+
+
+def tailor_from_profile(resume_text, job_description, custom_prompt=None, input_budget=None):
+    """Returns (tailored, usage, prompt_info) in the same schema as tailor_resume."""
+    from cancellation import GenerationCancelled
+    from prompts import merge_usage
+    from resume_logic import chat_json
+
+    try:
+        profile, info = get_profile(resume_text)
+    except GenerationCancelled:
+        raise GenerationCancelled() from None  # parsed sections are not tailored ones
+    messages, prompt_info = profile_messages(profile, job_description, custom_prompt, input_budget)
+    try:
+        generated, usage = chat_json(messages)
+    except GenerationCancelled as e:
+        raise GenerationCancelled(apply_profile(profile, e.partial, partial=True)) from None
+    prompt_info = dict(prompt_info, profile=info["profile"])
+    return apply_profile(profile, generated), merge_usage(info["usage"], usage), prompt_info
@@ -0,0 +1,174 @@
+"""
+Prompt assembly for tailor_resume.
+
+Messages are laid out stable-first so the provider's automatic prompt-prefix
+caching can reuse as much as possible between calls:
+
+    system:  rules + JSON schema                  (identical for every call)
+    user:    base resume                          (identical across JDs)
+    user:    job description + custom prompt     (varies per call)
+
+Text is whitespace-compacted and de-duplicated, token counts are estimated
+locally, and the job description is trimmed of boilerplate (EEO statements,
+benefits, "about us"...) when the input would exceed the configured budget.
+"""
+import logging
+import os
+import re
+
+import metrics
+
+logger = logging.getLogger("resume.prompts")
+
+SYSTEM_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+Tailor the given resume to the job description.
+
+Return a STRICT JSON object with these keys ONLY:
+- Header (object):
+  - Name (string, required)
+  - Email, Phone, Address (strings, if known)
+  - Links (array of strings, optional; e.g., LinkedIn, GitHub, portfolio)
+  - Other (array of strings, optional; e.g., extra contact info)
+- Summary (string)
+- Skills (object where each key is a category and value is an array of strings)
+- Experience (array of objects, each with: Company, Title, Dates, Responsibilities[]; Technologies is optional array)
+- Education (object with Dates, Degree, Institution (university/school name), GPA; Location is optional)
+
+Constraints:
+- Be truthful to resume and job description.
+- If any contact field is missing, omit that field rather than inventing."""
+
+DEFAULT_INPUT_BUDGET = int(os.getenv("RESUME_INPUT_TOKEN_BUDGET", "12000"))
+# The job description never shrinks below this, even if the rest of the
+# prompt leaves less: a request without it would come back untailored.
+MIN_JD_TOKENS = 500
+
+# Paragraphs matching these are dropped first, in this order, when the job
+# description has to shrink to fit the budget.
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"equal (employment )?opportunity|\beeo\b|without regard to|protected (veteran|class)|disabilit",
+        r"reasonable accommodation|privacy (notice|policy)|e-verify|background check",
+        r"\bbenefits\b|\b401\(?k\)?|paid time off|\bpto\b|health insurance|dental|vision|perks|parental leave",
+        r"salary range|compensation|pay range|\$\s?\d{2,3}[,.]?\d{0,3}\s?k?\s?[-–]",
+        r"about (us|the company)|our mission|who we are|founded in|backed by",
+        r"how to apply|apply now|recruit(er|ing) agenc",
+    )
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 chars/token, floored by word count)."""
+    if not text:
+        return 0
+    return max(len(text) // 4, int(len(text.split()) * 1.3), 1)
+
+
+def compact(text: str) -> str:
+    """Trim lines, collapse runs of spaces and blank lines, drop repeated lines."""
+    out = []
+    seen = set()
+    blank = False
+    for raw in (text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = re.sub(r"[ \t]+", " ", raw).strip()
+        if not line:
+            blank = bool(out)
+            continue
+        norm = line.lower()
+        if len(norm) > 20 and norm in seen:
+            continue  # long repeated lines only; short ones ("Responsibilities:") may legitimately recur
+        seen.add(norm)
+        if blank:
+            out.append("")
+            blank = False
+        out.append(line)
+    return "\n".join(out)
+
+
+def _strip_known_rules(custom_prompt: str) -> str:
+    # Instructions already present in the system prompt add tokens and nothing else
+    known = {line.strip().lower() for line in SYSTEM_PROMPT.split("\n") if line.strip()}
+    kept = [line for line in compact(custom_prompt).split("\n") if line.strip().lower() not in known]
+    return "\n".join(kept).strip()
+
+
+def trim_job_description(job_description: str, max_tokens: int) -> tuple[str, bool]:
+    """Fit the job description into max_tokens (at least MIN_JD_TOKENS); returns (text, trimmed?)."""
+    max_tokens = max(max_tokens, MIN_JD_TOKENS)
+    text = compact(job_description)
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    for pattern in BOILERPLATE_PATTERNS:
+        paragraphs = [p for p in paragraphs if not pattern.search(p)]
+        text = "\n\n".join(paragraphs)
+        if estimate_tokens(text) <= max_tokens:
+            return text, True
+
+    # still too long: keep the head, where titles and requirements usually are
+    return text[: max_tokens * 4], True
+
+
+@metrics.timed("prompt")
+def assemble_messages(resume_text, job_description, custom_prompt=None, input_budget=None,
+                      system_prompt=None, suffix=None):
+    """
+    Return (messages, info) with the stable-prefix layout described above.
+
+    system_prompt replaces the default rules (e.g. for fan-out sub-requests);
+    suffix is appended last, after the job description and custom prompt.
+    """
+    budget = DEFAULT_INPUT_BUDGET if input_budget is None else input_budget
+    system_prompt = system_prompt or SYSTEM_PROMPT
+    resume = compact(resume_text)
+    extra = _strip_known_rules(custom_prompt) if custom_prompt else ""
+
+    fixed = sum(estimate_tokens(t) for t in (system_prompt, resume, extra, suffix)) + 32
+    if budget - fixed < MIN_JD_TOKENS:
+        logger.warning("input budget %d leaves %d tokens for the job description (resume, rules and schema take "
+                       "%d); keeping %d and going over budget", budget, budget - fixed, fixed, MIN_JD_TOKENS)
+    jd, trimmed = trim_job_description(job_description, budget - fixed)
+
+    variable = f"Job Description:\n{jd}"
+    if extra:
+        variable += f"\n\nAdditional instructions:\n{extra}"
+    if suffix:
+        variable += f"\n\n{suffix}"
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Resume:\n{resume}"},
+        {"role": "user", "content": variable},
+    ]
+    info = {
+        "estimated_prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+        "input_budget": budget,
+        "jd_trimmed": trimmed,
+        "over_budget": budget - fixed < MIN_JD_TOKENS,
+    }
+    return messages, info
+
+
+def usage_from_response(response) -> dict:
+    """Token usage of a chat completion, including provider-cached prompt tokens."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+    }
+
+
+def merge_usage(*usages) -> dict:
+    """Sum several usage dicts (e.g. the sub-requests of one fan-out run)."""
+    total = {}
+    for usage in usages:
+        for key, value in (usage or {}).items():
+            total[key] = total.get(key, 0) + (value or 0)
+    return total
@@ -0,0 +1,173 @@
+"""
+Compiled, cached style bundles for the DOCX and PDF renderers.
+
+A styles_config is compiled once into:
+  - DOCX: a base template whose named paragraph styles carry all the font,
+    size, bold/italic and alignment settings. It is parsed once and
+    deep-copied per document, with its style ids resolved up front, so
+    paragraphs get a style reference directly instead of per-run XML or a
+    lookup by name
+  - PDF: a dict of ParagraphStyle objects, shared between builds
+
+Both are memoized on styles_key(styles_config).
+"""
+import copy
+import hashlib
+import io
+import json
+import threading
+from functools import lru_cache
+
+HEADING_FONT = "Speak Pro (Headings)"
+BODY_FONT = "Arial"
+# PDF line height = font size + LEADING_GAP points; styles_config may override
+# it with "leading_gap" (and scale section gaps with "spacing_scale"), which is
+# how page_fit tightens a layout
+LEADING_GAP = 2
+
+# Logical style -> DOCX paragraph style name in the compiled template
+DOCX_STYLES = {
+    "Title": "Resume Title",
+    "Contact": "Resume Contact",
+    "Heading": "Resume Heading",
+    "Subheading": "Resume Subheading",
+    "Body": "Resume Body",
+    "List": "Resume List",      # skill lines: bullet, default spacing
+    "Bullet": "Resume Bullet",  # responsibilities: bullet, no space after
+}
+
+
+def _canonical(styles_config):
+    return json.dumps(styles_config, sort_keys=True)
+
+
+def styles_key(styles_config):
+    """Stable hash of a styles_config, usable as a cache key."""
+    return hashlib.sha1(_canonical(styles_config).encode("utf-8")).hexdigest()
+
+
+def _role_settings(styles_config):
+    # (size, bold, italic, align, font) per logical role; contact lines use
+    # the body size like the original renderers did
+    c = styles_config
+    return {
+        "Title": (c["title_size"], c["title_bold"], c["title_italic"], c["title_align"], HEADING_FONT),
+        "Contact": (c["body_size"], c["contact_bold"], c["contact_italic"], c["contact_align"], BODY_FONT),
+        "Heading": (c["heading_size"], c["heading_bold"], c["heading_italic"], c["heading_align"], HEADING_FONT),
+        "Subheading": (c["subheading_size"], c["subheading_bold"], c["subheading_italic"], c["subheading_align"], None),
+        "Body": (c["body_size"], c["body_bold"], c["body_italic"], c["body_align"], BODY_FONT),
+    }
+
+# ----------------------- DOCX -----------------------
+
+@lru_cache(maxsize=32)
+def _docx_template_bytes(config_json):
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.shared import Pt
+    from docx.oxml.ns import qn
+    from resume_logic import docx_alignment
+
+    styles_config = json.loads(config_json)
+    doc = Document()
+    normal = doc.styles["Normal"]
+    normal.font.name = BODY_FONT
+    normal._element.rPr.rFonts.set(qn("w:eastAsia"), BODY_FONT)
+
+    # only set by page_fit, so default documents keep Word's own spacing
+    leading_gap = styles_config.get("leading_gap")
+    spacing_scale = styles_config.get("spacing_scale")
+
+    def add_style(name, settings, base, space_after=None, space_before=None):
+        size, bold, italic, align, font = settings
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = base
+        style.quick_style = True
+        style.font.size = Pt(size)
+        style.font.bold = bold
+        style.font.italic = italic
+        if font:
+            style.font.name = font
+        style.paragraph_format.alignment = docx_alignment(align)
+        if space_after is not None:
+            style.paragraph_format.space_after = Pt(space_after)
+        if space_before is not None:
+            style.paragraph_format.space_before = Pt(space_before)
+        if leading_gap is not None:
+            style.paragraph_format.line_spacing = Pt(size + leading_gap)
+        return style
+
+    roles = _role_settings(styles_config)
+    add_style(DOCX_STYLES["Title"], roles["Title"], normal, space_after=0)
+    add_style(DOCX_STYLES["Contact"], roles["Contact"], normal)
+    add_style(DOCX_STYLES["Heading"], roles["Heading"], normal,
+              space_before=None if spacing_scale is None else 12 * spacing_scale)
+    add_style(DOCX_STYLES["Subheading"], roles["Subheading"], normal)
+    add_style(DOCX_STYLES["Body"], roles["Body"], normal)
+    # based on List Bullet so the bullet numbering is inherited
+    list_bullet = doc.styles["List Bullet"]
+    add_style(DOCX_STYLES["List"], roles["Body"], list_bullet)
+    add_style(DOCX_STYLES["Bullet"], roles["Body"], list_bullet, space_after=0)
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+_template_lock = threading.Lock()  # renders run in threads; copy the shared template one at a time
+
+
+@lru_cache(maxsize=32)
+def _docx_template(config_json):
+    from docx import Document
+
+    doc = Document(io.BytesIO(_docx_template_bytes(config_json)))
+    style_ids = {role: doc.styles[name].style_id for role, name in DOCX_STYLES.items()}
+    return doc, style_ids
+
+
+def new_docx_document(styles_config):
+    """
+    (Document, {role: style id}) for styles_config: a deep copy of the
+    parsed compiled template, plus the ids add_styled_paragraph() takes.
+    """
+    template, style_ids = _docx_template(_canonical(styles_config))
+    with _template_lock:
+        return copy.deepcopy(template), style_ids
+
+
+def add_styled_paragraph(doc, text, style_id):
+    """
+    doc.add_paragraph(text, style=...) with an already resolved style id:
+    python-docx resolves a style name on every call by scanning all styles,
+    which took most of the DOCX render time.
+    """
+    paragraph = doc.add_paragraph(text)
+    paragraph._p.style = style_id
+    return paragraph
+
+# ----------------------- PDF -----------------------
+
+@lru_cache(maxsize=32)
+def _pdf_styles(config_json):
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib import colors
+    from resume_logic import pdf_alignment
+
+    styles_config = json.loads(config_json)
+    compiled = {}
+    for role, (size, bold, italic, align, _) in _role_settings(styles_config).items():
+        compiled[role] = ParagraphStyle(
+            role,
+            fontName="Helvetica-Bold" if bold else "Helvetica",
+            fontSize=size,
+            leading=size + styles_config.get("leading_gap", LEADING_GAP),
+            textColor=colors.black,
+            alignment=pdf_alignment(align),
+        )
+    return compiled
+
+
+def pdf_styles(styles_config):
+    """Memoized ParagraphStyles (Title, Contact, Heading, Subheading, Body)."""
+    return _pdf_styles(_canonical(styles_config))
@@ -0,0 +1,163 @@
+"""
+Content-addressed cache for tailor_resume responses.
+
+Two tiers:
+  - memory: small in-process LRU, survives between Streamlit reruns and warm
+    serverless invocations
+  - disk: sqlite file with TTL and size-based eviction, survives restarts
+
+Keys are a hash of the normalized inputs plus model name and prompt version,
+so re-clicking Generate or switching DOCX/PDF never pays for a second call.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """text without whitespace-only differences (CRLF, trailing spaces, surrounding blank lines)."""
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+    return "\n".join(line.rstrip() for line in text.split("\n"))
+
+
+def cache_key(resume_text, job_description, custom_prompt, model, prompt_version, **extra):
+    payload = {
+        "resume": normalize_text(resume_text),
+        "job_description": normalize_text(job_description),
+        "custom_prompt": normalize_text(custom_prompt),
+        "model": model,
+        "prompt_version": prompt_version,
+    }
+    payload.update(extra)
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def default_cache_path():
+    # /tmp is the only writable location on serverless platforms
+    base = os.getenv("RESUME_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "resume_tailor_cache")
+    return os.path.join(base, "responses.sqlite")
+
+
+class ResponseCache:
+    def __init__(self, path=None, memory_size=128, ttl=7 * 24 * 3600,
+                 max_disk_entries=5000, max_disk_bytes=100 * 1024 * 1024):
+        self.path = path or default_cache_path()
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (created, json string)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    # ---------- disk tier ----------
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _evict_disk(self, db, now):
+        cur = db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        evicted = cur.rowcount
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count > self.max_disk_entries or total > self.max_disk_bytes:
+            # drop least recently used rows until both limits are met
+            rows = db.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall()
+            doomed = []
+            for key, size in rows:
+                if count <= self.max_disk_entries and total <= self.max_disk_bytes:
+                    break
+                doomed.append((key,))
+                count -= 1
+                total -= size
+            db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            evicted += len(doomed)
+        self._counters["evictions"] += evicted
+
+    # ---------- memory tier ----------
+
+    def _remember(self, key, created, raw):
+        self._memory[key] = (created, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ---------- public API ----------
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                created, raw = hit
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return json.loads(raw)
+                del self._memory[key]
+
+            db = self._db()
+            row = db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] <= self.ttl:
+                db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                db.commit()
+                self._remember(key, row[1], row[0])
+                self._counters["disk_hits"] += 1
+                return json.loads(row[0])
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        raw = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, raw)
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, raw, now, now, len(raw.encode("utf-8"))),
+            )
+            self._evict_disk(db, now)
+            db.commit()
+            self._counters["writes"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            db.execute("DELETE FROM responses")
+            db.commit()
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+        out["hits"] = out["memory_hits"] + out["disk_hits"]
+        out["memory_entries"] = len(self._memory)
+        return out
+
+
+_cache = None
+
+
+def get_cache():
+    """Process-wide cache shared by the UI, the API handler and batch runs."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
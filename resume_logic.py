@@ -1,23 +1,51 @@
-import streamlit as st
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.lib import colors
-from openai import OpenAI
+import io
 import json
 import os
-from dotenv import load_dotenv
 import time
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from functools import lru_cache
+from html import escape as html_escape
 
-# Load env
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+import cancellation
+import metrics
+
+# Heavy dependencies (openai, python-docx, reportlab, dotenv) are imported
+# inside the functions that need them so that importing this module stays
+# cheap. api/generate.py only needs tailor_resume and should not pay for the
+# rendering stack on a cold start.
+
+# Bump whenever the prompt text or response schema changes so cached
+# responses produced by the old prompt are not served.
+PROMPT_VERSION = "3"
+
+# Test/benchmark overrides (see benchmarks/fake_backend.py); None means the
+# pooled clients of llm_backend are used.
+_client = None
+_async_client = None
+
+
+def get_model():
+    """Model name of the active LLM backend (RESUME_MODEL)."""
+    from llm_backend import get_backend
+
+    return get_backend().model
+
+
+def get_client():
+    """Return the shared OpenAI client (pooled, see llm_backend)."""
+    if _client is not None:
+        return _client
+    from llm_backend import get_backend
+
+    return get_backend().client
+
+
+def get_async_client():
+    """Return the shared AsyncOpenAI client used by batch runs."""
+    if _async_client is not None:
+        return _async_client
+    from llm_backend import get_backend
+
+    return get_backend().async_client
 
 # ----------------------- helpers -----------------------
 
@@ -37,6 +65,19 @@ Rules:
 
 """
 
+# Same defaults as the Streamlit sidebar, for callers without a UI (API, batch).
+DEFAULT_STYLES = {
+    "title_size": 22,
+    "heading_size": 16,
+    "subheading_size": 12,
+    "body_size": 11,
+    "title_bold": True, "title_italic": False, "title_align": "Center",
+    "contact_bold": False, "contact_italic": False, "contact_align": "Center",
+    "heading_bold": True, "heading_italic": False, "heading_align": "Left",
+    "subheading_bold": True, "subheading_italic": False, "subheading_align": "Left",
+    "body_bold": False, "body_italic": False, "body_align": "Justify",
+}
+
 def build_header_from_json(tailored: dict):
     """
     Build (name_line, contact_line) from the model's JSON.
@@ -77,68 +118,318 @@ def build_header_from_json(tailored: dict):
     contact_line = " • ".join([p for p in parts if p])
     return name, contact_line
 
+def education_lines(edu) -> list:
+    """
+    Display lines for the Education section: Dates, "Degree | Institution |
+    Location", GPA. Accepts one entry (the schema) or a list of entries.
+    """
+    lines = []
+    for entry in (edu if isinstance(edu, list) else [edu]):
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("Dates"):
+            lines.append(str(entry["Dates"]))
+        degree_line = []
+        if entry.get("Degree"):
+            degree_line.append(str(entry["Degree"]))
+        for key in ("Institution", "University", "School"):
+            if entry.get(key):
+                degree_line.append(str(entry[key]))
+                break
+        if entry.get("Location"):
+            degree_line.append(str(entry["Location"]))
+        if degree_line:
+            lines.append(" | ".join(degree_line))
+        if entry.get("GPA"):
+            lines.append(f"GPA: {entry['GPA']}")
+    return lines
+
 def clean_bullet(text: str) -> str:
     return text.lstrip("•*-·–— ").strip()
 
-def get_alignment(value: str):
+def docx_alignment(value: str):
+    """python-docx paragraph alignment for "Left"/"Center"/"Right"/"Justify" (default left)."""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     mapping_docx = {
         "Left": WD_ALIGN_PARAGRAPH.LEFT,
         "Center": WD_ALIGN_PARAGRAPH.CENTER,
         "Right": WD_ALIGN_PARAGRAPH.RIGHT,
         "Justify": WD_ALIGN_PARAGRAPH.JUSTIFY,
     }
+    return mapping_docx.get(value, WD_ALIGN_PARAGRAPH.LEFT)
+
+def pdf_alignment(value: str):
+    """reportlab alignment for "Left"/"Center"/"Right"/"Justify" (default left)."""
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+
     mapping_pdf = {
         "Left": TA_LEFT,
         "Center": TA_CENTER,
         "Right": TA_RIGHT,
         "Justify": TA_JUSTIFY,
     }
-    return mapping_docx.get(value, WD_ALIGN_PARAGRAPH.LEFT), mapping_pdf.get(value, TA_LEFT)
-
-def tailor_resume(resume_text, job_description, custom_prompt=None):
-    base_prompt = """
-    You are a resume expert. Tailor the given resume to the job description.
-
-    Keep the structure JSON with these keys only:
-    - Summary
-    - Skills (dict of categories: items[])
-    - Experience (list of jobs, each with Company, Title, Dates, Responsibilities[], Technologies is optional)
-    - Education (must always include: Dates, Degree, Institution, GPA, Institution = university/school name, Location is optional)
-
-    You are a resume expert. Tailor the given resume to the job description.
-
-    Return a STRICT JSON object with these keys ONLY:
-    - Header (object):
-        - Name (string, required)
-        - Email (string, if known)
-        - Phone (string, if known)
-        - Address (string, if known)
-        - Links (array of strings, optional; e.g., LinkedIn, GitHub, portfolio)
-        - Other (array of strings, optional; e.g., extra contact info)
-    - Summary (string)
-    - Skills (object where each key is a category and value is an array of strings)
-    - Experience (array of objects, each with: Company, Title, Dates, Responsibilities[]; Technologies is optional array)
-    - Education (object where the keys are Dates, Degree, Institution, GPA; Location is optional)
-
-    Constraints:
-    - Be truthful to resume and job description.
-    - If any contact field is missing, omit that field rather than inventing.
+    return mapping_pdf.get(value, TA_LEFT)
+
+def get_alignment(value: str):
+    return docx_alignment(value), pdf_alignment(value)
+
+def build_messages(resume_text, job_description, custom_prompt=None, input_budget=None):
+    """Chat messages for a tailoring call (stable content first, see prompts.py)."""
+    from prompts import assemble_messages
+
+    messages, _ = assemble_messages(resume_text, job_description, custom_prompt, input_budget)
+    return messages
+
+def estimate_tokens(text: str) -> int:
+    from prompts import estimate_tokens as _estimate
+
+    return _estimate(text)
+
+def caching_enabled():
+    """Whether tailorings use the response cache (RESUME_CACHE=0 disables both tiers)."""
+    return os.getenv("RESUME_CACHE", "1") != "0"
+
+def tailor_cache_key(resume_text, job_description, custom_prompt, input_budget=None, **mode):
+    """
+    Response-cache key of one tailoring. The effective input budget is part
+    of it: a tight budget trims the job description, and that result must
+    not be served to a call with more room. So is the model the request is
+    routed to (see routing.py), not just the backend default.
+    """
+    import routing
+    from prompts import DEFAULT_INPUT_BUDGET
+    from response_cache import cache_key
+
+    budget = DEFAULT_INPUT_BUDGET if input_budget is None else input_budget
+    router = routing.active_router()
+    model = get_model() if router is None else router.model_for(
+        build_messages(resume_text, job_description, custom_prompt, budget))
+    return cache_key(resume_text, job_description, custom_prompt, model, PROMPT_VERSION,
+                     input_budget=budget, **mode)
+
+def _dedupe_enabled():
+    return os.getenv("RESUME_DEDUPE", "1") != "0"  # RESUME_DEDUPE=0 keeps every bullet
+
+def finalize_tailored(tailored, resume_text="", job_description="", custom_prompt=None):
+    """
+    Post-process a fresh model result before it is cached or rendered:
+    schema validation/repair (may raise SchemaError), then local removal of
+    near-duplicate bullets. Returns (tailored, schema_report, dedup_report).
     """
+    from schema import validate_tailored
 
-    if custom_prompt and custom_prompt.strip():
-        prompt = base_prompt + "\n\n" + custom_prompt.strip()
+    # fix shapes locally and re-request only broken sections
+    with metrics.stage("validate"):
+        tailored, schema_report = validate_tailored(tailored, resume_text, job_description, custom_prompt)
+    dedup_report = {}
+    if _dedupe_enabled():
+        from bullets import dedupe_bullets
+
+        with metrics.stage("dedup"):
+            tailored, dedup_report = dedupe_bullets(tailored)
+    return tailored, schema_report, dedup_report
+
+def chat_json(messages, client=None):
+    """
+    One JSON-mode chat completion; returns (parsed JSON, usage).
+
+    Inside a cancellation scope the request is streamed, so that cancelling
+    can close it mid-generation (see cancellation.py). With routing enabled
+    the model is picked by request size, and with hedging slow requests are
+    hedged (see routing.py).
+    """
+    import routing
+    from prompts import usage_from_response
+
+    router = routing.active_router()
+    if router is not None and router.hedge:
+        return routing.complete_json(router, messages, client or get_client())
+    # without hedging nothing needs the first token: stream only to be cancellable
+    model = router.model_for(messages) if router is not None else get_model()
+    token = cancellation.current()
+    if token is not None:
+        return chat_json_stream(messages, client or get_client(), token, model=model)
+
+    with metrics.stage("openai", model=model):
+        response = (client or get_client()).chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={"type": "json_object"}
+        )
+    usage = usage_from_response(response)
+    metrics.record_tokens(usage)
+    with metrics.stage("parse"):
+        return json.loads(response.choices[0].message.content), usage
+
+def chat_json_stream(messages, client, token, model=None, on_first_token=None, stage="openai"):
+    """
+    chat_json over a streamed request that token.cancel() closes at once;
+    raises GenerationCancelled with the sections complete so far.
+    on_first_token() is called when the first content arrives.
+    """
+    from prompts import usage_from_response
+
+    parts = []
+    usage = {}
+    started = time.perf_counter()
+    with metrics.stage(stage, model=model or get_model()) as fields:
+        token.check()
+        stream = client.chat.completions.create(
+            model=model or get_model(),
+            messages=messages,
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        unregister = token.on_cancel(stream.close)
+        # this loop runs once per streamed token: keep the per-chunk work minimal
+        cancelled, append, first = token.is_cancelled, parts.append, True
+        try:
+            for chunk in stream:
+                if cancelled():
+                    break
+                if chunk.choices:
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        if first:
+                            first = False
+                            fields["ttft_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                            if on_first_token is not None:
+                                on_first_token()
+                        append(content)
+                        continue
+                if getattr(chunk, "usage", None):
+                    usage = usage_from_response(chunk)
+        except Exception:
+            if not token.cancelled:
+                raise  # a closed stream fails mid-read; only that is expected
+        finally:
+            unregister()
+            if token.cancelled:
+                fields["cancelled"] = True
+    if token.cancelled:
+        # sections are only needed for the partial result, so parse once here
+        from streaming import SectionStreamParser
+
+        parser = SectionStreamParser()
+        parser.feed("".join(parts))
+        token.check(parser.result)
+    metrics.record_tokens(usage)
+    with metrics.stage("parse"):
+        return json.loads("".join(parts)), usage
+
+def tailor_resume(resume_text, job_description, custom_prompt=None, use_cache=True, with_info=False, input_budget=None,
+                  fanout=False, cancel=None, profile=None):
+    """
+    Tailor resume_text to job_description and return the parsed JSON.
+
+    Identical inputs (after whitespace normalization) are served from the
+    response cache; pass use_cache=False to force a fresh model call.
+    With with_info=True, returns (tailored, info) where info carries the
+    cache outcome, local prompt estimate and the reported token usage
+    (including provider-cached prompt tokens).
+    With fanout=True, each Experience entry is generated by its own
+    concurrent request (see fanout.py).
+    With cancel (a cancellation.CancelToken), another thread can stop the
+    generation: the model stream is closed and GenerationCancelled raised.
+    With profile=True (default: RESUME_PROFILE), the base resume is parsed
+    once into a stored profile and only the tailored sections are generated
+    (see profile_store.py); fanout takes precedence.
+    """
+    from profile_store import profile_enabled
+    from prompts import assemble_messages, merge_usage
+    from response_cache import get_cache
+
+    profile = profile_enabled() if profile is None else profile
+    mode = {"mode": "fanout"} if fanout else {"mode": "profile"} if profile else {}
+    key = tailor_cache_key(resume_text, job_description, custom_prompt, input_budget, **mode)
+    if use_cache and caching_enabled():
+        cached = get_cache().get(key)
+        if cached is not None:
+            return (cached, {"cache": "hit", "usage": {}}) if with_info else cached
+
+    with cancellation.scope(cancel):
+        if cancel is not None:
+            cancel.check()
+        if fanout:
+            from fanout import generate_fanout
+
+            tailored, usage, prompt_info = generate_fanout(resume_text, job_description, custom_prompt, input_budget)
+        elif profile:
+            from profile_store import tailor_from_profile
+
+            tailored, usage, prompt_info = tailor_from_profile(resume_text, job_description, custom_prompt, input_budget)
+        else:
+            messages, prompt_info = assemble_messages(resume_text, job_description, custom_prompt, input_budget)
+            tailored, usage = chat_json(messages)
+
+        tailored, schema_report, dedup_report = finalize_tailored(tailored, resume_text, job_description, custom_prompt)
+    usage = merge_usage(usage, schema_report["usage"])
+    if caching_enabled():
+        get_cache().set(key, tailored)
+    if with_info:
+        return tailored, {"cache": "miss", "prompt": prompt_info, "usage": usage, "schema": schema_report,
+                          "dedup": dedup_report}
+    return tailored
+
+async def tailor_resume_async(resume_text, job_description, custom_prompt=None, use_cache=True, client=None,
+                              with_info=False, input_budget=None, profile=None):
+    """
+    Async twin of tailor_resume for concurrent batch runs; shares the same cache
+    and profile store. Cancelling the awaiting task aborts the model request.
+    """
+    import asyncio
+    import routing
+    from profile_store import profile_enabled
+    from prompts import assemble_messages, merge_usage, usage_from_response
+    from response_cache import get_cache
+
+    profile = profile_enabled() if profile is None else profile
+    mode = {"mode": "profile"} if profile else {}
+    key = tailor_cache_key(resume_text, job_description, custom_prompt, input_budget, **mode)
+    if use_cache and caching_enabled():
+        cached = get_cache().get(key)
+        if cached is not None:
+            return (cached, {"cache": "hit", "usage": {}}) if with_info else cached
+
+    client = client or get_async_client()
+    profile_usage = {}
+    if profile:
+        from profile_store import get_profile_async, profile_messages
+
+        stored, profile_info = await get_profile_async(resume_text, client)
+        profile_usage = profile_info["usage"]
+        messages, prompt_info = profile_messages(stored, job_description, custom_prompt, input_budget)
+        prompt_info["profile"] = profile_info["profile"]
     else:
-        prompt = base_prompt
-
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that ONLY returns JSON when asked."},
-            {"role": "user", "content": f"(Return JSON only)\n{prompt}\n\nResume:\n{resume_text}\n\nJob Description:\n{job_description}"}
-        ],
-        response_format={"type": "json_object"}
+        messages, prompt_info = assemble_messages(resume_text, job_description, custom_prompt, input_budget)
+    with metrics.stage("openai"):
+        response = await client.chat.completions.create(
+            # size-based routing applies here too; hedging is sync-only
+            model=routing.model_for(messages),
+            messages=messages,
+            response_format={"type": "json_object"}
+        )
+    metrics.record_tokens(usage_from_response(response))
+    with metrics.stage("parse"):
+        tailored = json.loads(response.choices[0].message.content)
+    if profile:
+        from profile_store import apply_profile
+
+        tailored = apply_profile(stored, tailored)
+
+    # repairs are rare and small, dedup is CPU-only; run both off the event loop
+    tailored, schema_report, dedup_report = await asyncio.to_thread(
+        finalize_tailored, tailored, resume_text, job_description, custom_prompt
     )
-    return json.loads(response.choices[0].message.content)
+    usage = merge_usage(profile_usage, usage_from_response(response), schema_report["usage"])
+    if caching_enabled():
+        get_cache().set(key, tailored)
+    if with_info:
+        return tailored, {"cache": "miss", "prompt": prompt_info, "usage": usage, "schema": schema_report,
+                          "dedup": dedup_report}
+    return tailored
 
 def _pt_to_px(pt):
     # rough screen px conversion for preview
@@ -152,208 +443,177 @@ def _align_to_css(align_key: str) -> str:
         "Justify": "justify",
     }.get(align_key, "left")
 
-def render_preview_html(tailored: dict, styles_config: dict) -> str:
-    # read header
-    name, contact = ("", "")
-    if tailored:
-        header = (tailored.get("Header") or {})
-        name = (header.get("Name") or "").strip()
-        parts = []
-        if header.get("Address"): parts.append(header["Address"])
-        if header.get("Phone"):   parts.append(header["Phone"])
-        if header.get("Email"):   parts.append(header["Email"])
-        for v in header.get("Links") or []: parts.append(str(v))
-        for v in header.get("Other") or []: parts.append(str(v))
-        contact = " • ".join([p for p in parts if p])
-
-    # sizes/alignment
-    title_css    = f"font-size:{_pt_to_px(styles_config['title_size'])}px;font-weight:{'700' if styles_config['title_bold'] else '400'};font-style:{'italic' if styles_config['title_italic'] else 'normal'};text-align:{_align_to_css(styles_config['title_align'])};margin:0;"
-    contact_css  = f"font-size:{_pt_to_px(styles_config['body_size'])}px;font-weight:{'700' if styles_config['contact_bold'] else '400'};font-style:{'italic' if styles_config['contact_italic'] else 'normal'};text-align:{_align_to_css(styles_config['contact_align'])};margin:2px 0 12px 0;color:#444;"
-    heading_css  = f"font-size:{_pt_to_px(styles_config['heading_size'])}px;font-weight:{'700' if styles_config['heading_bold'] else '400'};font-style:{'italic' if styles_config['heading_italic'] else 'normal'};text-align:{_align_to_css(styles_config['heading_align'])};margin:16px 0 6px 0;border-bottom:1px solid #eee;padding-bottom:2px;"
-    sub_css      = f"font-size:{_pt_to_px(styles_config['subheading_size'])}px;font-weight:{'700' if styles_config['subheading_bold'] else '400'};font-style:{'italic' if styles_config['subheading_italic'] else 'normal'};text-align:{_align_to_css(styles_config['subheading_align'])};margin:10px 0 4px 0;color:#333;"
-    body_css     = f"font-size:{_pt_to_px(styles_config['body_size'])}px;font-weight:{'700' if styles_config['body_bold'] else '400'};font-style:{'italic' if styles_config['body_italic'] else 'normal'};text-align:{_align_to_css(styles_config['body_align'])};margin:2px 0;color:#222;"
-
-    # sections
-    summary = (tailored or {}).get("Summary") or ""
-    skills  = (tailored or {}).get("Skills") or {}
-    exp     = (tailored or {}).get("Experience") or []
-    edu     = (tailored or {}).get("Education")
-
-    # education: your prompt returns an object — render that. If later you make it a list, handle both.
-    edu_html = ""
-    if isinstance(edu, dict):
-        lines = []
-        if edu.get("Dates"): lines.append(edu["Dates"])
-        degree_bits = []
-        if edu.get("Degree"): degree_bits.append(edu["Degree"])
-        for key in ("Institution","University","School"):
-            if edu.get(key):
-                degree_bits.append(edu[key]); break
-        if edu.get("Location"): degree_bits.append(edu["Location"])
-        if degree_bits: lines.append(" | ".join(degree_bits))
-        if edu.get("GPA"): lines.append(f"GPA: {edu['GPA']}")
-        edu_html = "".join([f'<div style="{body_css}">{line}</div>' for line in lines])
+def _font_css(size, bold, italic, align):
+    return (
+        f"font-size:{_pt_to_px(size)}px;font-weight:{'700' if bold else '400'};"
+        f"font-style:{'italic' if italic else 'normal'};text-align:{_align_to_css(align)};"
+    )
+
+@lru_cache(maxsize=64)
+def _preview_stylesheet(config_json: str) -> str:
+    c = json.loads(config_json)
+    return (
+        "<style>"
+        ".rt-preview{font-family:Arial,sans-serif;line-height:1.35;}"
+        f".rt-preview .rt-title{{{_font_css(c['title_size'], c['title_bold'], c['title_italic'], c['title_align'])}margin:0;}}"
+        f".rt-preview .rt-contact{{{_font_css(c['body_size'], c['contact_bold'], c['contact_italic'], c['contact_align'])}margin:2px 0 12px 0;color:#444;}}"
+        f".rt-preview .rt-heading{{{_font_css(c['heading_size'], c['heading_bold'], c['heading_italic'], c['heading_align'])}margin:16px 0 6px 0;border-bottom:1px solid #eee;padding-bottom:2px;}}"
+        f".rt-preview .rt-sub{{{_font_css(c['subheading_size'], c['subheading_bold'], c['subheading_italic'], c['subheading_align'])}margin:10px 0 4px 0;color:#333;}}"
+        f".rt-preview .rt-body{{{_font_css(c['body_size'], c['body_bold'], c['body_italic'], c['body_align'])}margin:2px 0;color:#222;}}"
+        ".rt-preview ul{margin:0 0 6px 20px;padding:0;}"
+        ".rt-preview .rt-pending{color:#999;font-style:italic;}"
+        "</style>"
+    )
+
+def preview_stylesheet(styles_config: dict) -> str:
+    """One <style> block for the preview; its size does not depend on the resume."""
+    return _preview_stylesheet(json.dumps(styles_config, sort_keys=True))
+
+@metrics.timed("preview")
+def render_preview_html(tailored: dict, styles_config: dict, partial: bool = False) -> str:
+    # partial=True while streaming: sections that have not arrived yet show a
+    # placeholder instead of an empty block.
+    # Formatting comes from a class-based stylesheet, so per-element markup is
+    # just a class name and the whole resume is rendered (no job/bullet caps).
+    esc = html_escape
+    tailored = tailored or {}
+    name, contact = build_header_from_json(tailored) if tailored else ("", "")
+
+    summary = tailored.get("Summary") or ""
+    skills  = tailored.get("Skills") or {}
+    exp     = tailored.get("Experience") or []
+    edu     = tailored.get("Education")
+
+    edu_html = "".join([f'<div class="rt-body">{esc(line)}</div>' for line in education_lines(edu)])
 
     # skills list
     skills_html = "".join(
-        [f'<div style="{body_css}">• {cat}: {", ".join(items)}</div>' for cat, items in skills.items()]
+        [f'<div class="rt-body">• {esc(str(cat))}: {esc(", ".join(map(str, items)))}</div>' for cat, items in skills.items()]
     )
 
-    # experience (limit bullets for speed)
+    # experience
     exp_blocks = []
-    for job in exp[:4]:  # show first 4 roles in preview
+    for job in exp:
         header_line = f"{job.get('Title','')} | {job.get('Company','')} | {job.get('Dates','')}"
         bullets = job.get("Responsibilities") or []
-        bullets_html = "".join([f'<li><span style="{body_css}">{str(b).lstrip("•*-·–— ").strip()}</span></li>' for b in bullets[:8]])  # first 8 bullets
+        bullets_html = "".join([f'<li class="rt-body">{esc(clean_bullet(str(b)))}</li>' for b in bullets])
         techs_html = ""
         if isinstance(job.get("Technologies"), list) and job["Technologies"]:
-            techs_html = f'<div style="{body_css}"><em>Technologies:</em> {", ".join(job["Technologies"][:40])}</div>'
+            techs_html = f'<div class="rt-body"><em>Technologies:</em> {esc(", ".join(map(str, job["Technologies"])))}</div>'
         exp_blocks.append(
-            f'<div><div style="{sub_css}">{header_line}</div><ul style="margin:0 0 6px 20px;padding:0;">{bullets_html}</ul>{techs_html}</div>'
+            f'<div><div class="rt-sub">{esc(header_line)}</div><ul>{bullets_html}</ul>{techs_html}</div>'
         )
     exp_html = "".join(exp_blocks)
+    summary_html = f'<div class="rt-body">{esc(str(summary))}</div>'
+
+    if partial:
+        pending = '<div class="rt-body rt-pending">Generating…</div>'
+        summary_html = summary_html if "Summary" in tailored else pending
+        skills_html = skills_html if "Skills" in tailored else pending
+        exp_html = exp_html + (pending if "Education" not in tailored else "")
+        edu_html = edu_html if "Education" in tailored else pending
 
     # final HTML
-    html = f"""
-    <div style="font-family: Arial, sans-serif; line-height:1.35;">
-      <div style="{title_css}">{name}</div>
-      {f'<div style="{contact_css}">{contact}</div>' if contact else ''}
-      <div style="{heading_css}">Summary</div>
-      <div style="{body_css}">{summary}</div>
-
-      <div style="{heading_css}">Skills</div>
+    html = f"""{preview_stylesheet(styles_config)}
+    <div class="rt-preview">
+      <div class="rt-title">{esc(name)}</div>
+      {f'<div class="rt-contact">{esc(contact)}</div>' if contact else ''}
+      <div class="rt-heading">Summary</div>
+      {summary_html}
+
+      <div class="rt-heading">Skills</div>
       {skills_html}
 
-      <div style="{heading_css}">Experience</div>
+      <div class="rt-heading">Experience</div>
       {exp_html}
 
-      <div style="{heading_css}">Education</div>
+      <div class="rt-heading">Education</div>
       {edu_html}
     </div>
     """
     return html
 
+def _write_output(data: bytes, output):
+    """
+    Deliver rendered bytes to `output`: None (just return them), a writable
+    binary stream, or a file path.
+    """
+    if output is None:
+        return
+    with metrics.stage("file_io"):
+        if hasattr(output, "write"):
+            output.write(data)
+            return
+        with open(output, "wb") as f:
+            f.write(data)
+
 # ----------------------- DOCX -----------------------
 
-def create_docx(template_text, tailored, output_path, include_tech, styles_config):
-    doc = Document()
-    style = doc.styles['Normal']
-    style.font.name = 'Arial'
-    style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Arial')
+@metrics.timed("render_docx")
+def create_docx(template_text, tailored, output=None, include_tech=True, styles_config=None):
+    """Render the tailored resume as DOCX and return the document bytes."""
+    from render_styles import add_styled_paragraph, new_docx_document
+
+    styles_config = {**DEFAULT_STYLES, **(styles_config or {})}
+    # All formatting lives in named styles of the cached base template, so
+    # paragraphs carry a style reference instead of per-run properties.
+    doc, style_ids = new_docx_document(styles_config)
     name_line, contact_text = build_header_from_json(tailored)
 
+    def add(text, style="Body"):
+        return add_styled_paragraph(doc, text, style_ids[style])
+
+    def add_heading(text):
+        add(text, "Heading")
+
     # Title
-    name_p = doc.add_paragraph(name_line)
-    run = name_p.runs[0]
-    run.font.size = Pt(styles_config["title_size"])
-    run.font.name = 'Speak Pro (Headings)'
-    run.bold = styles_config["title_bold"]
-    run.italic = styles_config["title_italic"]
-    name_p.alignment, _ = get_alignment(styles_config["title_align"])
-    name_p.paragraph_format.space_after = Pt(0)
+    add(name_line, "Title")
 
     # Contact
     if contact_text:
-        c = doc.add_paragraph(contact_text)
-        run = c.runs[0]
-        run.font.size = Pt(styles_config["body_size"])
-        run.font.name = 'Arial'
-        run.bold = styles_config["contact_bold"]
-        run.italic = styles_config["contact_italic"]
-        c.alignment, _ = get_alignment(styles_config["contact_align"])
-
-    # Section helpers
-    def add_heading(text):
-        p = doc.add_paragraph(text)
-        r = p.runs[0]
-        r.bold = styles_config["heading_bold"]
-        r.font.name = 'Speak Pro (Headings)'
-        r.italic = styles_config["heading_italic"]
-        r.font.size = Pt(styles_config["heading_size"])
-        p.alignment, _ = get_alignment(styles_config["heading_align"])
-
-    def add_body(text, style=None):
-        p = doc.add_paragraph(text, style=style)
-        r = p.runs[0]
-        r.bold = styles_config["body_bold"]
-        r.font.name = 'Arial'
-        r.italic = styles_config["body_italic"]
-        r.font.size = Pt(styles_config["body_size"])
-        p.alignment, _ = get_alignment(styles_config["body_align"])
-        return p
+        add(contact_text, "Contact")
 
     # Summary
     add_heading("Summary")
-    add_body(tailored["Summary"])
+    add(tailored["Summary"])
 
     # Skills
     add_heading("Skills")
     for category, items in tailored["Skills"].items():
-        add_body(f"{category}: {', '.join(items)}", style="List Bullet")
+        add(f"{category}: {', '.join(items)}", style="List")
 
     # Experience
     add_heading("Experience")
     for job in tailored["Experience"]:
-        heading = doc.add_paragraph(f"{job['Title']} | {job['Company']} | {job['Dates']}")
-        run = heading.runs[0]
-        run.bold = styles_config["subheading_bold"]
-        run.italic = styles_config["subheading_italic"]
-        run.font.size = Pt(styles_config["subheading_size"])
-        heading.alignment, _ = get_alignment(styles_config["subheading_align"])
+        add(f"{job['Title']} | {job['Company']} | {job['Dates']}", "Subheading")
         for resp in job["Responsibilities"]:
-            p = add_body(clean_bullet(resp), style="List Bullet")
-            p.paragraph_format.space_after = Pt(0)
+            add(clean_bullet(resp), style="Bullet")
         if include_tech and "Technologies" in job:
             techs = ", ".join(job["Technologies"]) if isinstance(job["Technologies"], list) else str(job["Technologies"])
-            add_body(f"Technologies: {techs}")
+            add(f"Technologies: {techs}")
 
     # Education
     add_heading("Education")
-    edu = tailored["Education"]
-
-    if isinstance(edu, dict):
-        if "Dates" in edu:
-            add_body(edu["Dates"])
-        degree_line = []
-        if "Degree" in edu:
-            degree_line.append(edu["Degree"])
-        for key in ("Institution", "University", "School"):
-            if key in edu:
-                degree_line.append(edu[key])
-                break
-        if "Location" in edu:
-            degree_line.append(edu["Location"])
-        if degree_line:
-            add_body(" | ".join(degree_line))
-        if "GPA" in edu:
-            add_body(f"GPA: {edu['GPA']}")
+    for line in education_lines(tailored["Education"]):
+        add(line)
 
-    doc.save(output_path)
-    return output_path
+    buf = io.BytesIO()
+    doc.save(buf)
+    data = buf.getvalue()
+    _write_output(data, output)
+    return data
 
 # ----------------------- PDF -----------------------
 
-def create_pdf(template_text, tailored, output_path, include_tech, styles_config):
-    def make_style(name, size, bold, italic, align_key):
-        _, pdf_align = get_alignment(align_key)
-        return ParagraphStyle(
-            name,
-            fontName="Helvetica-Bold" if bold else "Helvetica",
-            fontSize=size,
-            leading=size + 2,
-            textColor=colors.black,
-            alignment=pdf_align,
-        )
+def pdf_flowables(tailored, include_tech=True, styles_config=None):
+    """The PDF story as a list of flowables (also measured by page_fit)."""
+    from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
+    from render_styles import pdf_styles as compiled_pdf_styles
 
-    pdf_styles = {
-        "Title": make_style("Title", styles_config["title_size"], styles_config["title_bold"], styles_config["title_italic"], styles_config["title_align"]),
-        "Contact": make_style("Contact", styles_config["body_size"], styles_config["contact_bold"], styles_config["contact_italic"], styles_config["contact_align"]),
-        "Heading": make_style("Heading", styles_config["heading_size"], styles_config["heading_bold"], styles_config["heading_italic"], styles_config["heading_align"]),
-        "Subheading": make_style("Subheading", styles_config["subheading_size"], styles_config["subheading_bold"], styles_config["subheading_italic"], styles_config["subheading_align"]),
-        "Body": make_style("Body", styles_config["body_size"], styles_config["body_bold"], styles_config["body_italic"], styles_config["body_align"]),
-    }
-
-    doc = SimpleDocTemplate(output_path)
+    styles_config = {**DEFAULT_STYLES, **(styles_config or {})}
+    pdf_styles = compiled_pdf_styles(styles_config)
+    # gaps between sections, shrunk by the page-fit engine
+    gap = styles_config.get("spacing_scale", 1.0)
     elements = []
 
     # Header
@@ -361,18 +621,18 @@ def create_pdf(template_text, tailored, output_path, include_tech, styles_config
     elements.append(Paragraph(name_line, pdf_styles["Title"]))
     if contact_text:
         elements.append(Paragraph(contact_text, pdf_styles["Contact"]))
-    elements.append(Spacer(1, 12))
+    elements.append(Spacer(1, 12 * gap))
 
     # Summary
     elements.append(Paragraph("Summary", pdf_styles["Heading"]))
     elements.append(Paragraph(tailored["Summary"], pdf_styles["Body"]))
-    elements.append(Spacer(1, 12))
+    elements.append(Spacer(1, 12 * gap))
 
     # Skills
     elements.append(Paragraph("Skills", pdf_styles["Heading"]))
     skill_items = [ListItem(Paragraph(f"{cat}: {', '.join(items)}", pdf_styles["Body"])) for cat, items in tailored["Skills"].items()]
     elements.append(ListFlowable(skill_items, bulletType="bullet"))
-    elements.append(Spacer(1, 12))
+    elements.append(Spacer(1, 12 * gap))
 
     # Experience
     elements.append(Paragraph("Experience", pdf_styles["Heading"]))
@@ -383,172 +643,38 @@ def create_pdf(template_text, tailored, output_path, include_tech, styles_config
         if include_tech and "Technologies" in job:
             techs = ", ".join(job["Technologies"]) if isinstance(job["Technologies"], list) else str(job["Technologies"])
             elements.append(Paragraph(f"Technologies: {techs}", pdf_styles["Body"]))
-        elements.append(Spacer(1, 8))
-    elements.append(Spacer(1, 12))
+        elements.append(Spacer(1, 8 * gap))
+    elements.append(Spacer(1, 12 * gap))
 
     # Education
     elements.append(Paragraph("Education", pdf_styles["Heading"]))
-    edu = tailored["Education"]
-    if isinstance(edu, dict):
-        if "Dates" in edu:
-            elements.append(Paragraph(edu["Dates"], pdf_styles["Body"]))
-        degree_line = []
-        if "Degree" in edu:
-            degree_line.append(edu["Degree"])
-        for key in ("Institution", "University", "School"):
-            if key in edu:
-                degree_line.append(edu[key])
-                break
-        if "Location" in edu:
-            degree_line.append(edu["Location"])
-        if degree_line:
-            elements.append(Paragraph(" | ".join(degree_line), pdf_styles["Body"]))
-        if "GPA" in edu:
-            elements.append(Paragraph(f"GPA: {edu['GPA']}", pdf_styles["Body"]))
-
-    doc.build(elements)
-    return output_path
-
-# ----------------------- Generate function -----------------------
-
-def generate_resume():
-    if st.session_state["loading"]:
-        return
-    st.session_state["loading"] = True
-    st.session_state["stop_requested"] = False
-
-    try:
-        # ✅ spinner shows only during work and vanishes automatically on completion
-        with st.spinner("Generating your tailored resume..."):
-
-            if st.session_state["stop_requested"]:
-                return
-
-            tailored = tailor_resume(resume_template_text, job_description, custom_prompt)
-            st.session_state["tailored_json"] = tailored
-
-            if st.session_state["stop_requested"]:
-                return
-
-            os.makedirs("outputs", exist_ok=True)
-            user_name, _ = build_header_from_json(tailored)
-            user_name = user_name.replace(" ", "_") if user_name else "Software_Engineer"
-            ts = int(time.time())
-
-            if output_format == "DOCX":
-                final_file = create_docx(resume_template_text, tailored, f"outputs/{user_name}_{ts}.docx", include_tech, styles_config)
-            else:
-                final_file = create_pdf(resume_template_text, tailored, f"outputs/{user_name}_{ts}.pdf", include_tech, styles_config)
-
-            # Success + download button (this stays after completion; spinner/stop won’t)
-            st.success(f"✅ Resume tailored successfully! ({output_format})")
-            with open(final_file, "rb") as f:
-                st.download_button(
-                    f"Download Tailored Resume ({output_format})",
-                    f,
-                    file_name=f"{user_name}.{output_format.lower()}",
-                )
-
-    except Exception as e:
-        if not st.session_state["stop_requested"]:
-            st.error(f"❌ Something went wrong: {e}")
-    finally:
-        # ✅ turning this off hides the stop button + any loading UI in the main layout
-        st.session_state["loading"] = False
-
-# ----------------------- app -----------------------
-
-st.set_page_config(layout="wide")
-
-st.markdown("""
-<style>
-:root {
-    --background-color: #ffffff;
-    --secondary-background-color: #f7f7f9;
-    --text-color: #000000;
-}
+    for line in education_lines(tailored["Education"]):
+        elements.append(Paragraph(line, pdf_styles["Body"]))
+    return elements
 
-[data-testid="stAppViewContainer"] {
-    background-color: var(--background-color);
-    color: var(--text-color);
-}
-[data-testid="stSidebar"] {
-    background-color: var(--secondary-background-color);
-}
-</style>
-""", unsafe_allow_html=True)
-
-st.title("📄 Resume Tailor Tool")
-st.sidebar.header("Settings")
-
-if "loading" not in st.session_state:
-    st.session_state["loading"] = False
-if "stop_requested" not in st.session_state:
-    st.session_state["stop_requested"] = False
+@metrics.timed("render_pdf")
+def create_pdf(template_text, tailored, output=None, include_tech=True, styles_config=None, fit_pages=None, with_info=False):
+    """
+    Render the tailored resume as PDF and return the document bytes.
 
-disabled_state = st.session_state["loading"]
+    fit_pages=N shrinks fonts, leading and spacing (and, as a last resort,
+    drops the lowest-priority bullets) until the PDF fits in N pages; see
+    page_fit.fit_to_pages. with_info=True returns (bytes, fit report), the
+    report's "styles_config" and "tailored" reproduce the fit in create_docx.
+    """
+    from reportlab.platypus import SimpleDocTemplate
 
-# Style settings
-st.sidebar.subheader("🎨 Style Settings")
-def style_section(label, defaults):
-    st.sidebar.markdown(f"**{label}**")
-    return {
-        f"{label.lower()}_bold": st.sidebar.checkbox(f"{label} Bold", value=defaults["bold"], disabled=disabled_state),
-        f"{label.lower()}_italic": st.sidebar.checkbox(f"{label} Italic", value=defaults["italic"], disabled=disabled_state),
-        f"{label.lower()}_align": st.sidebar.selectbox(f"{label} Align", ["Left", "Center", "Right", "Justify"], index=defaults["align"], disabled=disabled_state),
-    }
+    report = None
+    if fit_pages:
+        from page_fit import fit_to_pages
 
-styles_config = {
-    "title_size": st.sidebar.slider("Title Font Size", 14, 28, 22, disabled=disabled_state),
-    "heading_size": st.sidebar.slider("Heading Font Size", 12, 20, 16, disabled=disabled_state),
-    "subheading_size": st.sidebar.slider("Subheading Font Size", 10, 16, 12, disabled=disabled_state),
-    "body_size": st.sidebar.slider("Body Font Size", 8, 14, 11, disabled=disabled_state),
-}
-styles_config.update(style_section("Title", {"bold": True, "italic": False, "align": 1}))
-styles_config.update(style_section("Contact", {"bold": False, "italic": False, "align": 1}))
-styles_config.update(style_section("Heading", {"bold": True, "italic": False, "align": 0}))
-styles_config.update(style_section("Subheading", {"bold": True, "italic": False, "align": 0}))
-styles_config.update(style_section("Body", {"bold": False, "italic": False, "align": 3}))
-
-st.sidebar.checkbox("Live Preview", value=True, key="live_preview")
-
-# Main layout: left = existing inputs/buttons, right = preview
-left, right = st.columns([1, 1])
-
-with left:
-    # Inputs
-    resume_template_text = st.text_area("Paste Your Resume Template", height=250, disabled=disabled_state)
-    custom_prompt = st.text_area("Custom Prompt", height=200, value=DEFAULT_PROMPT, disabled=disabled_state)
-    job_description = st.text_area("Paste the Job Description", height=300, disabled=disabled_state)
-    include_tech = st.checkbox("Include Technologies per Position", value=True, disabled=disabled_state)
-    output_format = st.selectbox("Output Format", ["DOCX", "PDF"], disabled=disabled_state)
-
-    # Buttons on main page
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.button("✅ Generate Tailored Resume", on_click=generate_resume, disabled=disabled_state)
-
-    with col2:
-        if st.button("🔄 Reset App", key="reset_normal", disabled=st.session_state["loading"]):
-            st.session_state.clear()
-            st.rerun()
-
-    with col3:
-        # ✅ Only visible while loading; disappears automatically after completion
-        if st.session_state.get("loading", False):
-            if st.button("🛑 Stop Generating"):
-                st.session_state["stop_requested"] = True
-                st.session_state["loading"] = False
-                st.toast("Generation stopped.", icon="🛑")
-                st.rerun()
-
-with right:
-    st.subheader("🔎 Preview")
-    if st.session_state.get("live_preview") and st.session_state.get("tailored_json"):
-        preview_html = render_preview_html(st.session_state["tailored_json"], styles_config)
-        st.markdown(preview_html, unsafe_allow_html=True)
-    else:
-        st.info("Generate once to enable live preview of your current styles.")
+        tailored, styles_config, report = fit_to_pages(tailored, fit_pages, styles_config, include_tech)
 
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf)
+    elements = pdf_flowables(tailored, include_tech, styles_config)
 
+    doc.build(elements)
+    data = buf.getvalue()
+    _write_output(data, output)
+    return (data, report) if with_info else data
@@ -0,0 +1,287 @@
+"""
+Latency-aware model routing and hedged requests, against tail latency.
+
+Off by default. When enabled, chat_json (and so tailor_resume, fan-out and
+schema repairs) goes through a Router that:
+
+  - picks the model by request size (estimated prompt + output tokens):
+        RESUME_ROUTES="gpt-4.1-mini<=12000,gpt-4.1"
+    the first route whose bound covers the request wins; a route without a
+    bound takes everything else. Without routes the backend model is used.
+  - sends a hedged duplicate of a request that has not produced its first
+    token by a deadline learned from that model's recent times to first
+    token (the RESUME_HEDGE_PERCENTILE-th percentile of the last WINDOW).
+    A primary that loses before its first token still adds a sample: the
+    time it waited, and at least the deadline it missed.
+    The first response that completes and parses wins and the other
+    stream is closed at once, so the loser stops generating.
+  - caps hedges at RESUME_HEDGE_BUDGET of all requests, so a slow backend
+    cannot double the spend.
+
+    RESUME_ROUTES             size-based routes (see above)
+    RESUME_HEDGE              1 to enable hedging (default off)
+    RESUME_HEDGE_PERCENTILE   TTFT percentile used as the deadline (default 95)
+    RESUME_HEDGE_BUDGET       max hedges / requests (default 0.05)
+    RESUME_HEDGE_DEFAULT_MS   deadline until MIN_SAMPLES TTFTs are known (default 10000)
+
+Requests are streamed (like cancellable ones), which is what makes the
+first token observable and the loser closable. Router.stats() and the
+model_ttft histogram / llm_hedges counter in metrics show what it does.
+"""
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import metrics
+from cancellation import CancelToken, GenerationCancelled, current
+
+WINDOW = 500       # recent TTFT samples kept per model
+MIN_SAMPLES = 20   # below this the default deadline is used
+MIN_DEADLINE = 0.25
+
+
+def parse_routes(spec):
+    """"a<=12000,b" -> [("a", 12000), ("b", None)]."""
+    routes = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        model, _, bound = part.partition("<=")
+        routes.append((model.strip(), int(bound) if bound.strip() else None))
+    return routes
+
+
+class LatencyWindow:
+    """Rolling window of one model's times to first token (seconds)."""
+
+    def __init__(self, size=WINDOW):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class Router:
+    def __init__(self, routes=None, default_model=None, hedge=None, percentile=None, budget=None,
+                 default_deadline=None):
+        self.routes = parse_routes(os.getenv("RESUME_ROUTES")) if routes is None else list(routes)
+        self.default_model = default_model  # None: the backend model at request time
+        self.hedge = hedge if hedge is not None else os.getenv("RESUME_HEDGE", "0").lower() in ("1", "true", "yes")
+        self.percentile = percentile or float(os.getenv("RESUME_HEDGE_PERCENTILE", "95"))
+        self.budget = budget if budget is not None else float(os.getenv("RESUME_HEDGE_BUDGET", "0.05"))
+        self.default_deadline = default_deadline or float(os.getenv("RESUME_HEDGE_DEFAULT_MS", "10000")) / 1000
+        self.windows = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.hedge or bool(self.routes)
+
+    def choose(self, prompt_tokens, output_tokens):
+        """Model for a request of this estimated size."""
+        from resume_logic import get_model
+
+        size = prompt_tokens + output_tokens
+        for model, bound in self.routes:
+            if bound is None or size <= bound:
+                return model
+        return self.default_model or get_model()
+
+    def model_for(self, messages, output_tokens=None):
+        """choose() for chat messages; output defaults to the prompt size."""
+        from prompts import estimate_tokens
+
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        # a tailored resume is about as long as the text it is made from
+        return self.choose(prompt_tokens, prompt_tokens if output_tokens is None else output_tokens)
+
+    def window(self, model):
+        with self._lock:
+            if model not in self.windows:
+                self.windows[model] = LatencyWindow()
+            return self.windows[model]
+
+    def record_ttft(self, model, seconds):
+        self.window(model).add(seconds)
+        metrics.observe_histogram("model_ttft", model, seconds)
+
+    def deadline(self, model):
+        """Seconds to wait for the first token before hedging."""
+        window = self.window(model)
+        if len(window) < MIN_SAMPLES:
+            return self.default_deadline
+        return max(MIN_DEADLINE, window.percentile(self.percentile))
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def take_hedge(self):
+        """Reserve one hedge if the budget allows it."""
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.requests:
+                return False
+            self.hedges += 1
+        return True
+
+    def record_hedge(self, won):
+        metrics.increment("llm_hedges", "won" if won else "lost")
+        if won:
+            with self._lock:
+                self.hedges_won += 1
+
+    def stats(self):
+        with self._lock:
+            models = dict(self.windows)
+            out = {"requests": self.requests, "hedges": self.hedges, "hedges_won": self.hedges_won}
+        out["models"] = {
+            model: {"samples": len(w), "p50_ms": _ms(w.percentile(50)), "p95_ms": _ms(w.percentile(95)),
+                    "deadline_ms": _ms(self.deadline(model))}
+            for model, w in models.items()
+        }
+        return out
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """The process-wide router, built from the environment on first use."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = Router()
+    return _router
+
+
+def set_router(router):
+    """Swap the process-wide router (None rebuilds it from the environment); returns the old one."""
+    global _router
+    with _router_lock:
+        old, _router = _router, router
+    return old
+
+
+def active_router():
+    """The router if routing or hedging is configured, else None."""
+    router = get_router()
+    return router if router.enabled else None
+
+
+def model_for(messages, output_tokens=None):
+    """Routed model for messages, or the backend model when routing is off."""
+    from resume_logic import get_model
+
+    router = active_router()
+    return get_model() if router is None else router.model_for(messages, output_tokens)
+
+# ----------------------- hedged request -----------------------
+
+def complete_json(router, messages, client, output_tokens=None):
+    """
+    chat_json through the router: returns (parsed JSON, usage) of the first
+    attempt that completes; raises the last error if every attempt failed.
+    """
+    from resume_logic import chat_json_stream
+
+    model = router.model_for(messages, output_tokens)
+    router.count_request()
+    parent = current()  # the generation's CancelToken, if any
+    results = queue.Queue()
+    progress = threading.Event()  # first token or finish of the primary
+    attempts = []
+    deadline = router.deadline(model) if router.hedge else None
+    ttft_lock = threading.Lock()
+
+    def record_ttft(attempt, seconds):
+        with ttft_lock:  # once per attempt: the first token may race a censored sample
+            if attempt["ttft"]:
+                return
+            attempt["ttft"] = True
+        router.record_ttft(model, seconds)
+
+    def launch(hedge):
+        token = CancelToken()
+        attempt = {"token": token, "hedge": hedge, "started": time.perf_counter(), "ttft": False}
+
+        def first_token():
+            record_ttft(attempt, time.perf_counter() - attempt["started"])
+            progress.set()
+
+        def run():
+            try:
+                result = chat_json_stream(messages, client, token, model=model, on_first_token=first_token,
+                                          stage="openai_hedge" if hedge else "openai")
+                results.put((attempt, result, None))
+            except BaseException as e:
+                results.put((attempt, None, e))
+            progress.set()
+
+        attempts.append(attempt)
+        threading.Thread(target=metrics.bind(run), daemon=True).start()
+
+    def cancel_all():
+        for attempt in attempts:
+            attempt["token"].cancel()
+
+    unregister = parent.on_cancel(cancel_all) if parent is not None else None
+    try:
+        launch(hedge=False)
+        stopped = lambda: parent is not None and parent.cancelled  # noqa: E731
+        if router.hedge and not progress.wait(deadline) and not stopped():
+            if router.take_hedge():
+                metrics.increment("llm_hedges", "sent")
+                launch(hedge=True)
+            else:
+                metrics.increment("llm_hedges", "skipped")
+
+        errors = []
+        while len(errors) < len(attempts):
+            attempt, result, error = results.get()
+            if error is not None:
+                errors.append(error)
+                continue
+            for other in attempts:
+                if other is not attempt:
+                    other["token"].cancel()  # closes the losing stream right away
+                    if not other["hedge"]:
+                        # a primary beaten before its first token would otherwise leave no
+                        # sample, and the window would forget exactly the slow requests
+                        record_ttft(other, max(time.perf_counter() - other["started"], deadline))
+            if len(attempts) > 1:
+                router.record_hedge(won=attempt["hedge"])
+            return result
+        # every attempt failed: a stop wins over errors, then the real error
+        cancelled = [e for e in errors if isinstance(e, GenerationCancelled)]
+        real = [e for e in errors if not isinstance(e, GenerationCancelled)]
+        if cancelled and (stopped() or not real):
+            raise max(cancelled, key=lambda e: len(e.partial))
+        raise real[0]
+    finally:
+        if unregister is not None:
+            unregister()
@@ -0,0 +1,254 @@
+"""
+Validation of the tailored JSON between tailor_resume and the renderers.
+
+normalize() fixes recoverable shapes locally (no tokens spent):
+  - Education as a list of one entry -> object; GPA numbers -> strings
+  - Technologies / skill items / Responsibilities as strings -> lists
+  - Skills as a flat list or [{"Category", "Items"}] -> {category: items}
+  - alternate key names (Role -> Title, Employer -> Company, Bullets -> ...)
+  - bullet symbols stripped with clean_bullet, empty bullets dropped
+
+The per-section normalizers (normalize_header, normalize_skills,
+normalize_job, normalize_education) are shared with profile_store.py.
+
+Whatever is still missing or broken is reported as a problem, and
+validate_tailored() sends a small repair request for just those sections
+instead of regenerating the whole resume.
+"""
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from prompts import assemble_messages, merge_usage
+from resume_logic import clean_bullet
+
+
+class SchemaError(ValueError):
+    """The tailored JSON is still invalid after normalization and repair."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__("; ".join(f"{section}: {msg}" for section, msg in problems))
+
+
+JOB_KEY_ALIASES = {
+    "Company": ("Company", "Employer", "Organization", "Client"),
+    "Title": ("Title", "Role", "Position", "JobTitle"),
+    "Dates": ("Dates", "Date", "Duration", "Period"),
+    "Responsibilities": ("Responsibilities", "Bullets", "Highlights", "Achievements", "Duties"),
+    "Technologies": ("Technologies", "Tech", "TechStack", "Tools"),
+}
+
+SECTION_SCHEMAS = {
+    "Header": "Header (object): Name (string, required); Email, Phone, Address (strings, if known); "
+              "Links, Other (arrays of strings, optional)",
+    "Summary": "Summary (string)",
+    "Skills": "Skills (object where each key is a category and value is an array of strings)",
+    "Education": "Education (object with Dates, Degree, Institution (university/school name), GPA; Location is optional)",
+}
+
+REPAIR_PROMPT = """You are a resume expert and a helpful assistant that ONLY returns JSON.
+One section of a tailored resume is missing or malformed. Produce ONLY that section.
+
+Return a STRICT JSON object with exactly one key:
+- {schema}
+
+Constraints:
+- Be truthful to resume and job description.
+- If any contact field is missing, omit that field rather than inventing."""
+
+
+def _as_list(value, split_commas=False):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        parts = re.split(r",|\n", value) if split_commas else value.split("\n")
+        return [p.strip() for p in parts if p.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [str(value)]
+
+
+def _pick(d, aliases):
+    for key in aliases:
+        if d.get(key) not in (None, "", []):
+            return d[key]
+    return None
+
+
+def normalize_header(header, problems):
+    """Header as an object with list-valued Links/Other; appends to problems when Name is missing."""
+    if isinstance(header, str):
+        header = {"Name": header}
+    if not isinstance(header, dict):
+        header = {}
+    for key in ("Links", "Other"):
+        if key in header:
+            header[key] = _as_list(header[key], split_commas=True)
+    if not str(header.get("Name") or "").strip():
+        problems.append(("Header", "missing Name"))
+    return header
+
+
+def normalize_skills(skills, problems):
+    """Skills as {category: [items]} from any of the accepted shapes; empty categories dropped."""
+    if isinstance(skills, list):
+        if skills and all(isinstance(s, dict) for s in skills):
+            skills = {
+                str(_pick(s, ("Category", "Name", "Group")) or f"Skills {i + 1}"): _pick(s, ("Items", "Skills", "Values"))
+                for i, s in enumerate(skills)
+            }
+        else:
+            skills = {"Skills": skills}
+    elif isinstance(skills, str):
+        skills = {"Skills": skills}
+    if not isinstance(skills, dict):
+        skills = {}
+    skills = {str(cat): _as_list(items, split_commas=True) for cat, items in skills.items()}
+    skills = {cat: items for cat, items in skills.items() if items}
+    if not skills:
+        problems.append(("Skills", "missing or empty"))
+    return skills
+
+
+def normalize_job(job, index, problems):
+    """One Experience entry with canonical keys and cleaned bullets; index names it in problems."""
+    if not isinstance(job, dict):
+        problems.append((f"Experience[{index}]", "not an object"))
+        return {"Company": "", "Title": "", "Dates": "", "Responsibilities": []}
+    out = {
+        "Company": str(_pick(job, JOB_KEY_ALIASES["Company"]) or ""),
+        "Title": str(_pick(job, JOB_KEY_ALIASES["Title"]) or ""),
+        "Dates": str(_pick(job, JOB_KEY_ALIASES["Dates"]) or ""),
+    }
+    bullets = [clean_bullet(b) for b in _as_list(_pick(job, JOB_KEY_ALIASES["Responsibilities"]))]
+    out["Responsibilities"] = [b for b in bullets if b]
+    techs = _pick(job, JOB_KEY_ALIASES["Technologies"])
+    if techs is not None:
+        out["Technologies"] = _as_list(techs, split_commas=True)
+    if not out["Responsibilities"]:
+        problems.append((f"Experience[{index}]", "missing Responsibilities"))
+    return out
+
+
+def _normalize_education_entry(entry):
+    if isinstance(entry, str):
+        return {"Degree": entry}
+    if not isinstance(entry, dict):
+        return None
+    return {k: (str(v) if isinstance(v, (int, float)) else v) for k, v in entry.items() if v not in (None, "")}
+
+
+def normalize_education(edu, problems):
+    """Education as one object, or a list when there are several entries."""
+    entries = edu if isinstance(edu, list) else [edu]
+    entries = [e for e in (_normalize_education_entry(e) for e in entries) if e]
+    if not entries:
+        problems.append(("Education", "missing or empty"))
+        return {}
+    return entries[0] if len(entries) == 1 else entries
+
+
+def normalize(tailored):
+    """Return (normalized copy, problems) where problems is [(section, message)]."""
+    problems = []
+    if not isinstance(tailored, dict):
+        tailored = {}
+    out = dict(tailored)
+    out["Header"] = normalize_header(tailored.get("Header"), problems)
+
+    summary = tailored.get("Summary")
+    if isinstance(summary, list):
+        summary = " ".join(str(s).strip() for s in summary)
+    out["Summary"] = str(summary or "").strip()
+    if not out["Summary"]:
+        problems.append(("Summary", "missing or empty"))
+
+    out["Skills"] = normalize_skills(tailored.get("Skills"), problems)
+
+    experience = tailored.get("Experience")
+    if isinstance(experience, dict):
+        experience = [experience]
+    if not isinstance(experience, list) or not experience:
+        problems.append(("Experience", "missing or empty"))
+        experience = []
+    out["Experience"] = [normalize_job(job, i, problems) for i, job in enumerate(experience)]
+
+    out["Education"] = normalize_education(tailored.get("Education"), problems)
+    return out, problems
+
+
+def _repair_one(section, tailored, resume_text, job_description, custom_prompt):
+    with metrics.stage("repair", section=section):
+        return _repair_section(section, tailored, resume_text, job_description, custom_prompt)
+
+
+def _repair_section(section, tailored, resume_text, job_description, custom_prompt):
+    from resume_logic import chat_json
+
+    match = re.fullmatch(r"Experience\[(\d+)\]", section)
+    if match:
+        # a single broken position: regenerate just that entry
+        from fanout import generate_position
+
+        index = int(match.group(1))
+        jobs = tailored["Experience"]
+        return section, *generate_position(
+            resume_text, job_description, custom_prompt, None, jobs[index], index, len(jobs)
+        )
+
+    if section == "Experience":
+        # nothing usable at all: the full section is the only way back
+        schema = "Experience (array of objects, each with: Company, Title, Dates, Responsibilities[]; Technologies is optional array)"
+    else:
+        schema = SECTION_SCHEMAS[section]
+    context = {k: v for k, v in tailored.items() if k != section and v}
+    messages, _ = assemble_messages(
+        resume_text, job_description, custom_prompt,
+        system_prompt=REPAIR_PROMPT.format(schema=schema),
+        suffix="Other sections already written (for consistency):\n" + json.dumps(context, ensure_ascii=False)[:4000],
+    )
+    fixed, usage = chat_json(messages)
+    return section, fixed.get(section), usage
+
+
+def validate_tailored(tailored, resume_text="", job_description="", custom_prompt=None, repair=True):
+    """
+    Normalize tailored JSON, repairing broken sections with targeted requests.
+
+    Returns (tailored, report); raises SchemaError if it is still invalid.
+    """
+    fixed, problems = normalize(tailored)
+    report = {"problems": [f"{s}: {m}" for s, m in problems], "repaired": [], "usage": {}}
+    if not problems:
+        return fixed, report
+    if not repair:
+        raise SchemaError(problems)
+
+    # "Experience" as a whole supersedes its individual entries
+    sections = list(dict.fromkeys(s for s, _ in problems))
+    if "Experience" in sections:
+        sections = [s for s in sections if not s.startswith("Experience[")]
+
+    with ThreadPoolExecutor(max_workers=min(4, len(sections))) as pool:
+        # bound here, in the caller's context, so repairs join its trace and see its cancel token
+        futures = [pool.submit(metrics.bind(_repair_one), s, fixed, resume_text, job_description, custom_prompt)
+                   for s in sections]
+        results = [f.result() for f in futures]
+
+    usages = []
+    for section, value, usage in results:
+        usages.append(usage)
+        match = re.fullmatch(r"Experience\[(\d+)\]", section)
+        if match:
+            fixed["Experience"][int(match.group(1))] = value
+        elif value is not None:
+            fixed[section] = value
+        report["repaired"].append(section)
+    report["usage"] = merge_usage(*usages)
+
+    fixed, problems = normalize(fixed)
+    if problems:
+        raise SchemaError(problems)
+    return fixed, report
@@ -0,0 +1,494 @@
+"""
+Asynchronous job service (ASGI).
+
+Instead of holding the request open for the whole generation, clients submit
+a job, get an id back immediately and fetch the rendered documents later:
+
+    POST /jobs                      {"resume", "job_description", "custom_prompt",
+                                     "formats": ["docx", "pdf"], "include_tech",
+                                     "styles", "fit_pages", "fanout", "profile", "no_cache"}
+                                    -> 202 {"id", "status", ...}
+                                       200 if an identical job already exists
+                                       429 + Retry-After when the queue is full
+    GET  /jobs/{id}                 status (+ tailored JSON once done)
+    GET  /jobs/{id}/events          server-sent status events until done/error
+    GET  /jobs/{id}/download/{fmt}  the rendered file (fmt in formats, or "json")
+    DELETE /jobs/{id}               cancel a queued or running job
+                                    -> 200 (was queued) / 202 (stopping), 409 if finished
+    GET  /archive?ids=a,b,c         one zip of the jobs' documents + manifest.jsonl,
+                                    streamed: each job is added as soon as it finishes
+    GET  /metrics                   Prometheus text (see metrics.py)
+
+A bounded pool of worker tasks runs tailor_resume plus rendering off the
+event loop. Jobs wait in a local in-process queue, so no external services
+are needed. Identical inputs map to the same job while it is queued, running
+or finished. Cancelling a running job closes its model stream; the job ends
+as "cancelled" with the sections finished so far in "partial". Finished jobs
+are kept for RESUME_SERVICE_RETENTION seconds.
+
+    uvicorn service:app --port 8000
+
+Settings: RESUME_SERVICE_WORKERS (default 4), RESUME_SERVICE_QUEUE (default 32),
+RESUME_SERVICE_RETENTION (default 3600).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from urllib.parse import parse_qs
+
+import metrics
+from cancellation import CancelToken, GenerationCancelled
+from profile_store import profile_enabled
+from response_cache import cache_key
+
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "json": "application/json",
+}
+DEFAULT_FORMATS = ("docx", "pdf")
+MAX_BODY_BYTES = 1 << 20
+TERMINAL = ("done", "error", "cancelled")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class LocalQueue:
+    """In-process bounded FIFO of job ids (the default queue backend)."""
+
+    def __init__(self, maxsize):
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def put_nowait(self, job_id):
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise QueueFull from None
+
+    async def get(self):
+        return await self._queue.get()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class Job:
+    def __init__(self, job_id, key, request):
+        self.id = job_id
+        self.key = key
+        self.request = request
+        self.formats = request["formats"]
+        self.status = "queued"
+        self.stage = None
+        self.error = None
+        self.tailored = None
+        self.partial = None
+        self.files = {}
+        self.render_ms = {}
+        self.cancel = CancelToken()
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        # wake every waiter, then arm a fresh event for the next change
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+    def as_dict(self, with_result=False):
+        out = {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "formats": list(self.formats),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.error:
+            out["error"] = self.error
+        if self.status == "cancelled" and with_result:
+            out["partial"] = self.partial or {}
+        if self.status == "done":
+            out["downloads"] = {fmt: f"/jobs/{self.id}/download/{fmt}" for fmt in [*self.files, "json"]}
+            if with_result:
+                out["tailored"] = self.tailored
+        return out
+
+
+def job_key(request):
+    """Identical inputs and render options share one job."""
+    base = cache_key(request["resume"], request["job_description"], request["custom_prompt"],
+                     "job", "1", fanout=bool(request.get("fanout")), profile=bool(request.get("profile")))
+    options = json.dumps([sorted(request["formats"]), request["include_tech"], request.get("styles"),
+                          request.get("fit_pages")], sort_keys=True)
+    return hashlib.sha256(f"{base}|{options}".encode("utf-8")).hexdigest()
+
+
+def parse_job_request(data):
+    """Validate a POST /jobs body; raises ValueError with a client-facing message."""
+    if not isinstance(data, dict):
+        raise ValueError("body must be a JSON object")
+    for field in ("resume", "job_description", "custom_prompt"):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f"{field} must be a string")
+    if not (data.get("job_description") or "").strip():
+        raise ValueError("job_description is required")
+    formats = data.get("formats") or list(DEFAULT_FORMATS)
+    if isinstance(formats, str):
+        formats = [formats]
+    if not isinstance(formats, list) or not all(isinstance(f, str) for f in formats):
+        raise ValueError("formats must be a string or a list of strings")
+    formats = list(dict.fromkeys(f.lower() for f in formats))
+    unknown = [f for f in formats if f not in CONTENT_TYPES or f == "json"]
+    if unknown:
+        raise ValueError(f"unknown format(s): {', '.join(unknown)}")
+    if not isinstance(data.get("include_tech", True), bool):
+        raise ValueError("include_tech must be true or false")
+    if data.get("styles") is not None and not isinstance(data["styles"], dict):
+        raise ValueError("styles must be an object")
+    fit_pages = data.get("fit_pages")
+    if fit_pages is not None and (not isinstance(fit_pages, int) or isinstance(fit_pages, bool) or fit_pages < 1):
+        raise ValueError("fit_pages must be a positive integer")
+    return {
+        "resume": data.get("resume") or "",
+        "job_description": data["job_description"],
+        "custom_prompt": data.get("custom_prompt") or "",
+        "formats": formats,
+        "include_tech": data.get("include_tech", True),
+        "styles": data.get("styles"),
+        "fit_pages": fit_pages,
+        "fanout": bool(data.get("fanout")),
+        "profile": bool(data.get("profile", profile_enabled())),
+        "no_cache": bool(data.get("no_cache")),
+    }
+
+
+def run_job(request, on_stage, cancel=None):
+    """Blocking part of a job: tailor, then render. Runs in a worker thread."""
+    from export import export_formats
+    from resume_logic import tailor_resume
+
+    on_stage("generating")
+    tailored = tailor_resume(
+        request["resume"], request["job_description"], request["custom_prompt"],
+        use_cache=not request["no_cache"], fanout=request["fanout"], cancel=cancel, profile=request["profile"],
+    )
+    if cancel is not None:
+        cancel.check(tailored)
+    on_stage("rendering")
+    styles = request["styles"]
+    if request.get("fit_pages"):
+        from page_fit import fit_to_pages
+
+        # fitted once on the PDF layout; every format uses the same sizes and bullets
+        tailored, styles, _ = fit_to_pages(tailored, request["fit_pages"], styles, request["include_tech"])
+    files, info = export_formats(tailored, request["formats"], request["include_tech"], styles, request["resume"],
+                                 with_info=True)
+    return tailored, files, info["render_ms"]
+
+
+# ----------------------- ASGI app -----------------------
+
+class JobService:
+    def __init__(self, workers=None, queue_size=None, retention=None, queue=None):
+        self.workers = workers or int(os.getenv("RESUME_SERVICE_WORKERS", "4"))
+        self.queue_size = queue_size or int(os.getenv("RESUME_SERVICE_QUEUE", "32"))
+        self.retention = retention or float(os.getenv("RESUME_SERVICE_RETENTION", "3600"))
+        self.queue = queue
+        self.jobs = {}
+        self.by_key = {}
+        self._tasks = []
+
+    # ----------------------- lifecycle -----------------------
+
+    def _ensure_started(self):
+        if self._tasks:
+            return
+        if self.queue is None:
+            self.queue = LocalQueue(self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = self.jobs.get(await self.queue.get())
+            if job is None or job.status != "queued":
+                continue  # expired or cancelled while queued
+
+            def on_stage(stage, job=job):
+                loop.call_soon_threadsafe(self._set_stage, job, stage)
+
+            job.status, job.started = "running", time.time()
+            job.notify()
+            try:
+                with metrics.run("job"):
+                    job.tailored, job.files, job.render_ms = await asyncio.to_thread(
+                        run_job, job.request, on_stage, job.cancel
+                    )
+                job.status = "done"
+            except GenerationCancelled as e:
+                job.status, job.partial = "cancelled", e.partial
+            except Exception as e:
+                job.status, job.error = "error", str(e)
+            job.stage = None
+            job.finished = time.time()
+            job.notify()
+
+    def _set_stage(self, job, stage):
+        job.stage = stage
+        job.notify()
+
+    def _expire(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self.jobs.items()):
+            if job.status in TERMINAL and job.finished < cutoff:
+                del self.jobs[job_id]
+                if self.by_key.get(job.key) == job_id:
+                    del self.by_key[job.key]
+
+    # ----------------------- handlers -----------------------
+
+    def submit(self, request):
+        """Returns (status code, job or None)."""
+        self._expire()
+        key = job_key(request)
+        existing = self.jobs.get(self.by_key.get(key))
+        if existing is not None and existing.status not in ("error", "cancelled") and not request["no_cache"]:
+            return 200, existing
+        job = Job(uuid.uuid4().hex, key, request)
+        try:
+            self.queue.put_nowait(job.id)
+        except QueueFull:
+            return 429, None
+        self.jobs[job.id] = job
+        self.by_key[key] = job.id
+        return 202, job
+
+    def cancel(self, job):
+        """Returns (status code, job); queued jobs end at once, running ones once the stream is closed."""
+        if job.status == "queued":
+            job.cancel.cancel()
+            job.status, job.finished = "cancelled", time.time()
+            job.notify()
+            return 200, job
+        if job.status == "running":
+            job.cancel.cancel()
+            return 202, job
+        return 409, job
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        self._ensure_started()
+        method, parts = scope["method"], [p for p in scope["path"].split("/") if p]
+
+        if parts == ["jobs"] and method == "POST":
+            await self._post_job(receive, send)
+        elif parts == ["archive"] and method == "GET":
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            ids = [i for value in query.get("ids", []) for i in value.split(",") if i]
+            await self._archive(list(dict.fromkeys(ids)), receive, send)
+        elif parts == ["metrics"] and method == "GET":
+            await respond(send, 200, metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+        elif len(parts) == 2 and parts[0] == "jobs" and method == "DELETE":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await respond_json(send, 404, {"error": "unknown job"})
+            else:
+                status, job = self.cancel(job)
+                await respond_json(send, status, job.as_dict(with_result=True))
+        elif len(parts) >= 2 and parts[0] == "jobs" and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await respond_json(send, 404, {"error": "unknown job"})
+            elif len(parts) == 2:
+                await respond_json(send, 200, job.as_dict(with_result=True))
+            elif parts[2:] == ["events"]:
+                await self._events(job, receive, send)
+            elif len(parts) == 4 and parts[2] == "download":
+                await self._download(job, parts[3], send)
+            else:
+                await respond_json(send, 404, {"error": "not found"})
+        elif parts and parts[0] in ("jobs", "archive", "metrics"):
+            await respond_json(send, 405, {"error": "method not allowed"})
+        else:
+            await respond_json(send, 404, {"error": "not found"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._ensure_started()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _post_job(self, receive, send):
+        body = await read_body(receive)
+        if body is None:
+            await respond_json(send, 413, {"error": "body too large"})
+            return
+        try:
+            request = parse_job_request(json.loads(body or b"{}"))
+        except (ValueError, json.JSONDecodeError) as e:
+            await respond_json(send, 400, {"error": str(e)})
+            return
+        status, job = self.submit(request)
+        if job is None:
+            # backpressure: tell the client when a slot is likely to free up
+            await respond_json(send, 429, {"error": "queue full"}, [(b"retry-after", b"5")])
+            return
+        out = job.as_dict()
+        out["links"] = {"status": f"/jobs/{job.id}", "events": f"/jobs/{job.id}/events"}
+        await respond_json(send, status, out, [(b"location", f"/jobs/{job.id}".encode())])
+
+    async def _download(self, job, fmt, send):
+        if job.status != "done":
+            await respond_json(send, 409, {"error": f"job is {job.status}", **job.as_dict()})
+            return
+        if fmt == "json":
+            data = json.dumps(job.tailored, ensure_ascii=False).encode("utf-8")
+        elif fmt in job.files:
+            data = job.files[fmt]
+        else:
+            await respond_json(send, 404, {"error": f"format {fmt!r} was not requested"})
+            return
+        from export import bundle_basename
+
+        filename = f"{bundle_basename(job.tailored)}.{fmt}"
+        await respond(send, 200, data, CONTENT_TYPES[fmt],
+                      [(b"content-disposition", f'attachment; filename="{filename}"'.encode())])
+
+    async def _archive(self, job_ids, receive, send):
+        jobs = [self.jobs.get(job_id) for job_id in job_ids]
+        if not jobs:
+            await respond_json(send, 400, {"error": "ids is required"})
+            return
+        unknown = [job_id for job_id, job in zip(job_ids, jobs) if job is None]
+        if unknown:
+            await respond_json(send, 404, {"error": "unknown job(s)", "ids": unknown})
+            return
+        from archive import ArchiveWriter
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/zip"),
+                        (b"content-disposition", b'attachment; filename="resumes.zip"')],
+        })
+        archive = ArchiveWriter()  # buffered: drained into the response after every job
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        pending = {asyncio.ensure_future(_finished(job)): job for job in jobs}
+        try:
+            while pending:
+                done, _ = await asyncio.wait([*pending, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    return
+                for future in done:
+                    job = pending.pop(future)
+                    key = job.key[:16]
+                    elapsed = round(job.finished - job.started, 3) if job.started else None
+                    if job.status == "done":
+                        await asyncio.to_thread(archive.add_result, job.tailored, job.files, key=job.id,
+                                                input_hash=key, render_ms=job.render_ms, elapsed_s=elapsed)
+                    else:
+                        archive.add_record({"id": job.id, "input_hash": key, "status": job.status,
+                                            "error": job.error, "elapsed_s": elapsed})
+                    await send({"type": "http.response.body", "body": archive.take(), "more_body": True})
+            archive.close()
+            await send({"type": "http.response.body", "body": archive.take()})
+        finally:
+            disconnected.cancel()
+            for future in pending:
+                future.cancel()
+
+    async def _events(self, job, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        })
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            while True:
+                changed = job.changed  # grab before sending so no change is missed
+                await send_event(send, "status", job.as_dict(with_result=job.status in ("done", "cancelled")))
+                if job.status in TERMINAL:
+                    break
+                waiter = asyncio.ensure_future(changed.wait())
+                done, _ = await asyncio.wait([waiter, disconnected], timeout=15, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if disconnected in done:
+                    return
+                if not done:
+                    await send({"type": "http.response.body", "body": b": keep-alive\n\n", "more_body": True})
+        finally:
+            disconnected.cancel()
+        await send({"type": "http.response.body", "body": b""})
+
+
+# ----------------------- ASGI helpers -----------------------
+
+async def read_body(receive, limit=MAX_BODY_BYTES):
+    """Whole request body, or None if it exceeds limit."""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _finished(job):
+    while job.status not in TERMINAL:
+        await job.changed.wait()
+
+
+async def _wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def respond(send, status, body, content_type, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode()),
+                    *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def respond_json(send, status, payload, headers=()):
+    await respond(send, status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+
+async def send_event(send, event, payload):
+    data = f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+    await send({"type": "http.response.body", "body": data, "more_body": True})
+
+
+app = JobService()
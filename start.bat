@@ -1 +1 @@
-streamlit run api/generate.py
\ No newline at end of file
+streamlit run app.py
\ No newline at end of file
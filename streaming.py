@@ -0,0 +1,251 @@
+"""
+Streaming generation: consume the chat completion stream and surface each
+resume section as soon as its JSON value is closed.
+
+    for section, index, value, partial in stream_tailor_resume(resume, jd, prompt):
+        ...  # partial is the resume dict assembled so far
+
+Experience entries are emitted one at a time (index = position in the list);
+every other top-level key is emitted once with index None. The final event
+is ("done", None, tailored, tailored) with the fully parsed response, preceded
+by ("usage", None, usage, partial) when the provider reports token usage.
+"""
+import json
+import time
+
+import cancellation
+import metrics
+import routing
+
+
+class SectionStreamParser:
+    """
+    Incremental scanner for a single top-level JSON object.
+
+    It only tracks string/escape state and bracket depth, and slices out a
+    value with json.loads once it is known to be complete, so the cost per
+    chunk is linear in the chunk size.
+    """
+
+    def __init__(self, item_keys=("Experience",)):
+        self.item_keys = set(item_keys)
+        self.buf = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.expect_key = True
+        self.key = None
+        self.value_start = None
+        self.item_start = None
+        self.item_index = 0
+        self.result = {}
+
+    def _emit_value(self, end, events):
+        value = json.loads(self.buf[self.value_start:end])
+        self.result[self.key] = value
+        # list items were already emitted one by one
+        if not (self.key in self.item_keys and self.item_index):
+            events.append((self.key, None, value))
+        self.value_start = None
+        self.expect_key = True
+        self.item_index = 0
+
+    def feed(self, chunk):
+        """Add text and return the list of (section, index, value) events it completed."""
+        events = []
+        self.buf += chunk
+        buf = self.buf
+        for i in range(self.pos, len(buf)):
+            c = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.expect_key:
+                        self.key = json.loads(buf[self.string_start:i + 1])
+                    elif self.depth == 1 and self.value_start == self.string_start:
+                        self._emit_value(i + 1, events)
+                continue
+
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+                if self.depth == 1 and not self.expect_key and self.value_start is None:
+                    self.value_start = i
+            elif c in "{[":
+                if self.depth == 1 and not self.expect_key and self.value_start is None:
+                    self.value_start = i
+                if self.depth == 2 and c == "{" and self.key in self.item_keys:
+                    self.item_start = i
+                self.depth += 1
+            elif c in "}]":
+                self.depth -= 1
+                if self.depth == 2 and c == "}" and self.item_start is not None:
+                    item = json.loads(buf[self.item_start:i + 1])
+                    self.result.setdefault(self.key, []).append(item)
+                    events.append((self.key, self.item_index, item))
+                    self.item_index += 1
+                    self.item_start = None
+                elif self.depth == 1 and self.value_start is not None:
+                    self._emit_value(i + 1, events)
+                elif self.depth == 0 and self.value_start is not None:
+                    # bare number/true/false/null as the last member
+                    self._emit_value(i, events)
+            elif self.depth == 1:
+                if c == ":":
+                    self.expect_key = False
+                    self.value_start = None
+                elif c == ",":
+                    if self.value_start is not None:
+                        self._emit_value(i, events)
+                    self.expect_key = True
+                elif not c.isspace() and not self.expect_key and self.value_start is None:
+                    self.value_start = i
+        self.pos = len(buf)
+        return events
+
+
+def stream_tailor_resume(resume_text, job_description, custom_prompt=None, use_cache=True, cancel=None, profile=None):
+    """
+    Generator version of tailor_resume that yields sections as they close.
+
+    The upstream stream is closed when cancel (a CancelToken) fires, raising
+    GenerationCancelled with the sections so far, and also when the consumer
+    stops iterating (e.g. an SSE client disconnects).
+
+    With profile (see profile_store.py), Header and Education come from the
+    stored profile right away and each Experience entry is yielded with its
+    Company/Title/Dates filled in.
+    """
+    from profile_store import profile_enabled
+    from prompts import usage_from_response
+    from resume_logic import build_messages, caching_enabled, get_client, tailor_cache_key
+    from response_cache import get_cache
+
+    profile = profile_enabled() if profile is None else profile
+    mode = {"mode": "profile"} if profile else {}
+    key = tailor_cache_key(resume_text, job_description, custom_prompt, **mode)
+    if use_cache and caching_enabled():
+        cached = get_cache().get(key)
+        if cached is not None:
+            partial = {}
+            for section, value in cached.items():
+                partial[section] = value
+                yield section, None, value, partial
+            yield "done", None, cached, cached
+            return
+
+    stored = None
+    if profile:
+        from profile_store import apply_profile, get_profile, profile_messages
+
+        try:
+            with cancellation.scope(cancel):
+                stored, _ = get_profile(resume_text)
+        except cancellation.GenerationCancelled:
+            raise cancellation.GenerationCancelled() from None  # parsed sections are not tailored ones
+        messages, _ = profile_messages(stored, job_description, custom_prompt)
+        for section in ("Header", "Education"):
+            if stored.get(section):
+                yield section, None, stored[section], apply_profile(stored, {}, partial=True)
+    else:
+        messages = build_messages(resume_text, job_description, custom_prompt)
+
+    def view(result):
+        # what the consumer sees: the generated sections, merged with the profile
+        return result if stored is None else apply_profile(stored, result, partial=True)
+
+    # The request is timed by hand: time spent by the consumer between
+    # yields (e.g. drawing the preview) is not model time.
+    started = time.perf_counter()
+    paused = 0.0
+    timing = {}
+    # routed by size when routing is on (streamed sections are not hedged)
+    model = routing.model_for(messages)
+    stream = get_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        response_format={"type": "json_object"},
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    parser = SectionStreamParser()
+    usage = {}
+    unregister = cancel.on_cancel(stream.close) if cancel is not None else None
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.cancelled:
+                break
+            if getattr(chunk, "usage", None):
+                usage = usage_from_response(chunk)  # final chunk, no choices
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if not timing:
+                timing["ttft_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                router = routing.active_router()
+                if router is not None:
+                    router.record_ttft(model, timing["ttft_ms"] / 1000)
+            for section, index, value in parser.feed(delta):
+                partial = view(parser.result)
+                if stored is not None:
+                    if section not in ("Summary", "Skills", "Experience"):
+                        continue  # the profile's sections win
+                    if section == "Experience":
+                        if index is None or index >= len(partial.get("Experience", [])):
+                            continue  # more positions than the profile has
+                        value = partial["Experience"][index]
+                yielded = time.perf_counter()
+                yield section, index, value, partial
+                paused += time.perf_counter() - yielded
+    except Exception:
+        if cancel is None or not cancel.cancelled:
+            raise  # a stream closed by cancel() fails mid-read; only that is expected
+    finally:
+        if unregister is not None:
+            unregister()
+        stream.close()  # no-op when finished; aborts the request when abandoned early
+    metrics.observe("openai", time.perf_counter() - started - paused, **timing)
+    if cancel is not None:
+        cancel.check(view(parser.result))
+    metrics.record_tokens(usage)
+
+    from resume_logic import finalize_tailored
+
+    with metrics.stage("parse"):
+        tailored = json.loads(parser.buf)
+    if stored is not None:
+        tailored = apply_profile(stored, tailored)
+    with cancellation.scope(cancel):
+        tailored, _, _ = finalize_tailored(tailored, resume_text, job_description, custom_prompt)
+    if caching_enabled():
+        get_cache().set(key, tailored)
+    if usage:
+        yield "usage", None, usage, tailored
+    yield "done", None, tailored, tailored
+
+
+def sse_events(resume_text, job_description, custom_prompt=None, use_cache=True, profile=None):
+    """Server-sent-events framing of stream_tailor_resume for the API handler."""
+    try:
+        with metrics.run("api_stream"):
+            yield from _sse_frames(resume_text, job_description, custom_prompt, use_cache, profile)
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+
+def _sse_frames(resume_text, job_description, custom_prompt, use_cache, profile):
+    for section, index, value, _ in stream_tailor_resume(resume_text, job_description, custom_prompt, use_cache,
+                                                         profile=profile):
+        if section in ("done", "usage"):
+            yield f"event: {section}\ndata: {json.dumps(value)}\n\n"
+        else:
+            payload = {"section": section, "index": index, "value": value}
+            yield f"event: section\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+
+@pytest.fixture(autouse=True)
+def isolated_stores(tmp_path, monkeypatch):
+    """Point the response cache and the profile store at tmp_path, never the real ones."""
+    import profile_store
+    import response_cache
+
+    monkeypatch.setenv("RESUME_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("RESUME_PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(profile_store, "_store", None)
+
+
+@pytest.fixture
+def fake_backend():
+    """Factory that installs benchmarks.fake_backend.FakeBackend(**options); uninstalled afterwards."""
+    import fake_backend
+
+    def install(**options):
+        return fake_backend.install(fake_backend.FakeBackend(**options))
+
+    yield install
+    fake_backend.uninstall()
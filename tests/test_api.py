@@ -0,0 +1,52 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from fixtures import resume_text_from, synthetic_job_description, synthetic_tailored
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("api_generate", os.path.join(ROOT, "api", "generate.py"))
+api_generate = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(api_generate)
+handler = api_generate.handler
+
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+PREVIOUS = synthetic_tailored(positions=2, bullets=3, technologies=4)
+BODY = {"resume": resume_text_from(PREVIOUS), "job_description": synthetic_job_description()}
+
+
+@pytest.mark.parametrize("fit_pages", ["two", "2", 0, -1, 1.5, True])
+def test_bad_fit_pages_is_a_400(fit_pages, fake_backend):
+    backend = fake_backend()
+    response = handler(FakeRequest(dict(BODY, format="docx", fit_pages=fit_pages)))
+    assert response["statusCode"] == 400
+    assert "fit_pages" in json.loads(response["body"])["error"]
+    assert backend.calls == 0
+
+
+def test_cache_header_is_hit_or_miss(fake_backend):
+    fake_backend()
+    first, second = handler(FakeRequest(BODY)), handler(FakeRequest(BODY))
+    assert (first["headers"]["X-Cache"], second["headers"]["X-Cache"]) == ("MISS", "HIT")
+    assert "X-Tailor-Mode" not in first["headers"]
+
+
+def test_incremental_mode_has_its_own_header(fake_backend):
+    fake_backend()
+    previous = {"job_description": BODY["job_description"], "custom_prompt": "", "tailored": PREVIOUS}
+    body = dict(BODY, custom_prompt="Keep the summary under 50 words.", previous=previous)
+    response = handler(FakeRequest(body))
+    assert response["statusCode"] == 200
+    assert response["headers"]["X-Cache"] == "MISS"
+    assert response["headers"]["X-Tailor-Mode"] == "incremental"
+    assert response["headers"]["X-Regenerated"] == "Summary"
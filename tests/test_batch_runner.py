@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+from batch_runner import BatchRunner
+from fixtures import resume_text_from, synthetic_job_description, synthetic_tailored
+
+RESUME = resume_text_from(synthetic_tailored(positions=2, bullets=5, technologies=8))
+JOBS = [{"id": f"job{i}", "job_description": synthetic_job_description(seed=i, paragraphs=2)} for i in range(4)]
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("options, status", [
+    ({"score_only": True}, "scored"),
+    ({"min_score": 1.01}, "filtered"),  # no job can reach it
+])
+def test_rerun_does_not_repeat_settled_jobs(tmp_path, options, status):
+    out = tmp_path / "out.jsonl"
+    first = asyncio.run(BatchRunner(RESUME, **options).run(JOBS, str(out)))
+    assert first[status] == len(JOBS)
+    assert [r["status"] for r in lines(out)] == [status] * len(JOBS)
+
+    second = asyncio.run(BatchRunner(RESUME, **options).run(JOBS, str(out)))
+    assert second["skipped"] == len(JOBS)
+    assert len(lines(out)) == len(JOBS)
+
+
+def test_filtered_jobs_rescored_at_a_new_threshold(tmp_path):
+    out = tmp_path / "out.jsonl"
+    asyncio.run(BatchRunner(RESUME, min_score=1.01).run(JOBS, str(out)))
+    summary = asyncio.run(BatchRunner(RESUME, min_score=1.02).run(JOBS, str(out)))
+    assert summary["skipped"] == 0 and summary["filtered"] == len(JOBS)
+
+
+def test_archive_failures_stay_off_stdout(tmp_path, fake_backend, monkeypatch, capsys):
+    import zipfile
+
+    import export
+
+    fake_backend()
+    out, archive = tmp_path / "out.jsonl", tmp_path / "batch.zip"
+    asyncio.run(BatchRunner(RESUME, use_cache=False).run(JOBS[:2], str(out)))
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("renderer down")
+
+    monkeypatch.setattr(export, "export_formats", broken)
+    summary = asyncio.run(BatchRunner(RESUME, archive=str(archive)).run(JOBS[:2], str(out)))
+    assert summary["archive_errors"] == 2 and summary["archived"] == 0
+    assert capsys.readouterr().out == ""
+    with zipfile.ZipFile(archive) as zf:
+        manifest = [json.loads(line) for line in zf.read("manifest.jsonl").splitlines()]
+    assert sorted(entry["id"] for entry in manifest) == ["job0", "job1"]
+    assert {entry["status"] for entry in manifest} == {"error"}
@@ -0,0 +1,39 @@
+from bullets import dedupe_bullets
+
+LONG = ("Designed and shipped a streaming ingestion pipeline in Python and Kafka that processed "
+        "two billion events per day with exactly once delivery and cut infrastructure costs")
+SHORT = "Mentored four junior engineers"
+
+
+def tailored(*jobs):
+    return {"Experience": [{"Company": f"C{i}", "Responsibilities": list(bullets)} for i, bullets in enumerate(jobs)]}
+
+
+def test_near_duplicates_dropped_across_positions():
+    reworded = LONG.replace("cut infrastructure costs", "reduced infrastructure costs")
+    out, report = dedupe_bullets(tailored([LONG, SHORT], [reworded, "Built a billing service in Go"]))
+    assert out["Experience"][1]["Responsibilities"] == ["Built a billing service in Go"]
+    [dropped] = report["dropped"]
+    assert (dropped["job"], dropped["index"]) == (1, 0)
+    assert dropped["duplicate_of"] == {"job": 0, "index": 0}
+    assert report["total"] == 4 and report["kept"] == 3
+
+
+def test_threshold_controls_what_counts_as_a_duplicate():
+    other = "Designed and shipped a batch reporting pipeline in Scala and Spark for finance teams"
+    _, strict = dedupe_bullets(tailored([LONG, other]), threshold=0.9)
+    _, loose = dedupe_bullets(tailored([LONG, LONG + " quickly"]), threshold=0.6)
+    assert strict["dropped"] == [] and len(loose["dropped"]) == 1
+
+
+def test_a_position_is_never_emptied():
+    out, report = dedupe_bullets(tailored([LONG], [LONG]))
+    assert out["Experience"][1]["Responsibilities"] == [LONG]
+    assert report["dropped"] == []
+
+
+def test_length_flags_use_input_indices():
+    # index 0 is dropped as a duplicate; the short bullet after it stays at index 1 of the input
+    _, report = dedupe_bullets(tailored([LONG], [LONG + " again", SHORT]))
+    assert report["dropped"][0]["index"] == 0
+    assert {"job": 1, "index": 1, "words": 4} in report["length_flags"]
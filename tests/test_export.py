@@ -0,0 +1,25 @@
+import os
+import signal
+
+import export
+from fixtures import synthetic_tailored
+
+
+def test_export_recovers_from_a_killed_worker():
+    tailored = synthetic_tailored(positions=1, bullets=3, technologies=4)
+    assert set(export.export_formats(tailored)) == set(export.FORMATS)
+    broken = export.get_executor()
+    os.kill(next(iter(broken._processes)), signal.SIGKILL)
+
+    files = export.export_formats(tailored)  # rendered inline while the pool is replaced
+    assert all(files.values())
+    assert export.get_executor() is not broken
+    assert set(export.export_formats(tailored)) == set(export.FORMATS)
+
+
+def test_html_title_is_escaped():
+    tailored = synthetic_tailored(positions=1, bullets=2, technologies=2)
+    tailored["Header"]["Name"] = "</title><script>alert(1)</script>"
+    page = export.render_format("html", tailored).decode("utf-8")
+    assert "<script>" not in page
+    assert "&lt;/title&gt;&lt;script&gt;" in page
@@ -0,0 +1,12 @@
+from fixtures import resume_text_from, synthetic_job_description, synthetic_tailored
+from resume_logic import tailor_resume
+
+
+def test_each_position_gets_its_own_bullets(fake_backend):
+    fake_backend()
+    resume = resume_text_from(synthetic_tailored(positions=4, bullets=6, technologies=8))
+    single = tailor_resume(resume, synthetic_job_description(), use_cache=False)
+    fanned, info = tailor_resume(resume, synthetic_job_description(), use_cache=False, fanout=True, with_info=True)
+    assert [job["Responsibilities"] for job in fanned["Experience"]] == \
+        [job["Responsibilities"] for job in single["Experience"]]
+    assert not info["dedup"].get("dropped")
@@ -0,0 +1,71 @@
+import incremental
+import resume_logic
+from fixtures import resume_text_from, synthetic_tailored
+from incremental import plan_update, retailor
+
+JD = """Senior Backend Engineer
+
+We build the payments platform that merchants across Europe rely on every day. You will design
+and operate high throughput services, own features from design review to production rollout,
+mentor engineers on the team and improve observability, reliability and developer experience.
+We value clear writing, pragmatic testing and calm incident response.
+
+Requirements:
+- 5+ years with python
+- Experience with postgresql and redis
+- Comfortable with docker and kubernetes"""
+
+PREVIOUS = synthetic_tailored(positions=3, bullets=4, technologies=5)
+RESUME = resume_text_from(PREVIOUS)
+
+
+def _inputs(**changes):
+    return {"resume": RESUME, "job_description": JD, "custom_prompt": "", **changes}
+
+
+def test_plan_unchanged_inputs():
+    assert plan_update(_inputs(), _inputs(), PREVIOUS)[0] == []
+
+
+def test_plan_resume_change_runs_everything():
+    sections, reasons, _ = plan_update(_inputs(), _inputs(resume=RESUME + "\nNew certification"), PREVIOUS)
+    assert sections is None and reasons == ["resume changed"]
+
+
+def test_plan_summary_rule_only_touches_summary():
+    sections, _, _ = plan_update(_inputs(), _inputs(custom_prompt="Keep the summary under 50 words."), PREVIOUS)
+    assert sections == ["Summary"]
+
+
+def test_plan_added_skill_touches_skills_and_latest_position():
+    sections, _, changes = plan_update(_inputs(), _inputs(job_description=JD + "\n- terraform"), PREVIOUS)
+    assert sections == ["Skills", "Experience[0]"]
+    assert changes == {"added_skills": ["terraform"], "removed_skills": []}
+
+
+def test_retailor_reuses_the_callers_plan(fake_backend, monkeypatch):
+    fake_backend()
+    new = _inputs(custom_prompt="Keep the summary under 50 words.")
+    plan = plan_update(_inputs(), new, PREVIOUS)
+
+    def again(*args):
+        raise AssertionError("plan_update ran twice")
+
+    monkeypatch.setattr(incremental, "plan_update", again)
+    tailored, info = retailor(_inputs(), PREVIOUS, new["resume"], new["job_description"], new["custom_prompt"],
+                              plan=plan)
+    assert info["mode"] == "incremental" and info["regenerated"] == ["Summary"]
+    assert tailored["Experience"] == PREVIOUS["Experience"]
+
+
+def test_position_update_sends_the_current_bullets(monkeypatch):
+    sent = []
+
+    def chat_json(messages):
+        sent.append(messages)
+        return {"Responsibilities": ["Revised bullet"]}, {}
+
+    monkeypatch.setattr(resume_logic, "chat_json", chat_json)
+    _, job, _ = incremental._update_one("Experience[1]", PREVIOUS, _inputs(), {})
+    assert job["Responsibilities"] == ["Revised bullet"]
+    assert all(bullet in sent[0][-1]["content"] for bullet in PREVIOUS["Experience"][1]["Responsibilities"])
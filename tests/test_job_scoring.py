@@ -0,0 +1,40 @@
+from job_scoring import rank_jobs, score_jobs, tokenize
+
+RESUME = """Backend engineer with eight years building payment services.
+Skills: Python, Django, PostgreSQL, Kubernetes, Terraform
+Built high throughput APIs and led the migration to event driven services."""
+
+MATCH = "Senior backend engineer for payment services. Python, Django and PostgreSQL; Kubernetes a plus."
+PARTIAL = "Data engineer: Python and Spark pipelines, Airflow, Snowflake, dbt."
+UNRELATED = "Graphic designer for print campaigns. Figma, Photoshop, Illustrator."
+
+
+def test_tokenize_keeps_tech_punctuation():
+    assert tokenize("Node.js, C++ and CI/CD with Kafka") == ["node.js", "c++", "ci/cd", "kafka"]
+
+
+def test_scores_follow_skill_overlap():
+    match, partial, unrelated = score_jobs(RESUME, [MATCH, PARTIAL, UNRELATED])
+    assert match["score"] > partial["score"] > unrelated["score"]
+    assert match["coverage"] == 1.0 and not match["missing"]
+    assert {"python", "django", "postgresql", "kubernetes"} <= set(match["matched"])
+    assert partial["matched"] == ["python"]
+    assert {"spark", "airflow", "snowflake", "dbt"} <= set(partial["missing"])
+
+
+def test_resume_skill_lines_count_as_skills():
+    [score] = score_jobs("Skills: Widgetry, Gizmo Tuning", ["Experts in gizmo tuning and widgetry wanted."])
+    assert score["coverage"] == 1.0 and set(score["matched"]) == {"gizmo tuning", "widgetry"}
+
+
+def test_rank_jobs_orders_and_filters():
+    jobs = [{"id": "unrelated", "job_description": UNRELATED}, {"id": "match", "job_description": MATCH},
+            {"id": "partial", "job_description": PARTIAL}]
+    assert [job["id"] for job, _ in rank_jobs(RESUME, jobs)] == ["match", "partial", "unrelated"]
+    cutoff = score_jobs(RESUME, [PARTIAL])[0]["score"]
+    assert [job["id"] for job, _ in rank_jobs(RESUME, jobs, min_score=cutoff + 0.01)] == ["match"]
+
+
+def test_empty_inputs_score_zero():
+    assert score_jobs("", [""]) == [{"score": 0.0, "coverage": 0.0, "similarity": 0.0, "skills": 0,
+                                     "matched": [], "missing": []}]
@@ -0,0 +1,48 @@
+import re
+
+from fixtures import synthetic_size, synthetic_tailored
+from page_fit import MIN_BULLETS, fit_to_pages, trim_order
+from render_styles import LEADING_GAP
+from resume_logic import DEFAULT_STYLES, create_pdf
+
+
+def pdf_pages(tailored, styles):
+    return len(re.findall(rb"/Type /Page\b", create_pdf("", tailored, None, True, styles)))
+
+
+def test_trim_order_takes_from_the_longest_then_oldest_position():
+    tailored = {"Experience": [{"Responsibilities": ["b"] * n} for n in (4, 3, 4)]}
+    assert trim_order(tailored) == [(2, 3), (0, 3), (2, 2), (1, 2), (0, 2)]
+    assert trim_order(tailored, min_bullets=3) == [(2, 3), (0, 3)]
+
+
+def test_a_short_resume_is_left_alone():
+    tailored = synthetic_tailored(positions=1, bullets=3, technologies=5)
+    fitted, styles, report = fit_to_pages(tailored, 1)
+    assert fitted is tailored and styles == DEFAULT_STYLES
+    assert (report["fits"], report["scale"], report["styles"], report["dropped_bullets"]) == (True, 1.0, {}, [])
+
+
+def test_shrinking_alone_fits_and_matches_the_rendered_pdf():
+    tailored = synthetic_tailored(positions=2, bullets=6, technologies=10)
+    assert pdf_pages(tailored, DEFAULT_STYLES) == 2
+    fitted, styles, report = fit_to_pages(tailored, 1)
+    assert report["fits"] and 0 < report["scale"] < 1 and not report["dropped_bullets"]
+    base = {**DEFAULT_STYLES, "leading_gap": LEADING_GAP, "spacing_scale": 1.0}
+    assert report["styles"] and all(styles[key] < base[key] for key in report["styles"])
+    assert pdf_pages(fitted, styles) == report["page_count"] == 1
+
+
+def test_bullets_are_dropped_only_when_shrinking_is_not_enough():
+    tailored = synthetic_size("medium", seed=1)
+    fitted, styles, report = fit_to_pages(tailored, 2)
+    assert report["fits"] and report["dropped_bullets"]
+    assert all(len(job["Responsibilities"]) >= MIN_BULLETS for job in fitted["Experience"])
+    assert pdf_pages(fitted, styles) == 2
+    assert len(tailored["Experience"][0]["Responsibilities"]) == 20  # the input is not modified
+
+
+def test_without_trimming_an_oversized_resume_reports_it_does_not_fit():
+    tailored = synthetic_size("medium", seed=1)
+    fitted, _, report = fit_to_pages(tailored, 1, trim=False)
+    assert fitted is tailored and not report["fits"] and report["page_count"] > 1
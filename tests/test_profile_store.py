@@ -0,0 +1,34 @@
+import asyncio
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+import profile_store
+from fake_backend import AsyncFakeBackend
+from fixtures import resume_text_from, synthetic_tailored
+from profile_store import ProfileStore, get_profile, get_profile_async
+
+RESUMES = [resume_text_from(synthetic_tailored(positions=2, bullets=5, technologies=6, seed=i)) for i in range(3)]
+
+
+def test_concurrent_parses_share_one_call_and_leave_no_locks(tmp_path, fake_backend):
+    backend = fake_backend(ttft_ms=50)
+    store = ProfileStore(str(tmp_path))
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: get_profile(RESUMES[i % 3], store=store), range(12)))
+    assert backend.calls == 3
+    assert sorted(info["profile"] for _, info in results).count("parsed") == 3
+    gc.collect()
+    assert len(profile_store._parse_locks) == 0
+
+
+def test_async_locks_are_dropped_with_their_loop(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    client = AsyncFakeBackend(ttft_ms=20)
+
+    async def parse_all():
+        return await asyncio.gather(*(get_profile_async(RESUMES[i % 3], client, store=store) for i in range(6)))
+
+    asyncio.run(parse_all())
+    assert client.calls == 3
+    gc.collect()
+    assert len(profile_store._async_parse_locks) == 0
@@ -0,0 +1,34 @@
+import logging
+
+from fixtures import resume_text_from, synthetic_job_description, synthetic_tailored
+from prompts import MIN_JD_TOKENS, assemble_messages, estimate_tokens, trim_job_description
+
+JD = synthetic_job_description(seed=1, paragraphs=20)
+
+
+def test_jd_is_trimmed_to_the_budget():
+    text, trimmed = trim_job_description(JD, 800)
+    assert trimmed and estimate_tokens(text) <= 800 and text.startswith("Senior Software Engineer")
+
+
+def test_tiny_budget_keeps_a_minimum_jd(caplog):
+    resume = resume_text_from(synthetic_tailored(positions=4, bullets=8, technologies=10))
+    with caplog.at_level(logging.WARNING, logger="resume.prompts"):
+        messages, info = assemble_messages(resume, JD, input_budget=200)
+    jd = messages[-1]["content"].removeprefix("Job Description:\n")
+    assert MIN_JD_TOKENS * 0.9 <= estimate_tokens(jd) <= MIN_JD_TOKENS
+    assert info["over_budget"] and info["jd_trimmed"]
+    assert "job description" in caplog.text
+
+
+def test_cache_key_depends_on_the_input_budget(fake_backend):
+    from resume_logic import tailor_resume
+
+    backend = fake_backend()
+    resume = resume_text_from(synthetic_tailored(positions=2, bullets=4, technologies=6))
+    _, tight = tailor_resume(resume, JD, input_budget=200, with_info=True)
+    _, default = tailor_resume(resume, JD, with_info=True)
+    _, again = tailor_resume(resume, JD, input_budget=200, with_info=True)
+    assert (tight["cache"], default["cache"], again["cache"]) == ("miss", "miss", "hit")
+    assert tight["prompt"]["jd_trimmed"] and not default["prompt"]["jd_trimmed"]
+    assert backend.calls == 2
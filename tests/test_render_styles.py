@@ -0,0 +1,28 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from docx import Document
+
+from fixtures import synthetic_tailored
+from render_styles import DOCX_STYLES
+from resume_logic import create_docx
+
+
+def test_paragraphs_reference_the_compiled_styles():
+    tailored = synthetic_tailored(positions=2, bullets=3, technologies=4)
+    doc = Document(io.BytesIO(create_docx("", tailored, styles_config={"body_size": 9})))
+    styles = [p.style.name for p in doc.paragraphs]
+    assert styles[:2] == [DOCX_STYLES["Title"], DOCX_STYLES["Contact"]]
+    assert styles.count(DOCX_STYLES["Bullet"]) == 6
+    assert styles.count(DOCX_STYLES["Heading"]) == 4
+    assert doc.styles[DOCX_STYLES["Body"]].font.size.pt == 9
+
+
+def test_concurrent_renders_do_not_share_documents():
+    docs = [synthetic_tailored(positions=1, bullets=2, technologies=2, seed=i) for i in range(8)]
+    with ThreadPoolExecutor(4) as pool:
+        rendered = list(pool.map(lambda t: create_docx("", t), docs))
+    for tailored, data in zip(docs, rendered):
+        paragraphs = [p.text for p in Document(io.BytesIO(data)).paragraphs]
+        assert paragraphs[0] == tailored["Header"]["Name"]
+        assert paragraphs.count("Experience") == 1
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def disk_keys(path):
+    fresh = ResponseCache(path=path, memory_size=0)  # nothing in memory: every get reads sqlite
+    return {key for key in "abcd" if fresh.get(key) is not None}
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(path=str(tmp_path / "c.sqlite"), memory_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # "b" is the least recently used
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b") == 2 and cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_accessed_beyond_max_entries(tmp_path, clock):
+    path = str(tmp_path / "c.sqlite")
+    cache = ResponseCache(path=path, memory_size=0, max_disk_entries=2)
+    cache.set("a", 1)
+    clock.value += 1
+    cache.set("b", 2)
+    clock.value += 1
+    cache.get("a")  # refreshes "a"
+    clock.value += 1
+    cache.set("c", 3)
+    assert disk_keys(path) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_respects_max_bytes(tmp_path, clock):
+    path = str(tmp_path / "c.sqlite")
+    cache = ResponseCache(path=path, memory_size=0, max_disk_bytes=25)
+    for key in "abc":
+        cache.set(key, "x" * 8)  # 10 bytes as JSON
+        clock.value += 1
+    assert disk_keys(path) == {"b", "c"}
+
+
+def test_expired_entries_are_misses_and_are_evicted(tmp_path, clock):
+    path = str(tmp_path / "c.sqlite")
+    cache = ResponseCache(path=path, memory_size=4, ttl=10)
+    cache.set("a", 1)
+    clock.value += 11
+    assert cache.get("a") is None
+    cache.set("b", 2)  # writes sweep expired rows
+    assert disk_keys(path) == {"b"}
+
+
+def test_cache_key_ignores_whitespace_only_edits():
+    base = cache_key("Resume\nline", "JD", None, "model", "v1")
+    assert cache_key("Resume  \r\nline\n\n", " JD ", "", "model", "v1") == base
+    assert cache_key("Resume\nline", "JD", None, "other-model", "v1") != base
@@ -0,0 +1,53 @@
+import metrics
+import routing
+from cancellation import CancelToken, scope
+from resume_logic import build_messages, chat_json
+
+
+def run(router, cancel=None):
+    old = routing.set_router(router)
+    try:
+        with metrics.run("test") as trace, scope(cancel):
+            chat_json(build_messages("resume", "job description"))
+    finally:
+        routing.set_router(old)
+    return [entry for entry in trace.stages if entry["stage"] == "openai"]
+
+
+def test_size_routing_alone_does_not_stream(fake_backend):
+    fake_backend()
+    [request] = run(routing.Router(routes=[("small-model", None)], hedge=False))
+    assert request["model"] == "small-model"
+    assert "ttft_ms" not in request  # a plain request: no chunks to read
+
+
+def test_cancellable_and_hedged_requests_stream(fake_backend):
+    fake_backend()
+    [request] = run(routing.Router(routes=[("small-model", None)], hedge=False), cancel=CancelToken())
+    assert request["model"] == "small-model" and "ttft_ms" in request
+    [request] = run(routing.Router(routes=[], hedge=True))
+    assert "ttft_ms" in request
+
+
+def test_primary_beaten_before_first_token_leaves_a_censored_sample(fake_backend):
+    delays = iter([1000, 0])  # primary slow, hedge immediate
+    fake_backend(ttft_dist=lambda rng: next(delays, 0))
+    router = routing.Router(routes=[("small-model", None)], hedge=True, budget=1.0, default_deadline=0.05)
+    run(router)
+    assert router.hedges_won == 1
+    samples = sorted(router.window("small-model").samples)
+    assert len(samples) == 2
+    assert samples[0] < 0.05 <= samples[1] < 1.0  # the hedge's real TTFT, the primary's censored wait
+
+
+def test_cache_key_follows_the_routed_model():
+    from resume_logic import tailor_cache_key
+
+    keys = []
+    for model in ("small-model", "large-model"):
+        old = routing.set_router(routing.Router(routes=[(model, None)], hedge=False))
+        try:
+            keys.append(tailor_cache_key("resume", "job description", None))
+        finally:
+            routing.set_router(old)
+    assert keys[0] != keys[1]
@@ -0,0 +1,37 @@
+import threading
+import time
+
+import pytest
+
+import metrics
+from cancellation import CancelToken, GenerationCancelled, scope
+from fixtures import synthetic_tailored
+from schema import validate_tailored
+
+
+def broken():
+    tailored = synthetic_tailored(positions=2, bullets=4, technologies=6)
+    tailored["Summary"] = ""
+    return tailored
+
+
+def test_repairs_join_the_callers_trace(fake_backend):
+    fake_backend()
+    with metrics.run("test") as trace:
+        fixed, report = validate_tailored(broken(), "resume", "jd")
+    assert report["repaired"] == ["Summary"]
+    assert fixed["Summary"]
+    stages = [entry["stage"] for entry in trace.stages]
+    assert "repair" in stages and "openai" in stages
+    assert trace.tokens["completion_tokens"]
+
+
+def test_cancel_stops_inflight_repairs(fake_backend):
+    backend = fake_backend(ttft_ms=5000)
+    token = CancelToken()
+    threading.Timer(0.2, token.cancel).start()
+    started = time.perf_counter()
+    with pytest.raises(GenerationCancelled), scope(token):
+        validate_tailored(broken(), "resume", "jd")
+    assert time.perf_counter() - started < 2
+    assert backend.closed == 1
@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+
+from service import JobService, LocalQueue
+
+JD = "Senior Python engineer: Django, PostgreSQL, AWS."
+
+
+def call(service, method, path, **kwargs):
+    async def go():
+        transport = httpx.ASGITransport(app=service)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(go())
+
+
+def scenario(service, steps):
+    """Run async steps(client) against service in one event loop, then stop its workers."""
+    async def go():
+        transport = httpx.ASGITransport(app=service)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            try:
+                return await steps(client)
+            finally:
+                await service.shutdown()
+
+    return asyncio.run(go())
+
+
+async def wait_for(client, job_id, *statuses):
+    for _ in range(500):
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stayed {job['status']}")
+
+
+class HeldQueue(LocalQueue):
+    """Accepts jobs but never hands them to a worker, so they stay queued."""
+
+    async def get(self):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"job_description": JD, "formats": 5}, "formats"),
+    ({"job_description": JD, "formats": ["docx", 3]}, "formats"),
+    ({"job_description": JD, "formats": ["doc"]}, "unknown format"),
+    ({"job_description": JD, "styles": "big"}, "styles"),
+    ({"job_description": JD, "include_tech": "no"}, "include_tech"),
+    ({"job_description": JD, "fit_pages": "2"}, "fit_pages"),
+    ({"job_description": 7}, "job_description"),
+    ({"job_description": " "}, "job_description"),
+    ([JD], "JSON object"),
+])
+def test_bad_bodies_are_rejected_with_400(body, message):
+    response = call(JobService(), "POST", "/jobs", json=body)
+    assert response.status_code == 400
+    assert message in response.json()["error"]
+
+
+def test_identical_jobs_share_one_id():
+    async def steps(client):
+        first = await client.post("/jobs", json={"job_description": JD})
+        again = await client.post("/jobs", json={"job_description": JD})
+        fresh = await client.post("/jobs", json={"job_description": JD, "no_cache": True})
+        return first, again, fresh
+
+    first, again, fresh = scenario(JobService(queue=HeldQueue(8)), steps)
+    assert (first.status_code, again.status_code, fresh.status_code) == (202, 200, 202)
+    assert first.json()["id"] == again.json()["id"] != fresh.json()["id"]
+    assert first.headers["location"] == f"/jobs/{first.json()['id']}"
+
+
+def test_full_queue_answers_429_with_retry_after():
+    async def steps(client):
+        await client.post("/jobs", json={"job_description": JD})
+        return await client.post("/jobs", json={"job_description": JD + " Go."})
+
+    response = scenario(JobService(queue=HeldQueue(1)), steps)
+    assert response.status_code == 429 and response.headers["retry-after"] == "5"
+
+
+def test_delete_a_queued_job():
+    async def steps(client):
+        job_id = (await client.post("/jobs", json={"job_description": JD})).json()["id"]
+        return [await client.delete(path) for path in (f"/jobs/{job_id}", f"/jobs/{job_id}", "/jobs/nope")]
+
+    cancelled, again, unknown = scenario(JobService(queue=HeldQueue(8)), steps)
+    assert cancelled.status_code == 200 and cancelled.json()["status"] == "cancelled"
+    assert (again.status_code, unknown.status_code) == (409, 404)
+
+
+def test_delete_a_running_job_closes_its_stream(fake_backend):
+    backend = fake_backend(ttft_ms=5000)
+
+    async def steps(client):
+        job_id = (await client.post("/jobs", json={"job_description": JD, "formats": ["html"]})).json()["id"]
+        await wait_for(client, job_id, "running")
+        while backend.calls == 0:  # the model request is open
+            await asyncio.sleep(0.01)
+        stopping = await client.delete(f"/jobs/{job_id}")
+        return stopping, await wait_for(client, job_id, "cancelled", "done", "error")
+
+    stopping, job = scenario(JobService(workers=1), steps)
+    assert stopping.status_code == 202
+    assert job["status"] == "cancelled" and backend.closed == 1
+
+
+def test_finished_job_downloads_and_cannot_be_deleted(fake_backend):
+    fake_backend()
+
+    async def steps(client):
+        job_id = (await client.post("/jobs", json={"job_description": JD, "formats": ["html"]})).json()["id"]
+        job = await wait_for(client, job_id, "done", "error", "cancelled")
+        download = await client.get(f"/jobs/{job_id}/download/json")
+        missing = await client.get(f"/jobs/{job_id}/download/pdf")
+        return job, download, missing, await client.delete(f"/jobs/{job_id}")
+
+    job, download, missing, delete = scenario(JobService(workers=1), steps)
+    assert job["status"] == "done" and set(job["downloads"]) == {"html", "json"}
+    assert download.status_code == 200 and download.json() == job["tailored"]
+    assert (missing.status_code, delete.status_code) == (404, 409)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from streaming import SectionStreamParser
+
+TAILORED = {
+    "Header": {"Name": "Ada \"The Countess\" Lovelace", "Links": ["https://example.com/{a}"]},
+    "Summary": "Braces { and } and brackets [ ] inside strings, a backslash \\ and é.",
+    "Skills": {"Languages": ["Python", "C++"]},
+    "Experience": [
+        {"Company": "A, Inc.", "Title": "Engineer", "Dates": "2020-2024",
+         "Responsibilities": ["Cut p99 by 40% {via caching}", "Said \"no\" to scope creep"]},
+        {"Company": "B", "Title": "Intern", "Dates": "2019", "Responsibilities": ["Wrote tests"]},
+    ],
+    "Education": {"Degree": "BSc", "GPA": "3.9"},
+    "Version": 2,
+}
+DOC = json.dumps(TAILORED, indent=1, ensure_ascii=False)
+
+
+def feed_in_chunks(size):
+    parser = SectionStreamParser()
+    events = []
+    for i in range(0, len(DOC), size):
+        events += parser.feed(DOC[i:i + size])
+    return parser, events
+
+
+def expected_events():
+    events = []
+    for key, value in TAILORED.items():
+        if key == "Experience":
+            events += [(key, i, job) for i, job in enumerate(value)]
+        else:
+            events.append((key, None, value))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, len(DOC)])
+def test_chunk_boundaries_do_not_change_the_events(size):
+    parser, events = feed_in_chunks(size)
+    assert events == expected_events()
+    assert parser.result == TAILORED
+
+
+def test_every_single_split_point():
+    for split in range(1, len(DOC)):
+        parser = SectionStreamParser()
+        events = parser.feed(DOC[:split]) + parser.feed(DOC[split:])
+        assert events == expected_events(), split
+
+
+def test_sections_are_emitted_as_soon_as_they_close():
+    parser = SectionStreamParser()
+    head = DOC[:DOC.index('"Skills"')]
+    assert [e[0] for e in parser.feed(head)] == ["Header", "Summary"]
+
+
+def test_stream_tailor_resume_ends_with_the_full_result(fake_backend):
+    from fixtures import resume_text_from, synthetic_job_description, synthetic_tailored
+    from streaming import stream_tailor_resume
+
+    fake_backend(chunk_chars=7, positions=3, bullets=4, technologies=5)
+    resume = resume_text_from(synthetic_tailored(positions=3, bullets=4, technologies=5))
+    events = list(stream_tailor_resume(resume, synthetic_job_description(), use_cache=False))
+    assert [e[1] for e in events if e[0] == "Experience"] == [0, 1, 2]
+    section, _, tailored, partial = events[-1]
+    assert section == "done" and tailored == partial and len(tailored["Experience"]) == 3